@@ -0,0 +1,79 @@
+import time
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.core import analytics, models, schemas
+from app.core.catalog import ensure_catalog_loaded
+from app.core.data_processor import SOURCE_A_MOVIE_PATH
+from app.core.database import get_db
+from app.logging.logger import get_logger, sampled
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/api")
+
+
+@router.get(
+    "/analytics/aggregate",
+    response_model=schemas.AggregateRead,
+    summary="Aggregate Movies",
+    responses={
+        404: {"description": "Task not found"},
+        400: {"description": "Task is not yet completed"},
+        422: {"description": "Unknown dimension, measure or order column"},
+        501: {"description": "The analytics engine needs DuckDB, which is not installed"},
+    },
+)
+def aggregate_movies(
+    group_by: List[str] = Query([], description=f"Dimensions to group by: {', '.join(analytics.DIMENSIONS)}."),
+    measure: List[str] = Query(["count"], description="`count` or `<aggregate>:<column>`, e.g. `avg:revenue`. Repeatable."),
+    task_id: Optional[int] = Query(None, description="Aggregate this completed task's results instead of the whole catalog."),
+    start_year: Optional[int] = Query(None, description="Only movies released from this year onwards."),
+    end_year: Optional[int] = Query(None, description="Only movies released up to this year."),
+    genre: Optional[str] = Query(None, description="Only movies with this genre (case-insensitive)."),
+    language: Optional[str] = Query(None, description="Only movies in this original language."),
+    min_rating: Optional[float] = Query(None, ge=0, le=10, description="Only movies rated at least this."),
+    order_by: Optional[str] = Query(None, description="Result column to sort by; defaults to the group-by columns."),
+    descending: bool = Query(False),
+    limit: int = Query(1000, ge=1, le=analytics.ANALYTICS_MAX_ROWS),
+    db: Session = Depends(get_db),
+):
+    """
+    Group-by/aggregate over the movie catalog or one task's results, e.g. average revenue per
+    genre and decade: `?group_by=genre&group_by=decade&measure=avg:revenue&measure=count`.
+
+    Queries run on an embedded columnar copy of the catalog and results are cached per catalog
+    version, so repeated chart queries don't touch the database or the task queue.
+    """
+    start = time.perf_counter()
+    try:
+        analytics.check_available()
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Analytics requires the duckdb package.")
+    try:
+        query = analytics.parse_query(
+            group_by, measure, order_by=order_by, start_year=start_year, end_year=end_year,
+            genre=genre, language=language, min_rating=min_rating, descending=descending, limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if task_id is not None:
+        db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+        if db_task is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if db_task.status != models.TaskStatus.COMPLETED:
+            raise HTTPException(status_code=400, detail=f"Task status is {db_task.status}. Data is only available for 'completed' tasks.")
+
+    ensure_catalog_loaded(db, SOURCE_A_MOVIE_PATH)  # One stat() once the current version is loaded
+    result, cached = analytics.analytics_engine.aggregate(db, query, task_id)
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+    logger.info("Aggregated %s groups in %sms (cached=%s)", len(result.rows), elapsed_ms, cached, extra=sampled("analytics"))
+    return schemas.AggregateRead(
+        catalog_version=result.catalog_version,
+        task_id=task_id,
+        columns=result.columns,
+        rows=[list(row) for row in result.rows],
+        cached=cached,
+        elapsed_ms=elapsed_ms,
+    )
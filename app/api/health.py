@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core import startup
+
+router = APIRouter()
+
+
+@router.get("/live", summary="Liveness", include_in_schema=False)
+def live() -> JSONResponse:
+    """The process is up and serving requests."""
+    return JSONResponse({"live": True})
+
+
+@router.get("/ready", summary="Readiness", include_in_schema=False)
+def ready() -> JSONResponse:
+    """200 once migrations ran and the warm-up hooks finished, 503 (with their progress) until then."""
+    is_ready, details = startup.readiness()
+    return JSONResponse(details, status_code=200 if is_ready else 503)
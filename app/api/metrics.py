@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+from app.core import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", summary="Prometheus Metrics", include_in_schema=False)
+def get_metrics() -> Response:
+    """Exposes queue, pipeline, database and HTTP metrics in the Prometheus text format."""
+    payload, content_type = metrics.render_latest()
+    return Response(content=payload, media_type=content_type)
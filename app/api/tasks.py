@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any 
 from datetime import datetime, date # Added date
-from app.core import models, schemas, queue_manager
+from app.core import models, schemas, queue_manager, http_cache, results, export, retention
+from app.core.result_cache import result_cache
+from app.core.catalog import latest_catalog_version, loaded_catalog_version
 from app.core.database import get_db
-from sqlalchemy.sql import extract # For year extraction
-from app.logging.logger import logging
-from app.core.data_processor import fetch_and_process_data
+from app.logging.logger import get_logger, sampled
 
-router = APIRouter()
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/api")
 
 # @router.post(
 #     "/tasks",
@@ -81,7 +84,7 @@ def list_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)) -
 
     # Convert models.Task objects to schemas.TaskRead objects
     task_reads = [schemas.TaskRead.model_validate(task) for task in tasks]
-    print(task_reads)
+    logger.debug("Listed %s tasks", len(task_reads), extra=sampled("list-tasks"))
     return task_reads
 
 @router.get("/tasks/{task_id}", response_model=schemas.TaskRead, summary="Get Task Status")
@@ -93,7 +96,13 @@ def get_task_status(task_id: int, db: Session = Depends(get_db)) -> models.Task:
     # print(db_task)
      # Convert models.Task objects to schemas.TaskRead objects
     task_read = schemas.TaskRead.model_validate(db_task)
-    print(task_read)
+    if db_task.status in (models.TaskStatus.PENDING, models.TaskStatus.IN_PROGRESS):
+        # Lets clients poll less often (or give up) instead of adding load while they wait
+        estimate = queue_manager.task_progress_estimate(task_id)
+        if estimate is not None:
+            task_read.queue_position, eta = estimate
+            task_read.eta_seconds = round(eta, 1)
+    logger.debug("Task %s status: %s", task_id, task_read.status, extra=sampled("task-status"))
     return task_read
 
 
@@ -106,29 +115,54 @@ def get_task_status(task_id: int, db: Session = Depends(get_db)) -> models.Task:
     summary="Get Task Results (Movie Data)",
     description="Retrieves the processed movie data associated with a specific completed task. Allows optional server-side filtering.",
      responses={
+        304: {"description": "Not modified (If-None-Match matched the current ETag)"},
         404: {"description": "Task not found"},
         400: {"description": "Task is not yet completed or failed"},
+        501: {"description": "Requested format needs an optional dependency that is not installed"},
     },
 )
 def get_task_data(
     task_id: int,
+    request: Request,
     # *** Update Query Parameters for Movies ***
     year: Optional[int] = Query(None, description="Filter results to include only movies released in this year."),
     genre: Optional[str] = Query(None, description="Filter results by genre (case-insensitive partial match within the genre string)."),
     min_rating: Optional[float] = Query(None, ge=0, le=10, description="Filter results by minimum rating."),
     language: Optional[str] = Query(None, description="Filter results by language(case-insensitive partial match)."),
+    format: str = Query("json", pattern="^(json|columnar|arrow)$", description="Payload layout: `json` (array of objects, default), `columnar` (one array per field, dictionary-encoded strings, epoch-day dates) or `arrow` (Arrow IPC stream)."),
     db: Session = Depends(get_db)
     # *** Change Return Type Hint ***
-) -> List[models.MovieRecord]:
+) -> Response:
     """
     Retrieves the processed movie data for a completed task.
 
+    Rows are read as plain column tuples and encoded straight to JSON (same bytes as
+    `response_model` would produce, without per-row ORM and Pydantic overhead).
+
+    Results are read through the shared catalog, so a catalog refresh can change a
+    completed task's rows. Responses carry a strong ETag that includes the catalog
+    version and `Cache-Control: no-cache`, honour `If-None-Match` with a 304, and are
+    gzip/brotli-compressed when the client accepts it. Encoded bodies are kept in an
+    in-process LRU cache per catalog version, so repeat reads of hot tasks skip the
+    movie query. Hits don't check the task again: a task deleted by another process is
+    served until its entry expires (RESULT_CACHE_TTL_SECONDS).
+
     - **task_id**: The ID of the task.
     - **year** (Optional query param): Filter by release year.
     - **genre** (Optional query param): Filter if genre string contains this value.
     - **min_rating** (Optional query param): Filter by minimum rating.
     - **director** (Optional query param): Filter by director name.
+    - **format** (Optional query param): `json`, `columnar` or `arrow`.
     """
+    # Updated catalog movies change the body, so the catalog version is part of the representation
+    # The version this process holds, so cache hits never touch SQLite; it is only looked up before the first load
+    catalog = loaded_catalog_version() or latest_catalog_version(db)
+    variant = http_cache.request_variant({"format": format}, f"catalog={catalog}")
+    cache_key = (task_id, variant, http_cache.choose_encoding(request.headers.get("accept-encoding")))
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return http_cache.replay(request, cached)
+
     db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
     # task_read1 = schemas.TaskRead.model_validate(db_task) 
     # print(task_read1)
@@ -137,47 +171,96 @@ def get_task_data(
     if db_task.status != models.TaskStatus.COMPLETED:
         raise HTTPException(status_code=400, detail=f"Task status is {db_task.status}. Data is only available for 'completed' tasks.")
 
-    # *** Query the Correct Model ***
-    query = db.query(models.MovieRecord).filter(models.MovieRecord.task_id == task_id)
-    # print(query.all())
-    # Apply server-side filters
-    print(db_task.filters['start_year'])
-    if db_task.filters['start_year'] != '':
-        year = db_task.filters['start_year']
-        print("Year" , year)
-         # Use SQLAlchemy's extract function for year filtering on DateTime column
-        query = query.filter(extract('year', models.MovieRecord.release_date) >= year)
-        logging.info(f"Applied start year filter: {year} for task {task_id} with {len(query.all())} records")
-
-    if db_task.filters['end_year'] != '':
-        year = db_task.filters['end_year']
-         # Use SQLAlchemy's extract function for year filtering on DateTime column
-        query = query.filter(extract('year', models.MovieRecord.release_date) <= year)
-        logging.info(f"Applied end year filter: {year} for task {task_id} with {len(query.all())} records ")
-
-    # if db_task.filters[''] is not None:
-    #     # Case-insensitive contains search on the genre string
-    #     query = query.filter( models.MovieRecord.genre.ilike(f"%{genre}%") )
-    #     # task_read1 = schemas.MovieRecordRead.model_validate(query) 
-    #     # print(task_read1)
-    #     logging.debug(f"Applied genre filter: {genre} for task {task_id}")
-
-    if db_task.filters['min_rating'] != '':
-        min_rating = db_task.filters['min_rating']
-        # Ensure rating column exists and filter
-        query = query.filter(models.MovieRecord.vote_average >= int(min_rating))
-        logging.info(f"Applied min_rating filter: {min_rating} for task {task_id} with {len(query.all())} records")
-
-    if db_task.filters['language'] != '':
-        language = db_task.filters['language']
-        query = query.filter(models.MovieRecord.original_language.ilike(f"%{language}%"))
-        logging.info(f"Applied language filter: {language} for task {task_id} with {len(query.all())} records")
-
-    
-    # Order results (e.g., by release date descending)
-    movie_records = query.order_by(models.MovieRecord.release_date.desc())
-    logging.info(f"Retrieved {len(movie_records.all())} movie records for task {task_id} with server-side filters applied.")
-    # print(movie_records)
-    task_read = schemas.MovieRecordRead.model_validate(movie_records.first()) 
-    print(task_read)
-    return movie_records.all()
+    not_modified = http_cache.precondition_response(request, db_task, variant)
+    if not_modified is not None:
+        return not_modified
+
+    rows = results.fetch_task_rows(db, db_task)
+    logger.info("Retrieved %s movie records for task %s with server-side filters applied.", len(rows), task_id, extra=sampled("task-data"))
+    if format == "columnar":
+        body, media_type = results.encode_rows_columnar(rows, task_id), results.COLUMNAR_MEDIA_TYPE
+    elif format == "arrow":
+        try:
+            body, media_type = results.encode_rows_arrow(rows), results.ARROW_MEDIA_TYPE
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Arrow output requires the pyarrow package.")
+    else:
+        body, media_type = results.encode_rows_json(rows), "application/json"
+    encoded = http_cache.encode_body(request, db_task, variant, body, media_type)
+    result_cache.put(cache_key, encoded)
+    return http_cache.replay(request, encoded)
+
+
+@router.delete(
+    "/tasks/{task_id}",
+    response_model=schemas.TaskRead,
+    status_code=202,
+    summary="Cancel or Delete Task",
+    responses={
+        204: {"description": "Finished task and its results deleted"},
+        404: {"description": "Task not found"},
+    },
+)
+def cancel_task(task_id: int, db: Session = Depends(get_db)):
+    """
+    Cancels a pending or running task, or deletes a finished one.
+
+    - A queued task is removed from the queue and marked `cancelled` (202).
+    - A running task is marked `cancelled` (202); the worker stops at its next checkpoint
+      and rolls back any records it had written.
+    - A finished task is deleted together with its results (204).
+
+    Only a task that had already finished when the request arrived is deleted. If a pending
+    or running task stops first (the worker saw the cancel request, hit its deadline or
+    completed), it is kept and returned with its final status (202).
+    """
+    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if db_task.status in (models.TaskStatus.PENDING, models.TaskStatus.IN_PROGRESS):
+        queue_manager.cancel_task(db, task_id)  # False if the worker finished or stopped it first
+        db.refresh(db_task)
+        return schemas.TaskRead.model_validate(db_task)
+    retention.delete_task(db, task_id)
+    logger.info("Deleted task %s", task_id)
+    return Response(status_code=204)
+
+
+@router.get(
+    "/tasks/{task_id}/export",
+    summary="Export Task Results",
+    description="Streams a completed task's movie records as CSV, Parquet or an Arrow IPC stream.",
+    response_class=StreamingResponse,
+    responses={
+        404: {"description": "Task not found"},
+        400: {"description": "Task is not yet completed or failed"},
+        501: {"description": "Requested format needs an optional dependency that is not installed"},
+    },
+)
+def export_task_data(
+    task_id: int,
+    format: str = Query("csv", pattern="^(csv|parquet|arrow)$", description="Output format: `csv`, `parquet` or `arrow`."),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Streams the task's results to a file download.
+
+    Rows are read from the database in chunks and encoded as they arrive, so the
+    download starts immediately and memory stays flat regardless of task size.
+    """
+    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if db_task.status != models.TaskStatus.COMPLETED:
+        raise HTTPException(status_code=400, detail=f"Task status is {db_task.status}. Data is only available for 'completed' tasks.")
+    try:
+        export.check_format_available(format)
+    except ImportError:
+        raise HTTPException(status_code=501, detail=f"{format} export requires the pyarrow package.")
+
+    media_type, extension = export.EXPORT_FORMATS[format]
+    return StreamingResponse(
+        export.stream_task_export(task_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="task_{task_id}.{extension}"'},
+    )
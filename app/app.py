@@ -1,20 +1,23 @@
-from fastapi import FastAPI, Request, Depends, Form
+from fastapi import FastAPI, Request, Depends, Form, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse , JSONResponse
-from app.core.database import engine, Base, get_db
+from app.core.database import get_db
 from app.api import tasks as tasks_api
-from app.core import queue_manager
+from app.api import metrics as metrics_api
+from app.api import analytics as analytics_api
+from app.api import health as health_api
+from app.core import queue_manager, metrics, retention, admission, startup
 from sqlalchemy.orm import Session
-from app.logging.logger import logging
-from app.core.data_processor import load_and_filter_movie_csv, fetch_tmdb_movies, fetch_and_process_data
+from app.logging.logger import get_logger, sampled, setup_logging
+from app.core.data_processor import fetch_tmdb_movies
 # from app.core.utils import save_movie_records
 from typing import Optional
 from app.core import models
-import json
+import time
+from queue import Full
 
-# Create database tables if they don't exist
-Base.metadata.create_all(bind=engine)
+logger = get_logger(__name__)
 
 app = FastAPI(title="Data Sourcing and Visualization App")
 
@@ -25,19 +28,45 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 templates = Jinja2Templates(directory="app/templates")
 
 # Include API routers
-app.include_router(tasks_api.router, prefix="/api", tags=["Tasks"])
+app.include_router(tasks_api.router, tags=["Tasks"])
+app.include_router(analytics_api.router, tags=["Analytics"])
+app.include_router(metrics_api.router, tags=["Metrics"])
+app.include_router(health_api.router, tags=["Health"])
+
+# --- Metrics Middleware ---
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Records request latency labelled by the route template (not the raw path) to keep label cardinality low."""
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        metrics.observe_http_request(request.method, _route_template(request), status_code, time.perf_counter() - start)
+
+def _route_template(request: Request) -> str:
+    """The matched route's path template, e.g. /api/tasks/{task_id}/data, so metric labels stay bounded."""
+    route = request.scope.get("route")
+    return route.path if route is not None else "unmatched"
 
 # --- Event Handlers for Worker ---
 @app.on_event("startup")
 async def startup_event():
-    logging.info("Starting application and background worker...")
+    setup_logging()
+    logger.info("Starting application and background worker...")
+    startup.run_migrations()  # Tables must exist before the worker picks up a task
     queue_manager.start_worker()
+    retention.start_retention()
+    startup.start_warmup()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    logging.info("Stopping background worker...")
+    logger.info("Stopping background worker...")
     queue_manager.stop_worker()
-    logging.info("Application shutdown complete.")
+    retention.stop_retention()
+    logger.info("Application shutdown complete.")
 
 # --- Frontend Route ---
 @app.get("/", response_class=HTMLResponse, name="index")
@@ -57,10 +86,16 @@ async def submit_source_a(
     db: Session = Depends(get_db),
 ):
     """Handles form submission for Source A (CSV)."""
-    logging.info("Received request for /submit-source-a")
+    logger.info("Received request for /submit-source-a", extra=sampled("submit-source-a"))
+
+    # 0. Admission control: per-client rate limit and bounded queue
+    client = request.client.host if request.client else "unknown"
+    try:
+        admission.check_admission(client, queue_manager.task_queue.qsize())
+    except admission.AdmissionRejected as rejection:
+        raise _too_many_requests(rejection)
 
     data = await request.form()
-    print(data)
     # 1. Extract Filters
     filters = {
         "start_year": data["start_year_a"],
@@ -69,7 +104,13 @@ async def submit_source_a(
         "min_rating": data["avg_votes_a"] if "avg_votes_a" in data.keys() else None,
         "language": data["language_a"] if "language_a" in data.keys() else None,
     }
-    logging.info(f"Filters received: {filters}")
+    logger.debug("Filters received: %s", filters)
+
+    # Optional per-task deadline in seconds from submission (default TASK_DEADLINE_SECONDS)
+    try:
+        deadline_seconds = float(data["deadline_seconds"]) if data.get("deadline_seconds") else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="deadline_seconds must be a number.")
 
     db_task = models.Task(status=models.TaskStatus.PENDING, filters=filters)
     db.add(db_task)
@@ -77,9 +118,14 @@ async def submit_source_a(
     db.refresh(db_task)  # Get the task ID generated by the database
     task_id = db_task.id
     
-    queue_manager.add_task_to_queue(task_id=task_id, filters=filters)
-    logging.info(f"Created task {task_id} for Source A with filters: {filters}")
-    logging.info(f"Added task {task_id} with filters: {filters} to DB")
+    try:
+        queue_manager.add_task_to_queue(task_id=task_id, filters=filters, client=client, deadline_seconds=deadline_seconds)
+    except Full:
+        # Lost the race for the last slot; don't leave a task behind that will never run
+        db.delete(db_task)
+        db.commit()
+        raise _too_many_requests(admission.queue_full(queue_manager.task_queue.qsize()))
+    logger.info("Created task %s for Source A with filters: %s", task_id, filters)
 
 
     # # 3. Create a Task
@@ -92,7 +138,20 @@ async def submit_source_a(
     # save_movie_records(db, db_task.id, filtered_df)
 
     # 5. Redirect or Return Response
-    return JSONResponse(content={"task_id": task_id})
+    content = {"task_id": task_id}
+    estimate = queue_manager.task_progress_estimate(task_id)
+    if estimate is not None:
+        content["queue_position"], eta = estimate
+        content["eta_seconds"] = round(eta, 1)
+    return JSONResponse(content=content)
+
+
+def _too_many_requests(rejection: admission.AdmissionRejected) -> HTTPException:
+    """429 with a Retry-After header telling the client when a retry is likely to succeed."""
+    metrics.ADMISSION_REJECTIONS.labels(reason=rejection.reason).inc()
+    logger.warning("Rejected submission (%s), retry after %ss", rejection.reason, rejection.retry_after,
+                   extra=sampled("admission-" + rejection.reason))
+    return HTTPException(status_code=429, detail=rejection.detail, headers={"Retry-After": str(rejection.retry_after)})
 
 
 
@@ -106,7 +165,7 @@ async def submit_source_b(
     db: Session = Depends(get_db),
 ):
     """Handles form submission for Source B (TMDb API)."""
-    logging.info("Received request for /submit-source-b")
+    logger.info("Received request for /submit-source-b", extra=sampled("submit-source-b"))
 
     # 1. Extract Filters
     filters = {
@@ -115,13 +174,13 @@ async def submit_source_b(
         "genres_tmdb": [g.strip() for g in genres_tmdb.split(",")] if genres_tmdb else [],
         "min_rating_tmdb": min_rating_tmdb,
     }
-    logging.info(f"Filters received: {filters}")
+    logger.info("Filters received: %s", filters)
 
     # 2. Fetch and Process Data
     unified_df = fetch_tmdb_movies(filters)
 
     if unified_df is None or unified_df.empty:
-        logging.warning("No data found after filtering.")
+        logger.warning("No data found after filtering.")
         return templates.TemplateResponse(
             "index.html", {"request": request, "message": "No data found matching the filters."}
         )
@@ -131,7 +190,7 @@ async def submit_source_b(
     db.add(db_task)
     db.commit()
     db.refresh(db_task)
-    logging.info(f"Created task {db_task.id} for Source B with filters: {filters}")
+    logger.info("Created task %s for Source B with filters: %s", db_task.id, filters)
 
     # 4. Save Data to Database
     # save_movie_records(db, db_task.id, unified_df)
@@ -0,0 +1,109 @@
+# app/core/admission.py
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+from app.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Most tasks allowed to wait in the queue; submissions beyond this get 429
+MAX_QUEUE_DEPTH = int(os.getenv("MAX_QUEUE_DEPTH", "100"))
+# Per-client token bucket: sustained submissions per minute and burst size (0 disables)
+SUBMIT_RATE_PER_MINUTE = float(os.getenv("SUBMIT_RATE_PER_MINUTE", "30"))
+SUBMIT_BURST = int(os.getenv("SUBMIT_BURST", "10"))
+# Drain-rate estimate: recent completions considered, and the guess used before any have been seen
+DRAIN_WINDOW_TASKS = int(os.getenv("DRAIN_WINDOW_TASKS", "50"))
+DEFAULT_SERVICE_SECONDS = float(os.getenv("DEFAULT_SERVICE_SECONDS", "10"))
+MAX_RETRY_AFTER_SECONDS = 3600
+
+
+class AdmissionRejected(Exception):
+    """Raised when a submission must be refused; carries the Retry-After hint in whole seconds."""
+
+    def __init__(self, reason: str, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = min(max(1, math.ceil(retry_after)), MAX_RETRY_AFTER_SECONDS)
+
+
+class DrainRateTracker:
+    """Estimates how fast the worker drains the queue from the durations of recently finished tasks."""
+
+    def __init__(self, window: int, default_service_seconds: float):
+        self._durations = deque(maxlen=window)
+        self._default = default_service_seconds
+        self._lock = threading.Lock()
+
+    def record(self, duration_seconds: float):
+        with self._lock:
+            self._durations.append(duration_seconds)
+
+    def service_seconds(self) -> float:
+        """Mean time the worker spends on one task."""
+        with self._lock:
+            if not self._durations:
+                return self._default
+            return sum(self._durations) / len(self._durations)
+
+    def tasks_per_second(self) -> float:
+        return 1.0 / max(self.service_seconds(), 1e-6)
+
+    def eta_seconds(self, tasks_ahead: int) -> float:
+        """Time until a task with `tasks_ahead` tasks in front of it has finished."""
+        return (tasks_ahead + 1) * self.service_seconds()
+
+
+class ClientRateLimiter:
+    """Token bucket per client: `rate_per_minute` sustained submissions with bursts of up to `burst`."""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # client -> (tokens, last refill time)
+        self._lock = threading.Lock()
+
+    def acquire(self, client: str, now: Optional[float] = None) -> float:
+        """Takes one token. Returns 0 on success, otherwise the seconds until a token is available."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.get(client, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens < 1.0:
+                self._buckets[client] = (tokens, now)
+                return (1.0 - tokens) / self.rate
+            self._buckets[client] = (tokens - 1.0, now)
+            if len(self._buckets) > 10000:
+                self._prune(now)
+            return 0.0
+
+    def _prune(self, now: float):
+        """Forgets clients whose buckets have refilled completely; they are indistinguishable from new ones."""
+        full_after = self.burst / self.rate
+        for client, (_, last) in list(self._buckets.items()):
+            if now - last >= full_after:
+                del self._buckets[client]
+
+
+drain_tracker = DrainRateTracker(DRAIN_WINDOW_TASKS, DEFAULT_SERVICE_SECONDS)
+rate_limiter = ClientRateLimiter(SUBMIT_RATE_PER_MINUTE, SUBMIT_BURST)
+
+
+def check_admission(client: str, queue_depth: int):
+    """Raises AdmissionRejected if the client is over its rate limit or the queue is full."""
+    wait = rate_limiter.acquire(client)
+    if wait > 0:
+        raise AdmissionRejected("rate_limited", "Too many submissions from this client. Please slow down.", wait)
+    if MAX_QUEUE_DEPTH > 0 and queue_depth >= MAX_QUEUE_DEPTH:
+        raise queue_full(queue_depth)
+
+
+def queue_full(queue_depth: int) -> AdmissionRejected:
+    # One slot frees up per finished task; ask clients to come back when that is expected to happen
+    excess = queue_depth - MAX_QUEUE_DEPTH + 1
+    return AdmissionRejected("queue_full", "The task queue is full. Please retry later.", excess * drain_tracker.service_seconds())
@@ -0,0 +1,288 @@
+# app/core/analytics.py
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, List, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core import metrics, models
+from app.core.catalog import CatalogChange, add_change_listener, latest_catalog_version
+from app.core.database import engine
+from app.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Aggregation results kept per process. Keys include the catalog version, so a reload never serves old numbers.
+ANALYTICS_CACHE_ENTRIES = int(os.getenv("ANALYTICS_CACHE_ENTRIES", "512"))
+ANALYTICS_MAX_ROWS = 10000  # Groups returned by one query at most
+
+# Everything a query can name maps to fixed SQL; request values only ever reach the engine as bound parameters
+DIMENSIONS = {
+    "year": "m.year",
+    "decade": "m.year // 10 * 10",
+    "genre": "m.genre",
+    "language": "m.original_language",
+    "budget_band": "m.budget_band",  # Power of ten below the budget: 1000000 holds 1M-9.99M
+    "revenue_band": "m.revenue_band",
+}
+MEASURES = ("budget", "revenue", "vote_average", "runtime", "vote_count")
+AGGREGATES = ("count", "sum", "avg", "min", "max", "median")
+
+# Converts `snapshot` rows (from the movies table, or a catalog delta) to the engine's columnar layout
+_MOVIES_SELECT = """
+SELECT id,
+       CAST(year(TRY_CAST(release_date AS DATE)) AS INTEGER) AS year,
+       original_language,
+       CAST(budget AS BIGINT) AS budget,
+       CAST(revenue AS BIGINT) AS revenue,
+       CAST(vote_average AS DOUBLE) AS vote_average,
+       CAST(runtime AS INTEGER) AS runtime,
+       CAST(vote_count AS INTEGER) AS vote_count,
+       CASE WHEN budget > 0 THEN CAST(10 ** floor(log10(budget)) AS BIGINT) END AS budget_band,
+       CASE WHEN revenue > 0 THEN CAST(10 ** floor(log10(revenue)) AS BIGINT) END AS revenue_band,
+       CAST(in_catalog AS BOOLEAN) AS in_catalog
+FROM snapshot
+"""
+# One row per (movie, genre) with the movie's columns repeated, so genre queries scan instead of join
+_GENRES_SELECT = """
+SELECT m.*, g.genre
+FROM movies m
+JOIN (SELECT id, trim(unnest(string_split(genres, ','))) AS genre
+      FROM snapshot WHERE genres IS NOT NULL AND genres <> '') g ON g.id = m.id
+"""
+# Every movie a task may point at; in_catalog marks the ones in the current catalog version
+_SNAPSHOT_QUERY = (
+    "SELECT m.id, m.release_date, m.genres, m.original_language, m.budget, m.revenue, m.vote_average, "
+    "m.runtime, m.vote_count, c.movie_id IS NOT NULL AS in_catalog "
+    "FROM movies m LEFT JOIN catalog_movies c ON c.movie_id = m.id"
+)
+_SNAPSHOT_FIELDS = ["id", "release_date", "genres", "original_language", "budget", "revenue",
+                    "vote_average", "runtime", "vote_count"]
+
+
+class AggregateQuery(NamedTuple):
+    """A validated aggregation. Hashable, so it doubles as the cache key."""
+    group_by: Tuple[str, ...]
+    measures: Tuple[Tuple[str, Optional[str]], ...]  # (aggregate, measure); measure is None for a row count
+    start_year: Optional[int] = None
+    end_year: Optional[int] = None
+    genre: Optional[str] = None
+    language: Optional[str] = None
+    min_rating: Optional[float] = None
+    order_by: Optional[str] = None
+    descending: bool = False
+    limit: int = 1000
+
+    def column_names(self) -> List[str]:
+        return list(self.group_by) + [fn if column is None else f"{fn}_{column}" for fn, column in self.measures]
+
+
+class AggregateResult(NamedTuple):
+    catalog_version: str
+    columns: List[str]
+    rows: List[Tuple[Any, ...]]
+
+
+def parse_query(group_by: List[str], measures: List[str], order_by: Optional[str] = None, **options) -> AggregateQuery:
+    """Validates names against the whitelists. Raises ValueError with a message fit for the client.
+
+    Measures are written `count` or `<aggregate>:<column>`, e.g. `avg:revenue`.
+    """
+    unknown = [name for name in group_by if name not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown group_by {unknown}; expected any of {sorted(DIMENSIONS)}")
+    parsed = []
+    for spec in measures or ["count"]:
+        fn, _, column = spec.partition(":")
+        if fn not in AGGREGATES or (column and column not in MEASURES) or (not column and fn != "count"):
+            raise ValueError(f"Invalid measure {spec!r}; expected 'count' or '<{'|'.join(AGGREGATES)}>:<{'|'.join(MEASURES)}>'")
+        parsed.append((fn, column or None))
+    query = AggregateQuery(group_by=tuple(dict.fromkeys(group_by)), measures=tuple(dict.fromkeys(parsed)), **options)
+    if order_by is not None and order_by not in query.column_names():
+        raise ValueError(f"order_by must be one of the result columns {query.column_names()}")
+    if not 1 <= query.limit <= ANALYTICS_MAX_ROWS:
+        raise ValueError(f"limit must be between 1 and {ANALYTICS_MAX_ROWS}")
+    return query._replace(order_by=order_by)
+
+
+def build_sql(query: AggregateQuery, task_scoped: bool) -> Tuple[str, List[Any]]:
+    """SQL text and bound parameters for `query` against the engine's snapshot tables."""
+    source = "movie_genres m" if "genre" in query.group_by or query.genre else "movies m"
+    conditions, params = [], []
+    if task_scoped:
+        conditions.append("m.id IN (SELECT movie_id FROM task_ids)")
+    else:
+        conditions.append("m.in_catalog")
+    if query.start_year is not None:
+        conditions.append("m.year >= ?")
+        params.append(query.start_year)
+    if query.end_year is not None:
+        conditions.append("m.year <= ?")
+        params.append(query.end_year)
+    if query.genre:
+        conditions.append("lower(m.genre) = lower(?)")
+        params.append(query.genre)
+    if query.language:
+        conditions.append("m.original_language = ?")
+        params.append(query.language)
+    if query.min_rating is not None:
+        conditions.append("m.vote_average >= ?")
+        params.append(query.min_rating)
+
+    names = query.column_names()
+    selected = [f"{DIMENSIONS[name]} AS {name}" for name in query.group_by]
+    for (fn, column), name in zip(query.measures, names[len(query.group_by):]):
+        selected.append(f"{fn}({'*' if column is None else 'm.' + column}) AS {name}")
+    sql = f"SELECT {', '.join(selected)} FROM {source}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if query.group_by:
+        sql += " GROUP BY " + ", ".join(query.group_by)
+    order = [query.order_by] if query.order_by else list(query.group_by)
+    if order:
+        sql += " ORDER BY " + ", ".join(f"{name} {'DESC' if query.descending else 'ASC'} NULLS LAST" for name in order)
+    sql += f" LIMIT {int(query.limit)}"
+    return sql, params
+
+
+def check_available():
+    """Raises ImportError if DuckDB is not installed."""
+    import duckdb  # noqa: F401
+
+
+class AnalyticsEngine:
+    """Embedded DuckDB copy of the movies table for ad-hoc aggregations.
+
+    Catalog refreshes applied by this process are patched into the snapshot as a delta; a
+    version changed by another process triggers a full rebuild. Task-scoped queries join the
+    task's movie IDs from the database; completed results never change, so results are
+    cached by (catalog version, task, query) in a small per-process LRU.
+    """
+
+    def __init__(self, max_entries: int = ANALYTICS_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._connection = None
+        self._version = None
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, AggregateResult]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _snapshot(self, db: Session):
+        """(connection, version) for the latest catalog, copying it into DuckDB if it changed."""
+        version = latest_catalog_version(db)
+        if version is None:
+            raise LookupError("No catalog has been loaded yet")
+        with self._lock:
+            if version != self._version:
+                self._connection = self._load()
+                self._version = version
+                logger.info("Analytics snapshot rebuilt for catalog version %s", version)
+            return self._connection, self._version
+
+    def preload(self, db: Session):
+        """Builds the snapshot for the latest catalog ahead of the first query."""
+        self._snapshot(db)
+
+    def _load(self):
+        import duckdb
+        import pandas as pd
+
+        with metrics.ANALYTICS_SNAPSHOT_SECONDS.time():
+            frame = pd.read_sql_query(_SNAPSHOT_QUERY, engine)
+            connection = duckdb.connect()  # In-memory; replaced wholesale on a full rebuild
+            connection.register("snapshot", frame)
+            connection.execute(f"CREATE TABLE movies AS {_MOVIES_SELECT}")
+            connection.execute(f"CREATE TABLE movie_genres AS {_GENRES_SELECT}")
+            connection.unregister("snapshot")
+        return connection
+
+    def apply_change(self, change: CatalogChange):
+        """Catalog change listener: patches the snapshot from change.previous to change.version."""
+        import pandas as pd
+
+        with self._lock:
+            if self._connection is None or self._version != change.previous:
+                return  # Not loaded, or behind; rebuilt on the next query
+            cursor = self._connection.cursor()
+            try:
+                added = pd.DataFrame(change.added, columns=_SNAPSHOT_FIELDS).assign(in_catalog=True)
+                cursor.register("snapshot", added)
+                cursor.register("touched", pd.DataFrame({"id": pd.Series(added["id"], dtype="int64")}))
+                cursor.register("deleted", pd.DataFrame({"id": pd.Series(change.deleted_ids, dtype="int64")}))
+                cursor.execute("BEGIN TRANSACTION")
+                for table in ("movie_genres", "movies"):
+                    cursor.execute(f"DELETE FROM {table} WHERE id IN (SELECT id FROM touched)")
+                    cursor.execute(f"UPDATE {table} SET in_catalog = false WHERE id IN (SELECT id FROM deleted)")
+                cursor.execute(f"INSERT INTO movies {_MOVIES_SELECT}")
+                cursor.execute(f"INSERT INTO movie_genres {_GENRES_SELECT}")
+                cursor.execute("COMMIT")
+                self._version = change.version
+            except Exception:
+                self._version = None  # Rebuild from the database on the next query
+                raise
+            finally:
+                cursor.close()
+        logger.info("Analytics snapshot moved to catalog version %s (%s movies written, %s removed)",
+                    change.version, len(change.added), len(change.deleted_ids))
+
+    def aggregate(self, db: Session, query: AggregateQuery, task_id: Optional[int] = None) -> Tuple[AggregateResult, bool]:
+        """Runs `query` over the catalog, or over one task's results. Returns (result, served_from_cache)."""
+        import pandas as pd
+
+        connection, version = self._snapshot(db)
+        key = (version, task_id, query)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            metrics.ANALYTICS_QUERIES.labels(result="hit").inc()
+            return cached, True
+        metrics.ANALYTICS_QUERIES.labels(result="miss").inc()
+
+        sql, params = build_sql(query, task_scoped=task_id is not None)
+        with metrics.ANALYTICS_QUERY_SECONDS.time():
+            cursor = connection.cursor()  # Per-thread handle on the shared in-memory database
+            try:
+                if task_id is not None:
+                    movie_ids = [movie_id for (movie_id,) in db.query(models.TaskMovie.movie_id).filter(models.TaskMovie.task_id == task_id)]
+                    cursor.register("task_ids", pd.DataFrame({"movie_id": pd.Series(movie_ids, dtype="int64")}))
+                rows = cursor.execute(sql, params).fetchall()
+            finally:
+                cursor.close()
+
+        result = AggregateResult(version, query.column_names(), rows)
+        with self._cache_lock:
+            self._cache[key] = result
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result, False
+
+    def invalidate_task(self, task_id: int):
+        """Drops cached results of one task, e.g. when it is deleted."""
+        with self._cache_lock:
+            for key in [key for key in self._cache if key[1] == task_id]:
+                del self._cache[key]
+
+    def forget_movies(self, movie_ids: List[int]):
+        """Drops movies that were purged from the database because neither the catalog nor a task uses them."""
+        import pandas as pd
+
+        with self._lock:
+            if self._connection is None or not movie_ids:
+                return
+            cursor = self._connection.cursor()
+            try:
+                cursor.register("purged", pd.DataFrame({"id": pd.Series(movie_ids, dtype="int64")}))
+                for table in ("movie_genres", "movies"):
+                    cursor.execute(f"DELETE FROM {table} WHERE NOT in_catalog AND id IN (SELECT id FROM purged)")
+            finally:
+                cursor.close()
+
+    def clear(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+
+# Process-wide engine used by the API
+analytics_engine = AnalyticsEngine()
+add_change_listener(analytics_engine.apply_change)
@@ -0,0 +1,311 @@
+# app/core/catalog.py
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import extract
+from app.core import models
+from app.core.data_processor import load_and_filter_movie_csv
+from app.logging.logger import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+MOVIE_FIELDS = ("original_title", "release_date", "genres", "vote_average", "runtime",
+                "revenue", "budget", "vote_count", "original_language")
+INSERT_CHUNK_ROWS = 50000
+ID_CHUNK = 10000  # IDs per IN (...) list, well under SQLite's bound-parameter limit
+HASH_BLOCK_BYTES = 1 << 20
+
+_load_lock = threading.Lock()
+_loaded_version = None  # Last version this process saw in catalog_versions; skips the lookup
+_file_versions: Dict[str, tuple] = {}  # path -> (size, mtime_ns, content hash); re-hashed only when the stat changes
+_row_hashes = None  # (version, Series of row hashes by movie id) for the version this process loaded last
+_statistics = None  # (catalog version, CatalogStatistics) for the latest loaded version
+_change_listeners: List[Callable[["CatalogChange"], None]] = []
+
+
+class CatalogChange(NamedTuple):
+    """What one catalog refresh changed, for in-process structures that update incrementally."""
+    previous: Optional[str]  # Version the change applies on top of
+    version: str
+    added: List[Dict[str, Any]]  # New and updated movies, as `movies` rows
+    removed: List[Dict[str, Any]]  # Previous rows of updated and deleted movies
+    deleted_ids: List[int]
+
+
+def add_change_listener(listener: Callable[[CatalogChange], None]):
+    """Registers a callback run after each refresh this process applies (not ones applied by other processes)."""
+    _change_listeners.append(listener)
+
+
+def catalog_version(file_path: str) -> str:
+    """Version of a catalog file: a hash of its content, recomputed only when its size or mtime changes.
+
+    Touching or re-saving the file without edits therefore keeps the version, and costs one read.
+    """
+    stat = os.stat(file_path)
+    cached = _file_versions.get(file_path)
+    if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    _file_versions[file_path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def _genre_names(raw) -> str:
+    """TMDb's JSON genre list -> "Action,Comedy", the format stored on movies."""
+    return ",".join(item["name"] for item in json.loads(raw))
+
+
+def movie_rows(df) -> List[Dict[str, Any]]:
+    """Converts a standardized catalog frame into `movies` rows with plain Python values."""
+    df = df.drop_duplicates(subset="id", keep="last")
+    frame = df[["id", *MOVIE_FIELDS]].copy()
+    frame["genres"] = frame["genres"].map(_genre_names)
+    for column in ("runtime", "revenue", "budget", "vote_count"):
+        frame[column] = frame[column].astype("Int64")  # Nullable ints; the catalog stores runtime as float
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict("records")
+
+
+def row_hashes(df) -> "pd.Series":
+    """64-bit hash of each movie's stored fields, indexed by movie id.
+
+    Computed on the raw frame, so unchanged movies are recognised without converting them to rows.
+    """
+    import pandas as pd
+
+    df = df.drop_duplicates(subset="id", keep="last")
+    hashes = pd.util.hash_pandas_object(df[list(MOVIE_FIELDS)], index=False).to_numpy().view("int64")
+    return pd.Series(hashes, index=df["id"].to_numpy())
+
+
+def _chunks(ids: List[int]):
+    for start in range(0, len(ids), ID_CHUNK):
+        yield ids[start:start + ID_CHUNK]
+
+
+def _baseline_hashes(db: Session, previous: Optional[str]) -> "pd.Series":
+    """Row hashes of the current catalog: from memory if this process loaded it, else from catalog_movies."""
+    import pandas as pd
+
+    if _row_hashes is not None and _row_hashes[0] == previous:
+        return _row_hashes[1]
+    rows = db.execute(select(models.CatalogMovie.movie_id, models.CatalogMovie.row_hash)).all()
+    return pd.Series([row_hash for _, row_hash in rows], index=[movie_id for movie_id, _ in rows], dtype="int64")
+
+
+def _movies_by_id(db: Session, ids: List[int]) -> List[Dict[str, Any]]:
+    """Current `movies` rows for `ids`, as dicts."""
+    columns = [models.Movie.id] + [getattr(models.Movie, field) for field in MOVIE_FIELDS]
+    rows = []
+    for chunk in _chunks(ids):
+        rows.extend(dict(row._mapping) for row in db.execute(select(*columns).where(models.Movie.id.in_(chunk))))
+    return rows
+
+
+def _upsert_movies(db: Session, rows: List[Dict[str, Any]]):
+    """Inserts new movies and updates existing ones, looking up only the IDs being written."""
+    existing = set()
+    for chunk in _chunks([row["id"] for row in rows]):
+        existing.update(movie_id for (movie_id,) in db.query(models.Movie.id).filter(models.Movie.id.in_(chunk)))
+    new_rows = [row for row in rows if row["id"] not in existing]
+    changed_rows = [row for row in rows if row["id"] in existing]
+    for start in range(0, len(new_rows), INSERT_CHUNK_ROWS):
+        db.execute(insert(models.Movie), new_rows[start:start + INSERT_CHUNK_ROWS])
+    if changed_rows:
+        db.bulk_update_mappings(models.Movie, changed_rows)
+
+
+def _remove_movies(db: Session, ids: List[int]):
+    """Drops movies from the catalog. Their `movies` rows are deleted unless a task still points at them;
+    the retention pass deletes those once no task does."""
+    for chunk in _chunks(ids):
+        db.query(models.CatalogMovie).filter(models.CatalogMovie.movie_id.in_(chunk)).delete(synchronize_session=False)
+        db.execute(
+            text(f"DELETE FROM movies WHERE id IN ({','.join(map(str, map(int, chunk)))}) "
+                 "AND id NOT IN (SELECT movie_id FROM task_movies)")
+        )
+
+
+def _refresh(db: Session, file_path: str, version: str, previous: Optional[str]) -> CatalogChange:
+    """Diffs the file against the current catalog by movie id and writes only the differences."""
+    global _row_hashes
+    df = load_and_filter_movie_csv(file_path, {})
+    if df is None:
+        raise RuntimeError(f"Could not load movie catalog from {file_path}")
+    df = df.drop_duplicates(subset="id", keep="last")
+    hashes = row_hashes(df)
+    baseline = _baseline_hashes(db, previous)
+
+    common = hashes.index.intersection(baseline.index)
+    changed = common[hashes.loc[common].to_numpy() != baseline.loc[common].to_numpy()]
+    inserted = hashes.index.difference(baseline.index)
+    deleted = baseline.index.difference(hashes.index).tolist()
+
+    removed = _movies_by_id(db, changed.tolist() + deleted)
+    added = movie_rows(df[df["id"].isin(inserted.union(changed))])
+    _upsert_movies(db, added)
+    for start in range(0, len(inserted), INSERT_CHUNK_ROWS):
+        chunk = inserted[start:start + INSERT_CHUNK_ROWS]
+        db.execute(insert(models.CatalogMovie), [{"movie_id": int(movie_id), "row_hash": int(row_hash)}
+                                                 for movie_id, row_hash in hashes.loc[chunk].items()])
+    if len(changed):
+        db.bulk_update_mappings(models.CatalogMovie, [{"movie_id": int(movie_id), "row_hash": int(row_hash)}
+                                                      for movie_id, row_hash in hashes.loc[changed].items()])
+    _remove_movies(db, deleted)
+    # Re-loading an earlier version makes it current again; loaded_at is set here so it sorts last
+    db.merge(models.CatalogVersion(version=version, source_path=file_path, row_count=len(hashes),
+                                   loaded_at=datetime.now(timezone.utc)))
+    db.commit()
+    _row_hashes = (version, hashes)
+    logger.info("Refreshed catalog %s -> %s from %s: %s inserted, %s updated, %s deleted",
+                previous, version, file_path, len(inserted), len(changed), len(deleted))
+    return CatalogChange(previous, version, added, removed, deleted)
+
+
+def ensure_catalog_loaded(db: Session, file_path: str) -> str:
+    """Brings the shared movies table in line with the catalog at `file_path` and returns its version.
+
+    Safe to call before every task: an unchanged file costs one stat(). A changed file is diffed
+    against the loaded catalog by movie id, and only inserted, updated and deleted movies are
+    written; in-process statistics and listeners are updated with the same delta.
+    """
+    global _loaded_version
+    version = catalog_version(file_path)
+    if version == _loaded_version:
+        return version
+    with _load_lock:
+        if version == _loaded_version:
+            return version
+        previous = latest_catalog_version(db)
+        if previous != version:
+            try:
+                change = _refresh(db, file_path, version, previous)
+            except IntegrityError:
+                db.rollback()
+                if latest_catalog_version(db) != version:
+                    raise
+                logger.info("Catalog version %s was loaded concurrently by another process", version)
+            else:
+                _apply_to_statistics(change)
+                for listener in _change_listeners:
+                    try:
+                        listener(change)
+                    except Exception as e:
+                        logger.error("Catalog change listener %s failed: %s", listener, e, exc_info=True)
+        if _statistics is None or _statistics[0] != version:
+            catalog_statistics(db)  # Here, off the request path: submissions only read the cached copy
+        _loaded_version = version
+    return version
+
+
+class CatalogStatistics(NamedTuple):
+    """Per-column histograms of the movies table, used to estimate how many movies a filter matches."""
+    total: int
+    years: Dict[int, int]
+    languages: Dict[str, int]
+    ratings: Dict[float, int]  # vote_average rounded to one decimal
+
+
+def latest_catalog_version(db: Session) -> Optional[str]:
+    """Version of the most recently loaded catalog, or None before the first load."""
+    latest = db.query(models.CatalogVersion.version).order_by(models.CatalogVersion.loaded_at.desc()).first()
+    return latest.version if latest else None
+
+
+def loaded_catalog_version() -> Optional[str]:
+    """Catalog version this process last loaded or saw, without a query. None before ensure_catalog_loaded ran."""
+    return _loaded_version
+
+
+def catalog_statistics(db: Session) -> Optional[CatalogStatistics]:
+    """Histograms for the most recently loaded catalog version, computed once per version. None before the first load."""
+    global _statistics
+    version = latest_catalog_version(db)
+    if version is None:
+        return None
+    if _statistics is not None and _statistics[0] == version:
+        return _statistics[1]
+
+    year = extract("year", models.Movie.release_date)
+    rating = func.round(models.Movie.vote_average, 1)
+
+    def current(*columns):  # Movies in the current catalog, not ones kept only for older tasks
+        return db.query(*columns).join(models.CatalogMovie, models.CatalogMovie.movie_id == models.Movie.id)
+
+    stats = CatalogStatistics(
+        total=current(func.count(models.Movie.id)).scalar() or 0,
+        years={int(y): n for y, n in current(year, func.count()).group_by(year) if y is not None},
+        languages={lang: n for lang, n in current(models.Movie.original_language, func.count()).group_by(models.Movie.original_language)},
+        ratings={float(r): n for r, n in current(rating, func.count()).group_by(rating) if r is not None},
+    )
+    _statistics = (version, stats)
+    return stats
+
+
+def cached_statistics() -> Optional[CatalogStatistics]:
+    """Histograms of the catalog version this process loaded last, without touching the database.
+
+    None until the first catalog load in this process.
+    """
+    return _statistics[1] if _statistics is not None else None
+
+
+def _apply_to_statistics(change: CatalogChange):
+    """Moves the cached histograms to `change.version` by subtracting old rows and adding new ones."""
+    global _statistics
+    if _statistics is None or _statistics[0] != change.previous:
+        return  # Recomputed from the database on the next call
+    stats = _statistics[1]
+    years, languages, ratings = Counter(stats.years), Counter(stats.languages), Counter(stats.ratings)
+    for rows, sign in ((change.removed, -1), (change.added, 1)):
+        for row in rows:
+            if row["release_date"] is not None:
+                years[row["release_date"].year] += sign
+            languages[row["original_language"]] += sign
+            if row["vote_average"] is not None:
+                ratings[round(float(row["vote_average"]), 1)] += sign
+    _statistics = (change.version, CatalogStatistics(
+        total=stats.total + len(change.added) - len(change.removed),
+        years={key: n for key, n in years.items() if n > 0},
+        languages={key: n for key, n in languages.items() if n > 0},
+        ratings={key: n for key, n in ratings.items() if n > 0},
+    ))
+
+
+def estimate_matching_rows(stats: Optional[CatalogStatistics], filters: Dict[str, Any]) -> Optional[int]:
+    """Estimates how many movies load_and_filter_movie_csv will keep for `filters`.
+
+    Multiplies the selectivity of each filter, assuming the columns are independent.
+    """
+    if stats is None or stats.total == 0:
+        return None
+
+    def fraction(histogram, keep) -> float:
+        return sum(n for value, n in histogram.items() if keep(value)) / stats.total
+
+    selectivity = 1.0
+    start_year, end_year = filters.get("start_year"), filters.get("end_year")
+    if start_year or end_year:
+        low = int(start_year) if start_year else float("-inf")
+        high = int(end_year) if end_year else float("inf")
+        selectivity *= fraction(stats.years, lambda y: low <= y <= high)
+    if filters.get("min_rating"):
+        min_rating = float(filters["min_rating"])
+        selectivity *= fraction(stats.ratings, lambda r: r >= min_rating)
+    if filters.get("language"):
+        selectivity *= stats.languages.get(filters["language"], 0) / stats.total
+    return round(stats.total * selectivity)
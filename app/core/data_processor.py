@@ -1,19 +1,24 @@
 # app/core/data_processor.py
-import pandas as pd
-import requests
 import os
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
 from urllib.parse import urljoin  # To construct URLs safely
-from app.logging.logger import logging
+from app.core.environment import load_environment
+from app.logging.logger import get_logger
 import json
 
-load_dotenv()
+if TYPE_CHECKING:  # pandas and requests are imported on first use, keeping them out of web/worker startup
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+load_environment()
 
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 TMDB_BASE_URL = "https://api.themoviedb.org/3/"
-SOURCE_A_MOVIE_PATH = "data/tmdb_5000_movies.csv"  # Path to your movie CSV
+SOURCE_A_MOVIE_PATH = os.getenv("MOVIE_CATALOG_PATH", "app/data/tmdb_5000_movies.csv")  # Path to your movie CSV
+# Columns read from the movie CSV, in the order load_and_filter_movie_csv returns them
+CSV_COLUMNS = ["budget", "genres", "id", "original_language", "original_title", "release_date", "revenue", "runtime", "vote_average", "vote_count"]
 
 # --- TMDb Helper ---
 _tmdb_genre_map = None  # Cache for genre IDs to names
@@ -22,9 +27,11 @@ _tmdb_genre_map = None  # Cache for genre IDs to names
 def get_tmdb_genre_map():
     """Fetches and caches the TMDb genre ID to name mapping."""
     global _tmdb_genre_map
+    import requests
+
     if _tmdb_genre_map is None:
         if not TMDB_API_KEY:
-            logging.error("TMDB_API_KEY not configured.")
+            logger.error("TMDB_API_KEY not configured.")
             return {}
         try:
             url = urljoin(TMDB_BASE_URL, "genre/movie/list")
@@ -33,9 +40,9 @@ def get_tmdb_genre_map():
             response.raise_for_status()
             genres = response.json().get("genres", [])
             _tmdb_genre_map = {genre["id"]: genre["name"] for genre in genres}
-            logging.info(f"Fetched TMDb genre map: {_tmdb_genre_map}")
+            logger.info("Fetched TMDb genre map: %s", _tmdb_genre_map)
         except requests.exceptions.RequestException as e:
-            logging.error(f"Failed to fetch TMDb genre map: {e}")
+            logger.error("Failed to fetch TMDb genre map: %s", e)
             return {}  # Return empty map on error
     return _tmdb_genre_map
 
@@ -52,13 +59,16 @@ def map_genre_ids_to_names(genre_ids: List[int]) -> str:
 # --- Data Loading Functions ---
 
 
-def fetch_tmdb_movies(filters: Dict[str, Any]) -> Optional[pd.DataFrame]:
+def fetch_tmdb_movies(filters: Dict[str, Any]) -> Optional["pd.DataFrame"]:
     """Fetches movie data from TMDb Discover endpoint based on filters."""
+    import pandas as pd
+    import requests
+
     if not TMDB_API_KEY:
-        logging.error("Cannot fetch from TMDb: API key not set.")
+        logger.error("Cannot fetch from TMDb: API key not set.")
         return None
 
-    logging.info(f"Fetching TMDb movies with filters: {filters}")
+    logger.info("Fetching TMDb movies with filters: %s", filters)
     movies_data = []
     page = 1
     max_pages = 5  # Limit pages to avoid excessive calls in demo
@@ -99,7 +109,7 @@ def fetch_tmdb_movies(filters: Dict[str, Any]) -> Optional[pd.DataFrame]:
                 break  # Reached the end
             page += 1
 
-        logging.info(f"Fetched {len(movies_data)} raw movie entries from TMDb across {page-1} pages.")
+        logger.info("Fetched %s raw movie entries from TMDb across %s pages.", len(movies_data), page-1)
         if not movies_data:
             return pd.DataFrame()  # Return empty DataFrame
 
@@ -117,9 +127,11 @@ def fetch_tmdb_movies(filters: Dict[str, Any]) -> Optional[pd.DataFrame]:
 
             processed_list.append(
                 {
+                    "id": movie.get("id"),
                     "title": movie.get("title"),
-                    # Use original_title if title is missing? Your choice.
-                    # 'original_title': movie.get('original_title'),
+                    "original_title": movie.get("original_title"),
+                    "original_language": movie.get("original_language"),
+                    "vote_count": movie.get("vote_count"),
                     "release_date": pd.to_datetime(movie.get("release_date"), errors="coerce"),
                     "genre": genre_names,
                     "rating": movie.get("vote_average"),
@@ -131,22 +143,24 @@ def fetch_tmdb_movies(filters: Dict[str, Any]) -> Optional[pd.DataFrame]:
 
         df = pd.DataFrame(processed_list)
         df = df.dropna(subset=["title", "release_date"])  # Drop movies with critical missing info
-        logging.info(f"Processed {len(df)} valid movies from TMDb after filtering.")
+        logger.info("Processed %s valid movies from TMDb after filtering.", len(df))
         return df
 
     except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching data from TMDb: {e}", exc_info=True)
+        logger.error("Error fetching data from TMDb: %s", e, exc_info=True)
         return None
     except Exception as e:
-        logging.error(f"Error processing TMDb data: {e}", exc_info=True)
+        logger.error("Error processing TMDb data: %s", e, exc_info=True)
         return None
 
 
-def load_and_filter_movie_csv(file_path: str, filters: Dict[str, Any]) -> Optional[pd.DataFrame]:
+def load_and_filter_movie_csv(file_path: str, filters: Dict[str, Any]) -> Optional["pd.DataFrame"]:
     """Loads, filters, and standardizes movie data from the local CSV file."""
+    import pandas as pd
+
     try:
-        df = pd.read_csv(file_path)
-        logging.info(f"Loaded {len(df)} records from {file_path}")
+        df = pd.read_csv(file_path, usecols=lambda column: column in CSV_COLUMNS)  # Skip overview/keywords text
+        logger.info("Loaded %s records from %s", len(df), file_path)
 
         # Standardize columns (adjust based on your actual CSV headers)
         # rename_map = {
@@ -168,9 +182,9 @@ def load_and_filter_movie_csv(file_path: str, filters: Dict[str, Any]) -> Option
         if "release_date" in df.columns:
             df["release_date"] = pd.to_datetime(df["release_date"], errors="coerce")
         else:
-            logging.warning("CSV: No 'ReleaseDate' or 'release_date' column found.")
+            logger.warning("CSV: No 'ReleaseDate' or 'release_date' column found.")
             # Handle as needed - maybe return None or empty DF
-        print(df.columns)
+        logger.debug("CSV columns: %s", list(df.columns))
         
         df = df.dropna(subset=["original_title", "release_date" , "runtime"])  # Require title and valid date
 
@@ -181,7 +195,7 @@ def load_and_filter_movie_csv(file_path: str, filters: Dict[str, Any]) -> Option
             # df['rating'] = df['rating'] * 2
             df = df.dropna(subset=["vote_average"])  # Optionally drop rows with invalid ratings
         else:
-            logging.warning("CSV: No'vote_average' column found.")
+            logger.warning("CSV: No'vote_average' column found.")
 
         # --- Apply Filters ---
         original_count = len(df)
@@ -196,74 +210,37 @@ def load_and_filter_movie_csv(file_path: str, filters: Dict[str, Any]) -> Option
         if filters.get("language"):
             df = df[df["original_language"] == filters["language"]]
 
-        logging.info(f"CSV: Filtered from {original_count} to {len(df)} records.")
+        logger.info("CSV: Filtered from %s to %s records.", original_count, len(df))
 
         # Select final columns, ensure all exist
-        final_cols = ["budget", "genres" , "id" , "original_language", "original_title", "release_date", "revenue", "runtime", "vote_average", "vote_count"]    
-
-        return df[final_cols]  # Return with consistent column order
+        return df[CSV_COLUMNS]  # Return with consistent column order
 
     except FileNotFoundError:
-        logging.error(f"Movie CSV file not found at {file_path}")
+        logger.error("Movie CSV file not found at %s", file_path)
         return None
     except Exception as e:
-        logging.error(f"Error processing Movie CSV {file_path}: {e}", exc_info=True)
+        logger.error("Error processing Movie CSV %s: %s", file_path, e, exc_info=True)
         return None
 
 
-def fetch_and_process_data(filters: Dict[str, Any]) -> pd.DataFrame:
-    """Fetches movie data from TMDb and local CSV based on filters, merges, and returns a unified DataFrame."""
-    logging.info(f"Starting movie data fetch and processing with filters: {filters}")
+def fetch_and_process_data(filters: Dict[str, Any]) -> "pd.DataFrame":
+    """Fetches movie data from TMDb and local CSV based on filters, links duplicates across them, and returns a unified DataFrame."""
+    from app.core import linkage
 
-    # df_tmdb = fetch_tmdb_movies(filters)
-    df_csv = load_and_filter_movie_csv(SOURCE_A_MOVIE_PATH, filters)
+    logger.info("Starting movie data fetch and processing with filters: %s", filters)
 
-    valid_dfs = [df for df in [df_csv] if df is not None and not df.empty]
-
-    expected_columns = ["title", "release_date", "genre", "rating", "overview", "director", "source"]
-    if not valid_dfs:
-        logging.warning("No movie data retrieved from any source after filtering.")
-        return pd.DataFrame(columns=expected_columns)
-
-    # Ensure columns match before concat
-    for i, df in enumerate(valid_dfs):
-        for col in expected_columns:
-            if col not in df.columns:
-                df[col] = None  # Add missing columns
-        valid_dfs[i] = df[expected_columns]  # Enforce column order
-
-    try:
-        unified_df = pd.concat(valid_dfs, ignore_index=True, sort=False)
-    except Exception as e:
-        logging.error(f"Error during DataFrame concatenation: {e}", exc_info=True)
-        return pd.DataFrame(columns=expected_columns)
-
-    # --- Deduplication (Optional but Recommended) ---
-    # Simple approach: keep first occurrence based on title and year
-    if "release_date" in unified_df.columns and not unified_df.empty:
-        unified_df["year"] = unified_df["release_date"].dt.year
-        original_count = len(unified_df)
-        # Convert title to lowercase for case-insensitive matching
-        unified_df["title_lower"] = unified_df["title"].str.lower().str.strip()
-        unified_df = unified_df.sort_values(by=["source"], ascending=True)  # Prioritize one source? e.g. TMDb
-        unified_df = unified_df.drop_duplicates(subset=["title_lower", "year"], keep="first")
-        unified_df = unified_df.drop(columns=["title_lower", "year"])  # Remove helper columns
-        deduplicated_count = original_count - len(unified_df)
-        if deduplicated_count > 0:
-            logging.info(f"Removed {deduplicated_count} duplicate movie records based on title and year.")
-    else:
-        # Basic title deduplication if year is unavailable
-        original_count = len(unified_df)
-        unified_df["title_lower"] = unified_df["title"].str.lower().str.strip()
-        unified_df = unified_df.drop_duplicates(subset=["title_lower"], keep="first")
-        unified_df = unified_df.drop(columns=["title_lower"])
-        deduplicated_count = original_count - len(unified_df)
-        if deduplicated_count > 0:
-            logging.info(f"Removed {deduplicated_count} duplicate movie records based on title.")
-
-    # Final sorting
-    if "release_date" in unified_df.columns:
-        unified_df = unified_df.sort_values(by="release_date", ascending=False)
-
-    logging.info(f"Unified movie data contains {len(unified_df)} records after processing and deduplication.")
+    frames = []
+    df_csv = load_and_filter_movie_csv(SOURCE_A_MOVIE_PATH, filters)
+    if df_csv is not None and not df_csv.empty:
+        frames.append(linkage.from_csv(df_csv))
+    if TMDB_API_KEY:
+        df_tmdb = fetch_tmdb_movies(filters)
+        if df_tmdb is not None and not df_tmdb.empty:
+            frames.append(linkage.from_tmdb(df_tmdb))
+
+    if not frames:
+        logger.warning("No movie data retrieved from any source after filtering.")
+
+    unified_df = linkage.link_records(frames)
+    logger.info("Unified movie data contains %s records after processing and deduplication.", len(unified_df))
     return unified_df
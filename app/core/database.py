@@ -1,10 +1,11 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from app.core.environment import load_environment
+from app.core.metrics import instrument_engine
 
-load_dotenv() # Load environment variables from .env if it exists
+load_environment() # Load environment variables from .env if it exists
 
 # Use environment variable or default to sqlite file in project root
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./movie_app.db") # Changed default DB name
@@ -13,6 +14,17 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./movie_app.db") # Changed d
 engine = create_engine(
     DATABASE_URL, connect_args={"check_same_thread": False}
 )
+instrument_engine(engine)  # Record per-statement latency for /metrics
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _enable_incremental_vacuum(dbapi_connection, connection_record):
+        # Takes effect on a new (empty) database file, or on an existing one after its next full VACUUM.
+        # Lets the retention job give freed pages back to the filesystem a few at a time.
+        dbapi_connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # Readers don't block writers in WAL mode, so a slow export download (one long read
+        # transaction) can't lock out the worker and new submissions. Persists in the file.
+        dbapi_connection.execute("PRAGMA journal_mode = WAL")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -0,0 +1,37 @@
+# app/core/environment.py
+import os
+
+_loaded = False
+
+
+def _find_dotenv() -> str:
+    """Path of the nearest .env in this package's directory or above it, or "" if there is none.
+
+    Same search as python-dotenv's default `find_dotenv()` from a module in this package.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(directory, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return ""
+        directory = parent
+
+
+def load_environment():
+    """Loads variables from a .env file into os.environ, once per process.
+
+    Call before reading settings with os.getenv. python-dotenv is only imported when there is
+    a file to load, so processes configured through the real environment skip it at startup.
+    """
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    path = _find_dotenv()
+    if path:
+        from dotenv import load_dotenv
+
+        load_dotenv(path)
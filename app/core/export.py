@@ -0,0 +1,134 @@
+# app/core/export.py
+import csv
+import io
+import os
+from typing import Iterator, List
+from app.core import models, results
+from app.core.database import SessionLocal
+from app.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Rows fetched from SQLite and written to the output per step; bounds memory regardless of task size
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "10000"))
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that buffers whatever a writer emits until it is drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._parts.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _row_chunks(task_id: int) -> Iterator[List[tuple]]:
+    """Streams a task's result rows from the database in EXPORT_CHUNK_ROWS-sized lists.
+
+    Uses its own session: the request's session is closed before a streaming body is sent.
+    """
+    db = SessionLocal()
+    try:
+        db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+        if db_task is None:
+            # Deleted between the response headers and the first chunk: end with an empty (but valid) file
+            logger.warning("Task %s was deleted before its export started", task_id)
+            return
+        query = results.query_task_records(db, db_task, *results.RESULT_COLUMNS)
+        chunk = []
+        for row in query.yield_per(EXPORT_CHUNK_ROWS):
+            chunk.append(tuple(row))
+            if len(chunk) >= EXPORT_CHUNK_ROWS:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        db.close()
+
+
+def _stream_csv(task_id: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(results.RESULT_FIELDS)
+    yield buffer.getvalue().encode("utf-8")
+    for chunk in _row_chunks(task_id):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [value.isoformat() if field in results.DATE_FIELDS and value is not None else value
+             for field, value in zip(results.RESULT_FIELDS, row)]
+            for row in chunk
+        )
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _stream_parquet(task_id: int) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = results.arrow_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for chunk in _row_chunks(task_id):
+            writer.write_table(pa.Table.from_batches([results.rows_to_arrow_batch(chunk, schema)]))  # One row group per chunk
+            yield sink.drain()
+    finally:
+        writer.close()  # Writes the footer
+    yield sink.drain()
+
+
+def _stream_arrow(task_id: int) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    schema = results.arrow_schema()
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for chunk in _row_chunks(task_id):
+            writer.write_batch(results.rows_to_arrow_batch(chunk, schema))
+            yield sink.drain()
+    finally:
+        writer.close()  # Writes the end-of-stream marker
+    yield sink.drain()
+
+
+def stream_task_export(task_id: int, format: str) -> Iterator[bytes]:
+    """Yields the task's results encoded as `format` (csv, parquet or arrow), one chunk at a time."""
+    logger.info("Exporting task %s as %s", task_id, format)
+    if format == "csv":
+        return _stream_csv(task_id)
+    if format == "parquet":
+        return _stream_parquet(task_id)
+    return _stream_arrow(task_id)
+
+
+def check_format_available(format: str):
+    """Raises ImportError if the optional dependency for `format` is missing."""
+    if format in ("parquet", "arrow"):
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
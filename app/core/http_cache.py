@@ -0,0 +1,141 @@
+# app/core/http_cache.py
+import gzip
+import hashlib
+from typing import Any, Dict, Optional
+from fastapi import Request, Response
+from app.core.result_cache import CachedResult
+
+try:
+    import brotli  # Optional: enables "br" content-coding
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Payloads smaller than this are sent uncompressed; the header overhead isn't worth it
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Quality 11 compresses ~5% better but is an order of magnitude slower
+
+# Task results point at shared catalog movies, which a catalog refresh may update: revalidate every use
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def task_version(db_task) -> int:
+    """Version of a task's results: its last update time, which is bumped whenever the task (re)completes."""
+    stamp = db_task.updated_at or db_task.created_at
+    return int(stamp.timestamp() * 1000) if stamp else 0
+
+
+def result_etag(db_task, variant: str = "", encoding: str = "identity") -> str:
+    """Strong ETag for one representation of a task's results.
+
+    `variant` distinguishes representations of the same task (query parameters, payload
+    format, catalog version); `encoding` is part of the tag because each content-coding is
+    different bytes.
+    """
+    digest = hashlib.blake2s(variant.encode(), digest_size=6).hexdigest()
+    suffix = "" if encoding == "identity" else f"-{encoding}"
+    return f'"t{db_task.id}-v{task_version(db_task)}-{digest}{suffix}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag, as RFC 9110 requires for GET."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """Picks br, gzip or identity from an Accept-Encoding header, honouring q-values."""
+    if not accept_encoding:
+        return "identity"
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+
+    def weight(coding: str) -> float:
+        return accepted.get(coding, accepted.get("*", 0.0))
+
+    supported = (["br"] if brotli is not None else []) + ["gzip"]
+    best = max(supported, key=lambda coding: (weight(coding), coding == "br"))
+    return best if weight(best) > 0 else "identity"
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)  # mtime=0 keeps the bytes (and ETag) stable
+    return body
+
+
+def cache_headers(etag: str, encoding: str) -> dict:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": REVALIDATE_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return headers
+
+
+def not_modified(etag: str, encoding: str) -> Response:
+    """304 response carrying the same validators as the full response would."""
+    headers = cache_headers(etag, encoding)
+    headers.pop("Content-Encoding", None)
+    return Response(status_code=304, headers=headers)
+
+
+def cached_response(body: bytes, etag: str, encoding: str, media_type: str = "application/json") -> Response:
+    """Full response for an already-encoded (and possibly compressed) body."""
+    return Response(content=body, media_type=media_type, headers=cache_headers(etag, encoding))
+
+
+def request_variant(params: Dict[str, Any], *extra: str) -> str:
+    """Canonical variant key from the parsed parameters the body depends on, plus any extra discriminators.
+
+    Parameters that don't change the body (including unknown ones) must be left out of `params`,
+    so they can't split the cache and the ETag into extra entries.
+    """
+    canonical = "&".join(f"{key}={value}" for key, value in sorted(params.items()) if value is not None)
+    return "|".join((canonical,) + extra)
+
+
+def precondition_response(request: Request, db_task, variant: str) -> Optional[Response]:
+    """Returns a 304 if the client already holds the current representation, otherwise None.
+
+    Small bodies are sent uncompressed even when the client accepts gzip/br, so both the
+    negotiated and the identity tag are accepted.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    accepted = choose_encoding(request.headers.get("accept-encoding"))
+    for encoding in dict.fromkeys((accepted, "identity")):
+        etag = result_etag(db_task, variant, encoding)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, encoding)
+    return None
+
+
+def encode_body(request: Request, db_task, variant: str, body: bytes, media_type: str = "application/json") -> CachedResult:
+    """Compresses `body` if worthwhile and tags it; the result can be cached and replayed."""
+    encoding = choose_encoding(request.headers.get("accept-encoding")) if len(body) >= COMPRESS_MIN_BYTES else "identity"
+    return CachedResult(compress(body, encoding), result_etag(db_task, variant, encoding), encoding, media_type)
+
+
+def replay(request: Request, result: CachedResult) -> Response:
+    """Serves an encoded result, or a 304 if the client's If-None-Match already names it."""
+    if etag_matches(request.headers.get("if-none-match"), result.etag):
+        return not_modified(result.etag, result.encoding)
+    return cached_response(result.body, result.etag, result.encoding, result.media_type)
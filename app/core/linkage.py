@@ -0,0 +1,236 @@
+# app/core/linkage.py
+import json
+import os
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from app.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+UNIFIED_COLUMNS = ["id", "original_title", "release_date", "genres", "vote_average", "runtime",
+                   "revenue", "budget", "vote_count", "original_language", "source"]
+# Preferred source first: its values win when records are merged, and its IDs are kept
+SOURCE_PRIORITY = ("csv", "tmdb")
+STOPWORDS = frozenset({"the", "a", "an", "and", "of", "la", "le", "el", "de"})
+
+# Pairs scoring at least this are treated as the same movie
+LINKAGE_THRESHOLD = float(os.getenv("LINKAGE_THRESHOLD", "0.6"))
+# Rarest tokens of each title used as blocking keys
+BLOCKING_TOKENS = int(os.getenv("LINKAGE_BLOCKING_TOKENS", "2"))
+# Blocks larger than this are skipped; they come from tokens too common to discriminate
+MAX_BLOCK_SIZE = int(os.getenv("LINKAGE_MAX_BLOCK_SIZE", "100"))
+# Candidate pairs scored per step; bounds the size of the token/trigram join tables
+SCORE_CHUNK_PAIRS = int(os.getenv("LINKAGE_SCORE_CHUNK_PAIRS", "100000"))
+TOKEN_WEIGHT, TRIGRAM_WEIGHT = 0.3, 0.7
+YEAR_MISMATCH_PENALTY = 0.05  # Per year of difference; blocking already limits it to one
+
+
+# --- Schema mapping ---
+
+def _genre_names(raw) -> Optional[str]:
+    if not isinstance(raw, str) or not raw.startswith("["):
+        return raw if isinstance(raw, str) else None
+    return ",".join(item["name"] for item in json.loads(raw))
+
+
+def from_csv(df: pd.DataFrame) -> pd.DataFrame:
+    """Maps load_and_filter_movie_csv output (TMDb export columns, JSON genres) to the unified schema."""
+    unified = df.reindex(columns=UNIFIED_COLUMNS).copy()
+    unified["genres"] = unified["genres"].map(_genre_names)
+    unified["source"] = "csv"
+    return unified
+
+
+def from_tmdb(df: pd.DataFrame) -> pd.DataFrame:
+    """Maps fetch_tmdb_movies output (title/genre/rating columns) to the unified schema."""
+    unified = df.rename(columns={"genre": "genres", "rating": "vote_average"})
+    if "original_title" not in unified.columns or unified["original_title"].isna().all():
+        unified["original_title"] = unified.get("title")
+    unified = unified.reindex(columns=UNIFIED_COLUMNS)
+    unified["source"] = "tmdb"
+    return unified
+
+
+# --- Normalization and blocking ---
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """Lowercase ASCII titles with punctuation collapsed to single spaces ("Amélie!" -> "amelie")."""
+    return (
+        titles.fillna("").astype(str)
+        .str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+        .str.lower()
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def _tokens(normalized: pd.Series) -> pd.DataFrame:
+    """Long table of (rec, token) without stopwords, one row per distinct token of a title."""
+    tokens = normalized.str.split().explode().dropna()
+    tokens = tokens[~tokens.isin(STOPWORDS)]
+    return pd.DataFrame({"rec": tokens.index.to_numpy(), "token": tokens.to_numpy()}).drop_duplicates()
+
+
+def _trigrams(normalized: pd.Series) -> pd.DataFrame:
+    """Long table of (rec, gram) with the distinct character trigrams of each padded title."""
+    padded = " " + normalized + " "
+    grams = padded.map(lambda title: list({title[i:i + 3] for i in range(len(title) - 2)})).explode().dropna()
+    return pd.DataFrame({"rec": grams.index.to_numpy(), "gram": grams.to_numpy()})
+
+
+def _blocking_keys(tokens: pd.DataFrame, years: pd.Series) -> pd.DataFrame:
+    """(rec, key) rows: each record's rarest tokens combined with its year and the following year.
+
+    Emitting year and year+1 puts movies dated one year apart (festival vs. wide release) in a
+    shared block without comparing across wider ranges.
+    """
+    frequency = tokens["token"].map(tokens["token"].value_counts())
+    # A token only one record has can't form a pair, so the rarest *shared* tokens are used
+    shared = tokens.assign(frequency=frequency)[frequency > 1]
+    rare = shared.sort_values(["rec", "frequency"]).groupby("rec").head(BLOCKING_TOKENS)
+    year = years.reindex(rare["rec"]).to_numpy()
+    keys = []
+    for offset in (0, 1):
+        shifted = np.where(np.isnan(year), -1, year + offset).astype(int).astype(str)
+        keys.append(pd.DataFrame({"rec": rare["rec"].to_numpy(), "key": rare["token"].to_numpy() + "|" + shifted}))
+    return pd.concat(keys, ignore_index=True).drop_duplicates()
+
+
+def candidate_pairs(keys: pd.DataFrame, sources: np.ndarray = None) -> pd.DataFrame:
+    """Distinct (rec_x, rec_y) pairs, rec_x < rec_y, that share at least one block.
+
+    With `sources` (a label per record), only pairs from different sources are generated, so a
+    large source's blocks are joined against the other source instead of against themselves.
+    """
+    sizes = keys["key"].map(keys["key"].value_counts())
+    oversized = sizes > MAX_BLOCK_SIZE
+    if oversized.any():
+        logger.info("Skipping %s oversized linkage blocks", keys.loc[oversized, "key"].nunique())
+    keys = keys[(sizes > 1) & ~oversized]
+    if sources is None:
+        pairs = keys.merge(keys, on="key")
+        pairs = pairs[pairs["rec_x"] < pairs["rec_y"]]
+    else:
+        label = sources[keys["rec"].to_numpy()]
+        labels = sorted(set(label))
+        parts = [keys[label == a].merge(keys[label == b], on="key")
+                 for i, a in enumerate(labels) for b in labels[i + 1:]]
+        pairs = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["rec_x", "rec_y"])
+        low, high = np.minimum(pairs["rec_x"], pairs["rec_y"]), np.maximum(pairs["rec_x"], pairs["rec_y"])
+        pairs = pd.DataFrame({"rec_x": low, "rec_y": high})
+    return pairs[["rec_x", "rec_y"]].drop_duplicates().reset_index(drop=True)
+
+
+# --- Scoring and clustering ---
+
+def _jaccard(pairs: pd.DataFrame, items: pd.DataFrame, column: str) -> np.ndarray:
+    """Jaccard similarity of the `column` sets of each pair's two records, computed with joins."""
+    sizes = items.groupby("rec").size()
+    left = pairs.reset_index().rename(columns={"index": "pair"}).merge(items, left_on="rec_x", right_on="rec")
+    shared = left[["pair", "rec_y", column]].merge(items, left_on=["rec_y", column], right_on=["rec", column])
+    intersection = shared.groupby("pair").size().reindex(pairs.index, fill_value=0).to_numpy()
+    union = sizes.reindex(pairs["rec_x"]).fillna(0).to_numpy() + sizes.reindex(pairs["rec_y"]).fillna(0).to_numpy() - intersection
+    return np.divide(intersection, union, out=np.zeros(len(pairs)), where=union > 0)
+
+
+def score_pairs(pairs: pd.DataFrame, tokens: pd.DataFrame, trigrams: pd.DataFrame, years: pd.Series) -> np.ndarray:
+    """Similarity in [0, 1] for every candidate pair."""
+    score = TOKEN_WEIGHT * _jaccard(pairs, tokens, "token") + TRIGRAM_WEIGHT * _jaccard(pairs, trigrams, "gram")
+    year_gap = np.abs(years.reindex(pairs["rec_x"]).to_numpy() - years.reindex(pairs["rec_y"]).to_numpy())
+    return score - YEAR_MISMATCH_PENALTY * np.nan_to_num(year_gap)
+
+
+def _rows_in(frame: pd.DataFrame, other: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """Whether each row's `columns` values also occur together in a row of `other`."""
+    return pd.MultiIndex.from_frame(frame[columns]).isin(pd.MultiIndex.from_frame(other[columns]))
+
+
+def one_to_one(rec_x: np.ndarray, rec_y: np.ndarray, strength: np.ndarray, sources: np.ndarray) -> np.ndarray:
+    """Mask of the links to keep so every record links to at most one record of each other source.
+
+    Greedy by strength (ties go to the earlier link), in rounds: each round keeps the links that
+    are the strongest remaining link of both their records, then drops the links those records
+    can no longer take. Without this, one record similar to several movies of the other source
+    would merge them all into one cluster.
+    """
+    src_x, src_y = sources[rec_x], sources[rec_y]
+    swap = src_x > src_y  # Orient every link the same way, so each record is always on one side
+    links = pd.DataFrame({
+        "rec_x": np.where(swap, rec_y, rec_x), "rec_y": np.where(swap, rec_x, rec_y),
+        "src_x": np.where(swap, src_y, src_x), "src_y": np.where(swap, src_x, src_y),
+        "strength": strength,
+    }).sort_values("strength", ascending=False, kind="stable")
+    keep = np.zeros(len(links), dtype=bool)
+    while not links.empty:
+        best = (~links.duplicated(["rec_x", "src_y"]) & ~links.duplicated(["rec_y", "src_x"])).to_numpy()
+        taken = links[best]
+        keep[taken.index] = True
+        # A record that got a partner from a source takes no other link to that source
+        links = links[~best]
+        links = links[~_rows_in(links, taken, ["rec_x", "src_y"]) & ~_rows_in(links, taken, ["rec_y", "src_x"])]
+    return keep
+
+
+def connected_components(n: int, rec_x: np.ndarray, rec_y: np.ndarray) -> np.ndarray:
+    """Cluster label per record for the graph of matched pairs (min-label propagation with pointer jumping)."""
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[rec_x], labels[rec_y])
+        updated = labels.copy()
+        np.minimum.at(updated, rec_x, low)
+        np.minimum.at(updated, rec_y, low)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def link_records(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Unifies already-mapped source frames into one row per distinct movie.
+
+    Candidate pairs come from blocking on (rare title token, release year) and are scored with
+    joins over title tokens and character trigrams, so cost grows with the number of candidate
+    pairs (near-linear in the input) instead of comparing every record with every other.
+
+    Records linked by score (or by an identical catalog ID from different sources) are merged:
+    the preferred source's values win and missing fields are filled from the other records.
+    Links are one-to-one per pair of sources, so two movies of one source are never merged.
+    """
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=UNIFIED_COLUMNS + ["sources"])
+    records = pd.concat(frames, ignore_index=True)
+    records["release_date"] = pd.to_datetime(records["release_date"], errors="coerce")
+    years = records["release_date"].dt.year.astype(float)
+
+    normalized = normalize_titles(records["original_title"])
+    tokens = _tokens(normalized)
+    trigrams = _trigrams(normalized)
+    # Entries within one source are distinct by definition, so only cross-source pairs are scored
+    pairs = candidate_pairs(_blocking_keys(tokens, years), records["source"].to_numpy())
+    scores = [score_pairs(pairs.iloc[i:i + SCORE_CHUNK_PAIRS], tokens, trigrams, years)
+              for i in range(0, len(pairs), SCORE_CHUNK_PAIRS)]
+    scores = np.concatenate(scores) if scores else np.zeros(0)
+    matched, scores = pairs[scores >= LINKAGE_THRESHOLD], scores[scores >= LINKAGE_THRESHOLD]
+
+    # Sources that share the TMDb ID namespace link on the ID directly
+    with_id = records[records["id"].notna()]
+    by_id = with_id.reset_index().merge(with_id.reset_index(), on="id")
+    by_id = by_id[(by_id["index_x"] < by_id["index_y"]) & (by_id["source_x"] != by_id["source_y"])]
+    rec_x = np.concatenate([matched["rec_x"].to_numpy(), by_id["index_x"].to_numpy()]).astype(int)
+    rec_y = np.concatenate([matched["rec_y"].to_numpy(), by_id["index_y"].to_numpy()]).astype(int)
+    strength = np.concatenate([scores, np.full(len(by_id), np.inf)])  # A shared ID beats any title score
+    keep = one_to_one(rec_x, rec_y, strength, records["source"].to_numpy())
+    rec_x, rec_y = rec_x[keep], rec_y[keep]
+
+    records["cluster"] = connected_components(len(records), rec_x, rec_y)
+    records["priority"] = records["source"].map({source: rank for rank, source in enumerate(SOURCE_PRIORITY)})
+    records = records.sort_values(["cluster", "priority"], kind="stable")
+    sources = records.groupby("cluster")["source"].agg(lambda s: ",".join(dict.fromkeys(s)))
+    unified = records.groupby("cluster")[UNIFIED_COLUMNS].first()  # First non-null value per column
+    unified["sources"] = sources
+
+    logger.info("Linked %s records into %s movies (%s candidate pairs, %s matches)",
+                len(records), len(unified), len(pairs), len(rec_x))
+    return unified.sort_values(by="release_date", ascending=False).reset_index(drop=True)
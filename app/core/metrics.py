@@ -0,0 +1,214 @@
+# app/core/metrics.py
+import os
+import time
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    CONTENT_TYPE_LATEST,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event, text
+from app.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# When PROMETHEUS_MULTIPROC_DIR is set (e.g. several uvicorn/gunicorn workers),
+# prometheus_client writes every sample to mmap'd files in that directory and the
+# /metrics endpoint aggregates them with a MultiProcessCollector.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Buckets in seconds, tuned for a pipeline whose stages range from ms to minutes
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# --- Queue / Worker ---
+QUEUE_DEPTH = Gauge(
+    "movie_app_queue_depth",
+    "Number of tasks waiting in the in-memory task queue.",
+    multiprocess_mode="livesum",
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "movie_app_queue_wait_seconds",
+    "Time tasks spent queued before the worker picked them up, by scheduling class.",
+    ["priority"],
+    buckets=STAGE_BUCKETS,
+)
+ADMISSION_REJECTIONS = Counter(
+    "movie_app_admission_rejections_total",
+    "Task submissions refused with 429, by reason (queue_full/rate_limited).",
+    ["reason"],
+)
+TASK_STATUS_TRANSITIONS = Counter(
+    "movie_app_task_status_transitions_total",
+    "Number of times a task moved into the given status.",
+    ["status"],
+)
+TASK_STAGE_SECONDS = Histogram(
+    "movie_app_task_stage_seconds",
+    "Time spent in each stage of the task pipeline.",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+WORKER_SECONDS = Counter(
+    "movie_app_worker_seconds_total",
+    "Time the background worker spent busy (processing) or idle (waiting for work).",
+    ["state"],
+)
+ROWS_INGESTED = Counter(
+    "movie_app_rows_ingested_total",
+    "Number of movie rows written to the database by the worker.",
+)
+
+# --- Result Cache ---
+RESULT_CACHE_REQUESTS = Counter(
+    "movie_app_result_cache_requests_total",
+    "Lookups in the in-process result cache by outcome (hit/miss).",
+    ["result"],
+)
+RESULT_CACHE_EVICTIONS = Counter(
+    "movie_app_result_cache_evictions_total",
+    "Entries evicted from the result cache to stay within its byte budget.",
+)
+RESULT_CACHE_BYTES = Gauge(
+    "movie_app_result_cache_bytes",
+    "Bytes of response bodies held in the result cache.",
+    multiprocess_mode="livesum",
+)
+RESULT_CACHE_ENTRIES = Gauge(
+    "movie_app_result_cache_entries",
+    "Number of responses held in the result cache.",
+    multiprocess_mode="livesum",
+)
+
+# --- Retention ---
+RETENTION_DELETED = Counter(
+    "movie_app_retention_deleted_total",
+    "Rows deleted by the retention job, by kind (tasks/result_rows/movies).",
+    ["kind"],
+)
+RETENTION_RECLAIMED_BYTES = Counter(
+    "movie_app_retention_reclaimed_bytes_total",
+    "Bytes returned to the filesystem by the retention job's incremental vacuum.",
+)
+RETENTION_PASS_SECONDS = Histogram(
+    "movie_app_retention_pass_seconds",
+    "Duration of a full retention pass (deletes, vacuum and analyze).",
+    buckets=STAGE_BUCKETS,
+)
+
+# --- Analytics ---
+ANALYTICS_QUERIES = Counter(
+    "movie_app_analytics_queries_total",
+    "Aggregation queries by outcome of the analytics result cache (hit/miss).",
+    ["result"],
+)
+ANALYTICS_QUERY_SECONDS = Histogram(
+    "movie_app_analytics_query_seconds",
+    "Latency of aggregation queries executed by the analytics engine (cache misses only).",
+    buckets=DB_BUCKETS,
+)
+ANALYTICS_SNAPSHOT_SECONDS = Histogram(
+    "movie_app_analytics_snapshot_seconds",
+    "Time to copy a catalog version into the analytics engine.",
+    buckets=STAGE_BUCKETS,
+)
+
+# --- Database / HTTP ---
+DB_STATEMENT_SECONDS = Histogram(
+    "movie_app_db_statement_seconds",
+    "Latency of SQL statements executed through the SQLAlchemy engine.",
+    ["operation"],
+    buckets=DB_BUCKETS,
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "movie_app_http_request_seconds",
+    "Latency of HTTP requests by method, route template and status code.",
+    ["method", "route", "status"],
+    buckets=HTTP_BUCKETS,
+)
+
+
+class TaskStatusCollector:
+    """Reports the current number of tasks per status, read from the shared database at scrape time.
+
+    Counting in the database (rather than in process memory) keeps the numbers correct
+    no matter how many API or worker processes are running.
+    """
+
+    def describe(self):
+        # Returning no descriptors stops the registry from calling collect() (and the DB) at registration
+        return []
+
+    def collect(self):
+        from app.core.database import SessionLocal  # Imported lazily to avoid a circular import
+
+        gauge = GaugeMetricFamily("movie_app_tasks", "Current number of tasks by status.", labels=["status"])
+        db = SessionLocal()
+        try:
+            rows = db.execute(text("SELECT status, COUNT(*) FROM tasks GROUP BY status")).all()
+            for status, count in rows:
+                gauge.add_metric([str(status)], count)
+        except Exception as e:
+            logger.warning("Could not collect task status metrics: %s", e)
+        finally:
+            db.close()
+        yield gauge
+
+
+_task_status_collector = TaskStatusCollector()
+if not MULTIPROC_DIR:
+    REGISTRY.register(_task_status_collector)
+
+
+def _statement_operation(statement: str) -> str:
+    """Returns the leading SQL keyword (SELECT, INSERT, ...) used as a low-cardinality label."""
+    head = statement.lstrip().split(None, 1)
+    return head[0].upper() if head else "UNKNOWN"
+
+
+def instrument_engine(engine):
+    """Attaches cursor-execute listeners that record statement latency for the given engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start_time"].pop()
+        DB_STATEMENT_SECONDS.labels(operation=_statement_operation(statement)).observe(time.perf_counter() - start)
+
+
+def observe_http_request(method: str, route: str, status: int, duration: float):
+    """Records one HTTP request in the latency histogram."""
+    HTTP_REQUEST_SECONDS.labels(method=method, route=route, status=str(status)).observe(duration)
+
+
+def render_latest():
+    """Renders all metrics in the Prometheus text exposition format.
+
+    Returns a (payload, content_type) tuple.
+    """
+    if not MULTIPROC_DIR:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+    from prometheus_client import multiprocess
+
+    # A fresh registry per scrape, as required by the multiprocess collector
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(_task_status_collector)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Cleans up live gauges of an exited worker process (call from the process manager's child_exit hook)."""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
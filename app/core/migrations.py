@@ -0,0 +1,76 @@
+# app/core/migrations.py
+"""Schema setup, run as an explicit step instead of as a side effect of importing the app.
+
+The web app runs it on startup unless AUTO_MIGRATE=0; deployments that start several
+processes can run it once beforehand instead:
+
+    python -m app.core.migrations
+"""
+import time
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from app.core import models  # Also registers the tables on Base
+from app.core.database import Base, engine
+from app.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _tasks_autoincrement(connection: Connection):
+    """Rebuilds a `tasks` table created without AUTOINCREMENT, so SQLite stops reusing deleted task IDs.
+
+    legacy_alter_table keeps the rename from rewriting task_movies' foreign key to the old name.
+    """
+    sql = connection.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tasks'")).scalar()
+    if sql is None or "AUTOINCREMENT" in sql.upper():
+        return
+    columns = ", ".join(column.name for column in models.Task.__table__.columns)
+    indexes = connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tasks' "
+                                      "AND sql IS NOT NULL")).scalars().all()
+    for name in indexes:
+        connection.execute(text(f'DROP INDEX "{name}"'))
+    connection.execute(text("PRAGMA legacy_alter_table = ON"))
+    connection.execute(text("ALTER TABLE tasks RENAME TO _tasks_without_autoincrement"))
+    connection.execute(text("PRAGMA legacy_alter_table = OFF"))
+    models.Task.__table__.create(connection)
+    connection.execute(text(f"INSERT INTO tasks ({columns}) SELECT {columns} FROM _tasks_without_autoincrement"))
+    connection.execute(text("DROP TABLE _tasks_without_autoincrement"))
+    logger.info("Rebuilt the tasks table with AUTOINCREMENT")
+
+
+def _backfill_movie_records(connection: Connection):
+    """Moves results stored as per-task `movie_records` copies into `movies` + `task_movies`, then drops the table.
+
+    The copies carry no catalog ID, so each becomes its own movie under the negated record ID, which
+    can't collide with catalog IDs. They stay outside the catalog and are deleted by retention along
+    with their task.
+    """
+    if not inspect(connection).has_table("movie_records"):
+        return
+    columns = ", ".join(column.name for column in models.Movie.__table__.columns if column.name != "id")
+    moved = connection.execute(text(f"INSERT INTO movies (id, {columns}) SELECT -id, {columns} FROM movie_records "
+                                    "WHERE task_id IS NOT NULL")).rowcount
+    connection.execute(text("INSERT INTO task_movies (task_id, movie_id) SELECT task_id, -id FROM movie_records "
+                            "WHERE task_id IS NOT NULL"))
+    connection.execute(text("DROP TABLE movie_records"))
+    logger.info("Moved %s legacy movie_records rows into task_movies", moved)
+
+
+def migrate(bind: Engine = engine):
+    """Creates missing tables and indexes and upgrades older schemas. Safe to re-run."""
+    start = time.perf_counter()
+    if bind.dialect.name == "sqlite":
+        with bind.begin() as connection:
+            _tasks_autoincrement(connection)
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as connection:
+        _backfill_movie_records(connection)
+    logger.info("Database schema is up to date (%.3fs)", time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    from app.logging.logger import setup_logging
+
+    setup_logging()
+    migrate()
+    print(f"Database schema is up to date: {engine.url.render_as_string(hide_password=True)}")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, JSON
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Float, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -9,9 +9,13 @@ class TaskStatus(str, enum.Enum):
     IN_PROGRESS = "in progress"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed out"
 
 class Task(Base):
     __tablename__ = "tasks"
+    # IDs are never reused after a delete: URLs, ETags and caches keyed by task ID stay unambiguous
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     status = Column(String, default=TaskStatus.PENDING, index=True)
@@ -19,14 +23,14 @@ class Task(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     filters = Column(JSON)
 
-    # Relationship to link MovieRecords back to this task
-    movie_records = relationship("MovieRecord", back_populates="task")
+    # Movies that matched this task's filters; the rows themselves live once in the shared catalog
+    movies = relationship("Movie", secondary="task_movies", viewonly=True)
 
-class MovieRecord(Base):
-    __tablename__ = "movie_records"
+class Movie(Base):
+    """One row per movie in the catalog, keyed by the catalog's own movie ID and shared by every task."""
+    __tablename__ = "movies"
 
-    id = Column(Integer, index=True , primary_key=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), index=True) # Foreign Key
+    id = Column(Integer, primary_key=True, autoincrement=False) # Catalog ID; negative for results migrated from movie_records
 
     original_title = Column(String)
     release_date = Column(DateTime(timezone=True))
@@ -38,5 +42,29 @@ class MovieRecord(Base):
     vote_count = Column(Integer)
     original_language = Column(String)
 
-    # Relationship back to the Task
-    task = relationship("Task", back_populates="movie_records")
\ No newline at end of file
+class TaskMovie(Base):
+    """Membership of a movie in a task's result set: two integers per row instead of a copy of the movie."""
+    __tablename__ = "task_movies"
+    __table_args__ = {"sqlite_with_rowid": False} # The composite key is the table; no separate rowid B-tree
+
+    task_id = Column(Integer, ForeignKey("tasks.id"), primary_key=True)
+    movie_id = Column(Integer, ForeignKey("movies.id"), primary_key=True)
+
+class CatalogMovie(Base):
+    """Membership of a movie in the current catalog version, with a hash of its row for change detection.
+
+    Movies removed from the catalog lose this row but stay in `movies` while a task still points at them.
+    """
+    __tablename__ = "catalog_movies"
+
+    movie_id = Column(Integer, ForeignKey("movies.id"), primary_key=True, autoincrement=False)
+    row_hash = Column(BigInteger, nullable=False)
+
+class CatalogVersion(Base):
+    """A catalog file version that has been loaded into `movies`; the latest `loaded_at` is the current one."""
+    __tablename__ = "catalog_versions"
+
+    version = Column(String, primary_key=True) # Hash of the file's content
+    source_path = Column(String)
+    row_count = Column(Integer)
+    loaded_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,25 +1,45 @@
-import asyncio
-from queue import Queue as SyncQueue # Standard sync queue
+from queue import Empty, Full
 from threading import Thread, Event
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Set, Tuple
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from . import models, schemas
+from . import models
 from .database import SessionLocal
 import time # For simulation
-from app.logging.logger import logging
+from app.logging.logger import get_logger
 import enum
-from app.core.data_processor import load_and_filter_movie_csv
-import json
+from app.core.data_processor import load_and_filter_movie_csv, SOURCE_A_MOVIE_PATH
+from app.core import metrics
+from app.core.admission import MAX_QUEUE_DEPTH, drain_tracker
+from app.core.catalog import cached_statistics, ensure_catalog_loaded, estimate_matching_rows
+from app.core.scheduler import TaskScheduler, classify
+from app.core.result_cache import result_cache
+import os
 
-# Use a standard thread-safe queue for simplicity with background threads
-task_queue = SyncQueue()
+logger = get_logger(__name__)
+
+# Thread-safe scheduler with the queue.Queue interface the worker uses: cheap (interactive) tasks
+# first, clients served round-robin, aged batch tasks promoted. Bounded so a burst of
+# submissions can't build a backlog that takes hours to drain.
+task_queue = TaskScheduler(maxsize=MAX_QUEUE_DEPTH)
 stop_event = Event() # To signal the worker thread to stop
+current_task = None # (task_id, start time) of the task the worker is running, for ETAs
+cancel_requests: Set[int] = set() # Tasks cancelled through this process, checked by the worker without a DB round trip
+
+# Artificial pauses before and after loading the CSV (set to 0 for benchmarks/load tests)
+SIMULATED_DELAY_SECONDS = float(os.getenv("SIMULATED_DELAY_SECONDS", "5"))
+# Default time from submission after which a task is abandoned as timed out (0 disables)
+TASK_DEADLINE_SECONDS = float(os.getenv("TASK_DEADLINE_SECONDS", "600"))
+# Result rows inserted between cancellation checks
+SAVE_CHUNK_ROWS = int(os.getenv("SAVE_CHUNK_ROWS", "10000"))
 
 class TaskStatus(str, enum.Enum):
     PENDING = "pending"
     IN_PROGRESS = "in progress"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed out"
 
 def create_task(db: Session, filters: Dict[str, Any]):
     """Creates a new task in the database."""
@@ -29,106 +49,205 @@ def create_task(db: Session, filters: Dict[str, Any]):
     db.refresh(db_task)
     return db_task.status
     
-def update_task_status(db: Session, task_id: int, status: models.TaskStatus, error_message: str = None):
-    """Updates the status of a task in the database."""
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if db_task:
-        db_task.status = status
-        # Optionally store error message if failed
-        # if error_message: db_task.error = error_message # Add an 'error' field to model if needed
+def update_task_status(db: Session, task_id: int, status: models.TaskStatus, error_message: str = None,
+                       expected: Tuple[models.TaskStatus, ...] = None, commit: bool = True) -> bool:
+    """Updates the status of a task in the database.
+
+    With `expected`, the update only happens if the task is currently in one of those statuses
+    (compare-and-set), so a cancelled task is never flipped back to completed. Returns whether
+    the task was updated.
+    """
+    query = db.query(models.Task).filter(models.Task.id == task_id)
+    if expected is not None:
+        query = query.filter(models.Task.status.in_([s.value for s in expected]))
+    # Optionally store error message if failed
+    # if error_message: db_task.error = error_message # Add an 'error' field to model if needed
+    updated = query.update({models.Task.status: getattr(status, "value", status)}, synchronize_session=False)
+    if not updated:
+        if expected is None:
+            logger.error("Task %s not found for status update.", task_id)
+        return False
+    if commit:
         db.commit()
-        logging.info(f"Task {task_id} status updated to {status}")
-    else:
-        logging.error(f"Task {task_id} not found for status update.")
-
-def save_movie_records(db: Session, task_id: int, records_df):
-    """Saves processed data records to the database."""
-    records_to_insert = []
-    for _, row in records_df.iterrows():
-        record_data = schemas.MovieRecordCreate(
-            task_id = task_id,
-            original_title = row["original_title"],
-            release_date = row["release_date"], 
-            genres = ",".join([item["name"] for item in json.loads(row["genres"])]), 
-            vote_average = row["vote_average"],
-            runtime =  row["runtime"] , 
-            revenue = row["revenue"],
-            budget = row["budget"],
-            vote_count = row["vote_count"],
-            original_language = row["original_language"]
-        )
-        records_to_insert.append(models.MovieRecord(**record_data.dict())) # For Pydantic V1
-
-    if records_to_insert:
-        db.bulk_save_objects(records_to_insert)
+    result_cache.invalidate_task(task_id)  # A re-run or failure makes previously cached results stale
+    metrics.TASK_STATUS_TRANSITIONS.labels(status=getattr(status, "value", status)).inc()
+    logger.info("Task %s status updated to %s", task_id, status)
+    return True
+
+class TaskCancelled(Exception):
+    """Raised at a checkpoint when the task was cancelled or ran past its deadline."""
+
+    def __init__(self, status: models.TaskStatus):
+        super().__init__(status.value)
+        self.status = status
+
+def checkpoint(db: Session, task_id: int, deadline: Optional[float] = None, check_db: bool = True):
+    """Raises TaskCancelled if the task has been cancelled or its deadline has passed.
+
+    Cancellations requested in this process are seen immediately; `check_db` also picks up
+    ones made through another process (skip it inside the insert transaction).
+    """
+    if deadline is not None and time.time() > deadline:
+        raise TaskCancelled(models.TaskStatus.TIMED_OUT)
+    if task_id in cancel_requests:
+        raise TaskCancelled(models.TaskStatus.CANCELLED)
+    if check_db:
+        status = db.query(models.Task.status).filter(models.Task.id == task_id).scalar()
+        if status == models.TaskStatus.CANCELLED.value:
+            raise TaskCancelled(models.TaskStatus.CANCELLED)
+
+def _cancellable_sleep(db: Session, task_id: int, deadline: Optional[float], seconds: float):
+    """time.sleep that wakes up for cancellations and deadlines."""
+    end = time.monotonic() + seconds
+    while (remaining := end - time.monotonic()) > 0:
+        checkpoint(db, task_id, deadline, check_db=False)
+        time.sleep(min(remaining, 0.1))
+    checkpoint(db, task_id, deadline)
+
+def save_movie_records(db: Session, task_id: int, records_df, on_chunk: Callable[[], None] = None, commit: bool = True):
+    """Saves a task's result set as (task_id, movie_id) pairs; the movies themselves are in the shared catalog.
+
+    Inserts in SAVE_CHUNK_ROWS chunks and calls `on_chunk` between them (it may raise to abort).
+    With commit=False the caller owns the transaction and can roll the partial write back.
+    """
+    if records_df is None or records_df.empty:
+        return
+    movie_ids = records_df["id"].drop_duplicates().tolist()
+    for start in range(0, len(movie_ids), SAVE_CHUNK_ROWS):
+        if on_chunk is not None:
+            on_chunk()
+        chunk = movie_ids[start:start + SAVE_CHUNK_ROWS]
+        db.execute(insert(models.TaskMovie), [{"task_id": task_id, "movie_id": movie_id} for movie_id in chunk])
+    if commit:
         db.commit()
-        logging.info(f"Saved {len(records_to_insert)} records for task {task_id}")
+    metrics.ROWS_INGESTED.inc(len(movie_ids))
+    logger.info("Saved %s records for task %s", len(movie_ids), task_id)
+
+def process_task(task_id: int, filters: Dict[str, Any], deadline: Optional[float] = None):
+    """Runs the full pipeline for one task: load and filter the catalog, save the records, update status.
+
+    Checks for cancellation and the deadline (a time.time() value) between stages and between
+    insert chunks; the records and the final status are committed together or not at all.
+    """
+    # Need a new DB session per task/thread
+    db = SessionLocal()
+    try:
+        # 1. Update status to "in progress" (unless it was cancelled while queued)
+        checkpoint(db, task_id, deadline)
+        if not update_task_status(db, task_id, models.TaskStatus.IN_PROGRESS, expected=(models.TaskStatus.PENDING,)):
+            logger.info("Task %s is no longer pending; skipping.", task_id)
+            return
+
+        # 2. Simulate initial delay
+        _cancellable_sleep(db, task_id, deadline, SIMULATED_DELAY_SECONDS) # Simulate work
+
+        # 3. Fetch and process data
+        logger.info("Fetching data for task %s...", task_id)
+
+        # Load and Filter CSV
+        with metrics.TASK_STAGE_SECONDS.labels(stage="load_csv").time():
+            filtered_df = load_and_filter_movie_csv(SOURCE_A_MOVIE_PATH, filters)
+        checkpoint(db, task_id, deadline)
+
+        if filtered_df is None or filtered_df.empty:
+            logger.warning("No data found after filtering.")
+
+        # processed_data_df = fetch_and_process_data(task_id , filters) # Pass filters directly
+
+        # Make sure the movies this task points at are in the shared catalog table
+        with metrics.TASK_STAGE_SECONDS.labels(stage="load_catalog").time():
+            ensure_catalog_loaded(db, SOURCE_A_MOVIE_PATH)
+
+        # 4. Simulate processing delay
+        _cancellable_sleep(db, task_id, deadline, SIMULATED_DELAY_SECONDS) # Simulate DB insertion / more work
+
+        # 5. Save data to DB, in one transaction with the final status
+        with metrics.TASK_STAGE_SECONDS.labels(stage="save_records").time():
+            save_movie_records(db, task_id, filtered_df, commit=False,
+                               on_chunk=lambda: checkpoint(db, task_id, deadline, check_db=False))
+        checkpoint(db, task_id, deadline, check_db=False)
+
+        # 6. Update status to "completed"
+        if update_task_status(db, task_id, models.TaskStatus.COMPLETED, expected=(models.TaskStatus.IN_PROGRESS,)):
+            logger.info("Task %s completed successfully.", task_id)
+        else:
+            db.rollback() # Cancelled through another process while saving
+            logger.info("Task %s was cancelled while saving; discarded its records.", task_id)
+
+    except TaskCancelled as e:
+        db.rollback() # Discard any uncommitted records
+        update_task_status(db, task_id, e.status, expected=(models.TaskStatus.PENDING, models.TaskStatus.IN_PROGRESS))
+        logger.info("Task %s stopped: %s", task_id, e.status.value)
+    except Exception as e:
+        logger.error("Error processing task %s: %s", task_id, e, exc_info=True)
+        db.rollback()
+        # Update status to "failed"
+        update_task_status(db, task_id, models.TaskStatus.FAILED, error_message=str(e))
+    finally:
+        cancel_requests.discard(task_id)
+        db.close() # Ensure session is closed
+
+def cancel_task(db: Session, task_id: int) -> bool:
+    """Cancels a pending or running task. Returns False if it had already finished.
+
+    A queued task is dropped from the queue; a running one stops at its next checkpoint and
+    rolls back whatever it had written.
+    """
+    cancel_requests.add(task_id) # Seen by this process's worker before the status update below can wait on its write lock
+    removed = task_queue.remove(task_id)
+    if removed:
+        metrics.QUEUE_DEPTH.set(task_queue.qsize())
+    cancelled = update_task_status(db, task_id, models.TaskStatus.CANCELLED,
+                                   expected=(models.TaskStatus.PENDING, models.TaskStatus.IN_PROGRESS))
+    if removed or not cancelled:
+        cancel_requests.discard(task_id) # Nothing in this process will run it
+    return cancelled
 
 def task_worker():
     """Worker function to process tasks from the queue."""
-    logging.info("Task worker started.")
+    global current_task
+    logger.info("Task worker started.")
     while not stop_event.is_set():
         try:
             # Get task from queue, block for 1 second if empty, then check stop_event
-            if task_queue.empty():
+            idle_start = time.perf_counter()
+            try:
+                task_info = task_queue.get(block=True, timeout=1)
+            except Empty:
                 continue
-            task_info = task_queue.get(block=True, timeout=1)
+            finally:
+                metrics.WORKER_SECONDS.labels(state="idle").inc(time.perf_counter() - idle_start)
+                metrics.QUEUE_DEPTH.set(task_queue.qsize())
             if task_info is None: # Allow graceful shutdown
+                task_queue.task_done()
                 continue
 
             task_id = task_info["task_id"]
             filters = task_info["filters"]
-            logging.info(f"Processing task {task_id} with filters: {filters}")
+            logger.info("Processing task %s with filters: %s", task_id, filters)
+            busy_start = time.perf_counter()
+            current_task = (task_id, busy_start)
+            if "enqueued_at" in task_info:
+                waited = time.time() - task_info["enqueued_at"]
+                metrics.TASK_STAGE_SECONDS.labels(stage="queue_wait").observe(waited)
+                metrics.QUEUE_WAIT_SECONDS.labels(priority=task_info.get("priority", "batch")).observe(waited)
 
-            # Need a new DB session per task/thread
-            db = SessionLocal()
             try:
-
-                # create_task(db, filters)
-                # logging.info(f"Added task {task_id} with filters: {filters} to DB")
-
-                # 1. Update status to "in progress"
-                update_task_status(db, task_id, models.TaskStatus.IN_PROGRESS)
-
-                # 2. Simulate initial delay
-                time.sleep(5) # Simulate work
-
-                # 3. Fetch and process data
-                logging.info(f"Fetching data for task {task_id}...")
-                
-                # 2. Load and Filter CSV
-                file_path = "app/data/tmdb_5000_movies.csv"  
-                filtered_df = load_and_filter_movie_csv(file_path, filters)
-
-                if filtered_df is None or filtered_df.empty:
-                    logging.warning("No data found after filtering.")
-                    
-                # processed_data_df = fetch_and_process_data(task_id , filters) # Pass filters directly
-
-                # 4. Simulate processing delay
-                time.sleep(5) # Simulate DB insertion / more work
-
-                # 5. Save data to DB
-                save_movie_records(db, task_id, filtered_df)
-
-                # 6. Update status to "completed"
-                update_task_status(db, task_id, models.TaskStatus.COMPLETED)
-                logging.info(f"Task {task_id} completed successfully.")
-
-            except Exception as e:
-                logging.error(f"Error processing task {task_id}: {e}", exc_info=True)
-                # Update status to "failed"
-                update_task_status(db, task_id, models.TaskStatus.FAILED, error_message=str(e))
+                process_task(task_id, filters, task_info.get("deadline"))
             finally:
-                db.close() # Ensure session is closed
                 task_queue.task_done() # Signal task completion to the queue
+                current_task = None
+                busy_time = time.perf_counter() - busy_start
+                drain_tracker.record(busy_time)
+                metrics.TASK_STAGE_SECONDS.labels(stage="total").observe(busy_time)
+                metrics.WORKER_SECONDS.labels(state="busy").inc(busy_time)
 
         except Exception as e:
             # Catch potential issues with getting from queue or unexpected errors
-             logging.error(f"Worker loop error: {e}", exc_info=True)
+             logger.error("Worker loop error: %s", e, exc_info=True)
              time.sleep(1) # Avoid busy-looping on error
 
-    logging.info("Task worker stopped.")
+    logger.info("Task worker stopped.")
 
 
 # --- Worker Thread Management ---
@@ -141,20 +260,60 @@ def start_worker():
         stop_event.clear()
         worker_thread = Thread(target=task_worker, daemon=True) # Daemon allows main thread to exit
         worker_thread.start()
-        logging.info("Task worker thread started.")
+        logger.info("Task worker thread started.")
 
 def stop_worker():
     """Signals the background worker thread to stop."""
     global worker_thread
     if worker_thread and worker_thread.is_alive():
         stop_event.set()
-        task_queue.put(None) # Add sentinel value to unblock the worker if waiting
+        try:
+            task_queue.put(None, timeout=1) # Add sentinel value to unblock the worker if waiting
+        except Full:
+            pass # A full queue never blocks the worker; it sees stop_event on its next loop
         worker_thread.join(timeout=5) # Wait for worker to finish
-        logging.info("Task worker thread stopped.")
+        logger.info("Task worker thread stopped.")
         worker_thread = None
 
-def add_task_to_queue(task_id: int, filters: Dict[str, Any]):
-    """Adds a new task to the processing queue."""
-    task_info = {"task_id": task_id, "filters": filters , "status" : TaskStatus.PENDING  }
-    task_queue.put(task_info)
-    logging.info(f"Task {task_id} added to queue.")
\ No newline at end of file
+def estimate_task_cost(filters: Dict[str, Any]) -> Optional[int]:
+    """Estimated number of movies a task will match, from the catalog statistics. None if unknown.
+
+    Called from the async submit handler, so it only reads the statistics cached by the last
+    catalog load and never queries the database.
+    """
+    try:
+        return estimate_matching_rows(cached_statistics(), filters)
+    except (ValueError, TypeError):
+        return None # Unparseable filter values; the task will fail on its own
+
+def add_task_to_queue(task_id: int, filters: Dict[str, Any], client: str = "anonymous", deadline_seconds: float = None):
+    """Adds a new task to the processing queue. Raises queue.Full if the queue is at MAX_QUEUE_DEPTH.
+
+    The task times out `deadline_seconds` after submission (default TASK_DEADLINE_SECONDS).
+    """
+    estimated_rows = estimate_task_cost(filters)
+    deadline_seconds = TASK_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+    now = time.time()
+    task_info = {
+        "task_id": task_id, "filters": filters , "status" : TaskStatus.PENDING, "enqueued_at": now,
+        "client": client, "estimated_rows": estimated_rows, "priority": classify(estimated_rows),
+        "deadline": now + deadline_seconds if deadline_seconds > 0 else None,
+    }
+    task_queue.put_nowait(task_info)
+    metrics.QUEUE_DEPTH.set(task_queue.qsize())
+    logger.info("Task %s added to queue (%s, ~%s rows, client %s).", task_id, task_info["priority"], estimated_rows, client)
+
+def task_progress_estimate(task_id: int) -> Optional[Tuple[Optional[int], float]]:
+    """Returns (tasks ahead in the queue, estimated seconds until finished) for a queued or running task.
+
+    The queue position is None for the task currently being processed. Returns None if this
+    process doesn't know the task (already finished, or queued by another process).
+    """
+    running = current_task
+    if running is not None and running[0] == task_id:
+        elapsed = time.perf_counter() - running[1]
+        return None, max(drain_tracker.service_seconds() - elapsed, 0.0)
+    position = task_queue.position(task_id)
+    if position is None:
+        return None
+    return position, drain_tracker.eta_seconds(position + (1 if running is not None else 0))
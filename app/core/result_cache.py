@@ -0,0 +1,128 @@
+# app/core/result_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, NamedTuple, Optional, Set, Tuple
+from app.core import metrics
+from app.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Total size of cached response bodies per process. 0 disables the cache.
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Seconds an entry is served before it is re-read. Invalidation is per process, so this bounds how long
+# a task deleted (or a catalog refreshed) by another process is still served from here. 0 disables expiry.
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "60"))
+
+
+class CachedResult(NamedTuple):
+    """A fully encoded response body plus the headers needed to replay it."""
+    body: bytes
+    etag: str
+    encoding: str
+    media_type: str
+
+
+CacheKey = Tuple[int, str, Hashable]  # (task_id, variant, negotiated encoding)
+
+
+class ResultCache:
+    """Thread-safe LRU cache of serialized task results, bounded by total body bytes.
+
+    Entries are keyed by task ID first so every representation of a task can be dropped
+    at once when the task is re-run or deleted, and expire `ttl_seconds` after they are stored.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float = 0, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[CacheKey, CachedResult]" = OrderedDict()
+        self._expires: Dict[CacheKey, float] = {}
+        self._keys_by_task: Dict[int, Set[CacheKey]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: CacheKey) -> Optional[CachedResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds > 0 and self.clock() >= self._expires[key]:
+                self._remove(key)
+                self._publish()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                metrics.RESULT_CACHE_REQUESTS.labels(result="miss").inc()
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        metrics.RESULT_CACHE_REQUESTS.labels(result="hit").inc()
+        return entry
+
+    def put(self, key: CacheKey, entry: CachedResult):
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return  # Would evict everything else for a single entry
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self._bytes + size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+                metrics.RESULT_CACHE_EVICTIONS.inc()
+            self._entries[key] = entry
+            self._expires[key] = self.clock() + self.ttl_seconds
+            self._keys_by_task.setdefault(key[0], set()).add(key)
+            self._bytes += size
+            self._publish()
+
+    def invalidate_task(self, task_id: int):
+        """Drops every cached representation of a task."""
+        with self._lock:
+            keys = self._keys_by_task.get(task_id)
+            if not keys:
+                return
+            for key in list(keys):
+                self._remove(key)
+            self._publish()
+        logger.debug("Invalidated cached results for task %s", task_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._expires.clear()
+            self._keys_by_task.clear()
+            self._bytes = 0
+            self._publish()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key)
+        del self._expires[key]
+        self._bytes -= len(entry.body)
+        task_keys = self._keys_by_task.get(key[0])
+        if task_keys is not None:
+            task_keys.discard(key)
+            if not task_keys:
+                del self._keys_by_task[key[0]]
+
+    def _publish(self):
+        metrics.RESULT_CACHE_BYTES.set(self._bytes)
+        metrics.RESULT_CACHE_ENTRIES.set(len(self._entries))
+
+
+# Process-wide cache used by the API. Each process has its own; invalidation is local.
+result_cache = ResultCache(RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL_SECONDS)
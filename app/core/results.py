@@ -0,0 +1,230 @@
+# app/core/results.py
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import extract # For year extraction
+from app.core import models, schemas
+from app.logging.logger import get_logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+logger = get_logger(__name__)
+
+# Response fields in the exact order MovieRecordRead serializes them
+RESULT_FIELDS: Tuple[str, ...] = tuple(schemas.MovieRecordRead.model_fields)
+RESULT_COLUMNS = tuple(
+    models.TaskMovie.task_id if field == "task_id" else getattr(models.Movie, field) for field in RESULT_FIELDS
+)
+
+
+def query_task_records(db: Session, db_task: models.Task, *entities):
+    """Builds the query for a task's movies with the task's own filters applied, newest first.
+
+    Joins the task's membership rows to the shared catalog. Selects full Movie objects by
+    default; pass columns to get plain row tuples instead.
+    """
+    task_id = db_task.id
+
+    query = (
+        db.query(*(entities or (models.Movie,)))
+        .select_from(models.TaskMovie)
+        .join(models.Movie, models.Movie.id == models.TaskMovie.movie_id)
+        .filter(models.TaskMovie.task_id == task_id)
+    )
+    # Apply server-side filters
+    if db_task.filters['start_year'] != '':
+        year = db_task.filters['start_year']
+         # Use SQLAlchemy's extract function for year filtering on DateTime column
+        query = query.filter(extract('year', models.Movie.release_date) >= year)
+        logger.debug("Applied start year filter: %s for task %s", year, task_id)
+
+    if db_task.filters['end_year'] != '':
+        year = db_task.filters['end_year']
+         # Use SQLAlchemy's extract function for year filtering on DateTime column
+        query = query.filter(extract('year', models.Movie.release_date) <= year)
+        logger.debug("Applied end year filter: %s for task %s", year, task_id)
+
+    # if db_task.filters[''] is not None:
+    #     # Case-insensitive contains search on the genre string
+    #     query = query.filter( models.Movie.genre.ilike(f"%{genre}%") )
+    #     # task_read1 = schemas.MovieRecordRead.model_validate(query) 
+    #     # print(task_read1)
+    #     logging.debug(f"Applied genre filter: {genre} for task {task_id}")
+
+    if db_task.filters['min_rating'] != '':
+        min_rating = db_task.filters['min_rating']
+        # Ensure rating column exists and filter
+        query = query.filter(models.Movie.vote_average >= int(min_rating))
+        logger.debug("Applied min_rating filter: %s for task %s", min_rating, task_id)
+
+    if db_task.filters['language'] != '':
+        language = db_task.filters['language']
+        query = query.filter(models.Movie.original_language.ilike(f"%{language}%"))
+        logger.debug("Applied language filter: %s for task %s", language, task_id)
+
+    
+    # Order results (e.g., by release date descending)
+    return query.order_by(models.Movie.release_date.desc())
+
+
+def fetch_task_rows(db: Session, db_task: models.Task) -> List[tuple]:
+    """Returns a task's records as plain tuples in RESULT_FIELDS order, without building ORM objects."""
+    return query_task_records(db, db_task, *RESULT_COLUMNS).all()
+
+
+# Positions of float columns; see _plain_floats
+_FLOAT_POSITIONS = tuple(
+    index for index, field in enumerate(RESULT_FIELDS)
+    if schemas.MovieRecordRead.model_fields[field].annotation in (float, Optional[float])
+)
+_response_adapter = None
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        if value.utcoffset() == timedelta(0):
+            return value.replace(tzinfo=None).isoformat() + "Z"  # Pydantic writes UTC as Z
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _plain_floats(rows: Sequence[tuple]) -> bool:
+    """True if every float is written the same way by orjson, json and Pydantic.
+
+    They differ for exponent notation (1e+16 vs 1e16, 1e-05 vs 1e-5) and for NaN/infinity,
+    which only occur outside 1e-4 <= |x| < 1e16.
+    """
+    return all(
+        row[index] is None or row[index] == 0 or 1e-4 <= abs(row[index]) < 1e16
+        for row in rows for index in _FLOAT_POSITIONS
+    )
+
+
+def encode_rows_json(rows: Sequence[tuple]) -> bytes:
+    """Encodes row tuples as the JSON array List[MovieRecordRead] would produce, byte for byte.
+
+    The columns already have the response model's types (SQLAlchemy converts them), so the
+    per-row Pydantic validation is skipped and the rows go straight to the encoder. The rare
+    payload with a float the encoders would format differently goes through the response
+    model instead.
+    """
+    global _response_adapter
+    records = [dict(zip(RESULT_FIELDS, row)) for row in rows]
+    if not _plain_floats(rows):
+        if _response_adapter is None:
+            _response_adapter = TypeAdapter(List[schemas.MovieRecordRead])
+        return _response_adapter.dump_json(_response_adapter.validate_python(records))
+    if orjson is not None:
+        return orjson.dumps(records, option=orjson.OPT_UTC_Z)
+    return json.dumps(records, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+# --- Columnar payloads ---
+COLUMNAR_MEDIA_TYPE = "application/json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+# Low-cardinality string columns that are sent as a dictionary plus integer codes
+DICTIONARY_FIELDS = ("genres", "original_language")
+DATE_FIELDS = ("release_date",)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch_day(value):
+    if value is None:
+        return None
+    return (value.replace(tzinfo=None) - _EPOCH).days
+
+
+def _dictionary_encode(values) -> dict:
+    """Returns {"dictionary": [distinct values], "indices": [code per row]} (None stays None)."""
+    codes = {}
+    indices = []
+    for value in values:
+        if value is None:
+            indices.append(None)
+            continue
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        indices.append(code)
+    return {"dictionary": list(codes), "indices": indices}
+
+
+def encode_rows_columnar(rows: Sequence[tuple], task_id: int) -> bytes:
+    """Encodes rows column by column: one array per field, dictionary-encoded strings, epoch-day dates.
+
+    task_id is the same for every row, so it is sent once instead of as a column.
+    """
+    columns = dict(zip(RESULT_FIELDS, zip(*rows))) if rows else {field: () for field in RESULT_FIELDS}
+    payload_columns = {}
+    for field in RESULT_FIELDS:
+        if field == "task_id":
+            continue
+        values = columns[field]
+        if field in DICTIONARY_FIELDS:
+            payload_columns[field] = _dictionary_encode(values)
+        elif field in DATE_FIELDS:
+            payload_columns[field] = [_epoch_day(value) for value in values]
+        else:
+            payload_columns[field] = list(values)
+    payload = {
+        "format": "columnar",
+        "task_id": task_id,
+        "length": len(rows),
+        "dictionary_fields": list(DICTIONARY_FIELDS),
+        "date_fields": list(DATE_FIELDS),
+        "columns": payload_columns,
+    }
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def arrow_schema():
+    """Arrow schema for task results; requires pyarrow."""
+    import pyarrow as pa
+
+    return pa.schema([
+        ("original_title", pa.string()),
+        ("release_date", pa.date32()),
+        ("genres", pa.dictionary(pa.int32(), pa.string())),
+        ("vote_average", pa.float64()),
+        ("runtime", pa.int64()),
+        ("revenue", pa.int64()),
+        ("budget", pa.int64()),
+        ("vote_count", pa.int64()),
+        ("original_language", pa.dictionary(pa.int32(), pa.string())),
+        ("task_id", pa.int64()),
+    ])
+
+
+def rows_to_arrow_batch(rows: Sequence[tuple], schema=None):
+    """Converts row tuples into a pyarrow RecordBatch with dictionary strings and date32 dates."""
+    import pyarrow as pa
+
+    schema = schema or arrow_schema()
+    columns = list(zip(*rows)) if rows else [() for _ in RESULT_FIELDS]
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        elif pa.types.is_date32(field.type):
+            arrays.append(pa.array([v.date() if v is not None else None for v in values], type=pa.date32()))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def encode_rows_arrow(rows: Sequence[tuple]) -> bytes:
+    """Encodes rows as an Arrow IPC stream (a single record batch)."""
+    import pyarrow as pa
+
+    batch = rows_to_arrow_batch(rows)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
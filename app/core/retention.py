@@ -0,0 +1,213 @@
+# app/core/retention.py
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from threading import Event, Thread
+from typing import Any, Dict, List
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.core import metrics, models
+from app.core.analytics import analytics_engine
+from app.core.database import SessionLocal, engine
+from app.core.result_cache import result_cache
+from app.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Finished tasks older than this are deleted (0 disables the TTL policy)
+RETENTION_TTL_SECONDS = float(os.getenv("RETENTION_TTL_SECONDS", str(7 * 24 * 3600)))
+# Only the newest N tasks are kept; older finished tasks are deleted (0 disables the count policy)
+RETENTION_MAX_TASKS = int(os.getenv("RETENTION_MAX_TASKS", "10000"))
+# Time between retention passes (0 disables the background job)
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+# Rows deleted per transaction, and the pause between transactions that lets the task worker write
+RETENTION_BATCH_ROWS = int(os.getenv("RETENTION_BATCH_ROWS", "5000"))
+RETENTION_BATCH_PAUSE_SECONDS = float(os.getenv("RETENTION_BATCH_PAUSE_SECONDS", "0.05"))
+# Free pages handed back to the filesystem per incremental vacuum step
+RETENTION_VACUUM_PAGES = int(os.getenv("RETENTION_VACUUM_PAGES", "2000"))
+
+# Tasks in any other status may still be written to by the worker and are never deleted
+FINISHED_STATUSES = (
+    models.TaskStatus.COMPLETED, models.TaskStatus.FAILED, models.TaskStatus.CANCELLED, models.TaskStatus.TIMED_OUT,
+)
+
+stop_event = Event()  # Interrupts a running pass between batches
+retention_thread = None
+last_report: Dict[str, Any] = {}
+
+
+def expired_task_ids(db: Session, now: datetime = None) -> List[int]:
+    """IDs of finished tasks that fall outside the TTL or the max-task-count policy, oldest first."""
+    expired = set()
+    finished = models.Task.status.in_([status.value for status in FINISHED_STATUSES])
+    if RETENTION_TTL_SECONDS > 0:
+        now = now or datetime.now(timezone.utc)
+        # SQLite's CURRENT_TIMESTAMP is naive UTC, so compare against naive UTC
+        cutoff = (now - timedelta(seconds=RETENTION_TTL_SECONDS)).astimezone(timezone.utc).replace(tzinfo=None)
+        stamp = func.coalesce(models.Task.updated_at, models.Task.created_at)
+        expired.update(task_id for (task_id,) in db.query(models.Task.id).filter(finished, stamp < cutoff))
+    if RETENTION_MAX_TASKS > 0:
+        newest = db.query(models.Task.id).order_by(models.Task.id.desc()).limit(RETENTION_MAX_TASKS).subquery()
+        overflow = db.query(models.Task.id).filter(finished, models.Task.id.not_in(db.query(newest.c.id)))
+        expired.update(task_id for (task_id,) in overflow)
+    return sorted(expired)
+
+
+def _delete_in_batches(db: Session, statement: str, params: Dict[str, Any]) -> int:
+    """Runs a LIMIT-bounded DELETE until it stops matching rows, committing after every batch."""
+    deleted = 0
+    while not stop_event.is_set():
+        count = db.execute(text(statement), dict(params, batch=RETENTION_BATCH_ROWS)).rowcount
+        db.commit()
+        deleted += count
+        if count < RETENTION_BATCH_ROWS:
+            break
+        time.sleep(RETENTION_BATCH_PAUSE_SECONDS)  # Give the task worker a chance at the write lock
+    return deleted
+
+
+def delete_task(db: Session, task_id: int) -> int:
+    """Deletes a task and its result rows in small batches. Returns the number of result rows deleted."""
+    rows = _delete_in_batches(
+        db,
+        "DELETE FROM task_movies WHERE task_id = :task_id AND movie_id IN "
+        "(SELECT movie_id FROM task_movies WHERE task_id = :task_id LIMIT :batch)",
+        {"task_id": task_id},
+    )
+    if stop_event.is_set():
+        return rows  # Interrupted mid-task; the next pass finishes it
+    db.query(models.Task).filter(models.Task.id == task_id).delete(synchronize_session=False)
+    db.commit()
+    result_cache.invalidate_task(task_id)
+    analytics_engine.invalidate_task(task_id)
+    return rows
+
+
+def delete_orphan_movies(db: Session) -> int:
+    """Deletes movies that left the catalog and that no remaining task points at. Returns the number deleted."""
+    deleted = 0
+    while not stop_event.is_set():
+        ids = db.execute(
+            text("SELECT id FROM movies WHERE id NOT IN (SELECT movie_id FROM catalog_movies) "
+                 "AND id NOT IN (SELECT movie_id FROM task_movies) LIMIT :batch"),
+            {"batch": RETENTION_BATCH_ROWS},
+        ).scalars().all()
+        if not ids:
+            break
+        # Re-checked in the DELETE: a catalog refresh or a task may have picked a movie up since the SELECT
+        count = db.execute(
+            text(f"DELETE FROM movies WHERE id IN ({','.join(map(str, map(int, ids)))}) "
+                 "AND id NOT IN (SELECT movie_id FROM catalog_movies) AND id NOT IN (SELECT movie_id FROM task_movies)")
+        ).rowcount
+        db.commit()
+        analytics_engine.forget_movies(ids)
+        deleted += count
+        if len(ids) < RETENTION_BATCH_ROWS:
+            break
+        time.sleep(RETENTION_BATCH_PAUSE_SECONDS)
+    return deleted
+
+
+def _sqlite_pages(db: Session):
+    """(page_size, page_count, freelist_count) of the SQLite database."""
+    page_size = db.execute(text("PRAGMA page_size")).scalar()
+    page_count = db.execute(text("PRAGMA page_count")).scalar()
+    freelist = db.execute(text("PRAGMA freelist_count")).scalar()
+    return page_size, page_count, freelist
+
+
+def _incremental_vacuum(db: Session) -> bool:
+    """Returns free pages to the filesystem a few at a time. False if the database isn't in incremental mode."""
+    if db.execute(text("PRAGMA auto_vacuum")).scalar() != 2:
+        return False
+    while not stop_event.is_set():
+        _, _, freelist = _sqlite_pages(db)
+        if freelist == 0:
+            break
+        raw = db.connection().connection.dbapi_connection
+        raw.execute(f"PRAGMA incremental_vacuum({RETENTION_VACUUM_PAGES})").fetchall()  # Each fetched step frees a page
+        db.commit()
+        time.sleep(RETENTION_BATCH_PAUSE_SECONDS)
+    return True
+
+
+def run_retention_pass() -> Dict[str, Any]:
+    """Deletes expired tasks, then compacts and re-analyzes the database. Returns a report of the pass."""
+    global last_report
+    start = time.perf_counter()
+    is_sqlite = engine.dialect.name == "sqlite"
+    db = SessionLocal()
+    try:
+        size_before = None
+        if is_sqlite:
+            page_size, page_count, _ = _sqlite_pages(db)
+            size_before = page_size * page_count
+
+        task_ids = expired_task_ids(db)
+        tasks_deleted = rows_deleted = 0
+        for task_id in task_ids:
+            if stop_event.is_set():
+                break
+            rows_deleted += delete_task(db, task_id)
+            tasks_deleted += 0 if stop_event.is_set() else 1
+        # Catalog refreshes keep removed movies that tasks still point at; drop those no task needs any more
+        movies_deleted = delete_orphan_movies(db)
+        metrics.RETENTION_DELETED.labels(kind="tasks").inc(tasks_deleted)
+        metrics.RETENTION_DELETED.labels(kind="result_rows").inc(rows_deleted)
+        metrics.RETENTION_DELETED.labels(kind="movies").inc(movies_deleted)
+
+        report = {"tasks_deleted": tasks_deleted, "rows_deleted": rows_deleted, "movies_deleted": movies_deleted,
+                  "incremental_vacuum": False}
+        if is_sqlite:
+            report["incremental_vacuum"] = _incremental_vacuum(db)
+            if rows_deleted or movies_deleted:
+                db.execute(text("ANALYZE"))  # Refresh planner statistics after large deletes
+                db.commit()
+            page_size, page_count, freelist = _sqlite_pages(db)
+            report["database_bytes"] = page_size * page_count
+            report["bytes_reclaimed"] = max(size_before - report["database_bytes"], 0)
+            report["free_bytes"] = page_size * freelist  # Reusable inside the file, not yet returned to the OS
+            metrics.RETENTION_RECLAIMED_BYTES.inc(report["bytes_reclaimed"])
+    finally:
+        db.close()
+
+    report["duration_s"] = round(time.perf_counter() - start, 3)
+    metrics.RETENTION_PASS_SECONDS.observe(report["duration_s"])
+    last_report = report
+    logger.info("Retention pass: %s", report)
+    if is_sqlite and (rows_deleted or movies_deleted) and not report["incremental_vacuum"]:
+        logger.warning("Database is not in incremental auto_vacuum mode; freed pages are reused but the file "
+                       "will not shrink until a one-off VACUUM is run.")
+    return report
+
+
+def retention_worker():
+    """Runs a retention pass every RETENTION_INTERVAL_SECONDS until stopped."""
+    logger.info("Retention job started (ttl=%ss, max_tasks=%s).", RETENTION_TTL_SECONDS, RETENTION_MAX_TASKS)
+    while not stop_event.wait(RETENTION_INTERVAL_SECONDS):
+        try:
+            run_retention_pass()
+        except Exception as e:
+            logger.error("Retention pass failed: %s", e, exc_info=True)
+    logger.info("Retention job stopped.")
+
+
+def start_retention():
+    """Starts the background retention thread unless every policy is disabled."""
+    global retention_thread
+    if RETENTION_INTERVAL_SECONDS <= 0 or (RETENTION_TTL_SECONDS <= 0 and RETENTION_MAX_TASKS <= 0):
+        logger.info("Retention job disabled.")
+        return
+    if retention_thread is None or not retention_thread.is_alive():
+        stop_event.clear()
+        retention_thread = Thread(target=retention_worker, daemon=True)
+        retention_thread.start()
+
+
+def stop_retention():
+    """Stops the retention thread, interrupting a running pass between batches."""
+    global retention_thread
+    if retention_thread and retention_thread.is_alive():
+        stop_event.set()
+        retention_thread.join(timeout=5)
+        retention_thread = None
@@ -0,0 +1,180 @@
+# app/core/scheduler.py
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from queue import Empty, Full
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# Tasks estimated to match at most this many movies are scheduled as interactive
+INTERACTIVE_MAX_ROWS = int(os.getenv("INTERACTIVE_MAX_ROWS", "2000"))
+# A batch task that has waited this long is promoted to the interactive class, so it can't starve
+BATCH_AGING_SECONDS = float(os.getenv("BATCH_AGING_SECONDS", "120"))
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITY_CLASSES = (INTERACTIVE, BATCH)  # Highest first
+
+
+def classify(estimated_rows: Optional[int]) -> str:
+    """Priority class for a task from its estimated result size. Unknown cost is treated as batch."""
+    if estimated_rows is not None and estimated_rows <= INTERACTIVE_MAX_ROWS:
+        return INTERACTIVE
+    return BATCH
+
+
+class _FairQueue:
+    """One priority class: a FIFO per client, served round-robin across clients."""
+
+    def __init__(self):
+        self.clients: "OrderedDict[str, Deque[dict]]" = OrderedDict()
+
+    def __len__(self):
+        return sum(len(items) for items in self.clients.values())
+
+    def push(self, item: dict):
+        self.clients.setdefault(item["client"], deque()).append(item)
+
+    def push_by_age(self, item: dict):
+        """Inserts `item` ahead of the client's items that were enqueued after it."""
+        items = self.clients.setdefault(item["client"], deque())
+        for index, queued in enumerate(items):
+            if queued["enqueued_at"] > item["enqueued_at"]:
+                items.insert(index, item)
+                return
+        items.append(item)
+
+    def pop(self) -> dict:
+        client, items = next(iter(self.clients.items()))
+        item = items.popleft()
+        del self.clients[client]
+        if items:
+            self.clients[client] = items  # Back of the rotation
+        return item
+
+    def oldest_heads(self, cutoff: float) -> List[dict]:
+        """Client heads enqueued before `cutoff`."""
+        return [items[0] for items in self.clients.values() if items[0]["enqueued_at"] < cutoff]
+
+    def remove(self, item: dict):
+        items = self.clients[item["client"]]
+        items.remove(item)
+        if not items:
+            del self.clients[item["client"]]
+
+    def service_order(self) -> List[dict]:
+        """Order in which the current items would be served if nothing else arrived."""
+        order, queues = [], [list(items) for items in self.clients.values()]
+        for depth in range(max(map(len, queues), default=0)):
+            order.extend(items[depth] for items in queues if depth < len(items))
+        return order
+
+
+class TaskScheduler:
+    """Thread-safe, bounded replacement for the worker's FIFO queue.
+
+    Items are dicts with at least "task_id", "client", "priority" and "enqueued_at". Higher
+    priority classes are served first; within a class clients take turns, so one client's
+    burst only delays that client. Batch items older than BATCH_AGING_SECONDS are promoted
+    to the interactive class. Implements the subset of queue.Queue the worker uses.
+    """
+
+    def __init__(self, maxsize: int = 0, aging_seconds: float = BATCH_AGING_SECONDS, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self.aging_seconds = aging_seconds
+        self.clock = clock
+        self._classes: Dict[str, _FairQueue] = {name: _FairQueue() for name in PRIORITY_CLASSES}
+        self._control: Deque[Any] = deque()  # Shutdown sentinels, served before any task
+        self._size = 0
+        self._unfinished = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+
+    def qsize(self) -> int:
+        with self._lock:
+            return self._size
+
+    def put(self, item: Optional[dict], block: bool = True, timeout: float = None):
+        """Enqueues a task (or a None sentinel). Raises queue.Full at maxsize; tasks are never blocked on."""
+        with self._lock:
+            if item is None:
+                self._control.append(None)
+            else:
+                if self.maxsize > 0 and self._size >= self.maxsize:
+                    raise Full
+                item.setdefault("enqueued_at", self.clock())
+                self._classes[item.get("priority", BATCH)].push(item)
+                self._size += 1
+            self._unfinished += 1
+            self._not_empty.notify()
+
+    def put_nowait(self, item: Optional[dict]):
+        self.put(item, block=False)
+
+    def get(self, block: bool = True, timeout: float = None) -> Optional[dict]:
+        with self._not_empty:
+            if block:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while not self._control and self._size == 0:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise Empty
+                    self._not_empty.wait(remaining)
+            if self._control:
+                return self._control.popleft()
+            if self._size == 0:
+                raise Empty
+            self._promote_aged()
+            for name in PRIORITY_CLASSES:
+                if self._classes[name].clients:
+                    self._size -= 1
+                    return self._classes[name].pop()
+            raise Empty  # Unreachable: _size > 0 means some class has items
+
+    def get_nowait(self) -> Optional[dict]:
+        return self.get(block=False)
+
+    def task_done(self):
+        with self._lock:
+            self._unfinished = max(self._unfinished - 1, 0)
+
+    def _promote_aged(self):
+        if self.aging_seconds <= 0:
+            return
+        batch, cutoff = self._classes[BATCH], self.clock() - self.aging_seconds
+        aged = batch.oldest_heads(cutoff)
+        while aged:  # Each client's batch FIFO is in enqueue order, so promote head after head
+            for item in aged:
+                batch.remove(item)
+                item["promoted"] = True
+                # Keeps enqueue order with items promoted earlier and the client's own interactive tasks
+                self._classes[INTERACTIVE].push_by_age(item)
+            aged = batch.oldest_heads(cutoff)
+
+    def remove(self, task_id: int) -> bool:
+        """Drops a queued task (e.g. cancelled before it started). Returns False if it isn't queued."""
+        with self._lock:
+            for queue in self._classes.values():
+                for items in queue.clients.values():
+                    for item in items:
+                        if item["task_id"] == task_id:
+                            queue.remove(item)
+                            self._size -= 1
+                            self._unfinished = max(self._unfinished - 1, 0)
+                            return True
+        return False
+
+    def position(self, task_id: int) -> Optional[int]:
+        """Tasks that would be served before `task_id` if nothing else arrived; None if it isn't queued."""
+        with self._lock:
+            order = [item for name in PRIORITY_CLASSES for item in self._classes[name].service_order()]
+        for index, item in enumerate(order):
+            if item["task_id"] == task_id:
+                return index
+        return None
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Queued tasks per priority class and client."""
+        with self._lock:
+            return {name: {client: len(items) for client, items in queue.clients.items()}
+                    for name, queue in self._classes.items()}
@@ -8,6 +8,8 @@ class TaskStatus(str, enum.Enum):
     IN_PROGRESS = "in progress"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed out"
 
 # --- MovieRecord Schemas ---
 class MovieRecordBase(BaseModel):
@@ -52,6 +54,16 @@ class TaskRead(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
     filters: Optional[Dict[str, Any]] = None
+    queue_position: Optional[int] = Field(None, description="Tasks ahead of this one in the queue (0 = next), while pending.")
+    eta_seconds: Optional[float] = Field(None, description="Estimated seconds until the task finishes, while pending or in progress.")
 
     class Config:
-        from_attributes = True # Pydantic V1
\ No newline at end of file
+        from_attributes = True # Pydantic V1
+# --- Analytics Schemas ---
+class AggregateRead(BaseModel):
+    catalog_version: str = Field(..., description="Catalog version the numbers were computed from.")
+    task_id: Optional[int] = Field(None, description="Task whose results were aggregated; null for the whole catalog.")
+    columns: List[str] = Field(..., description="Group-by dimensions followed by one column per measure.")
+    rows: List[List[Any]]
+    cached: bool = Field(False, description="Whether the result was served from the analytics cache.")
+    elapsed_ms: float
@@ -0,0 +1,105 @@
+# app/core/startup.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Run schema migrations when the app starts; set to 0 when `python -m app.core.migrations` runs as a deploy step
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "1") == "1"
+# Warm-up hooks run after startup, in this order, before /ready reports ready (comma-separated; empty disables)
+WARMUP_HOOKS = os.getenv("WARMUP_HOOKS", "")
+
+_warmup_hooks: "OrderedDict[str, Callable[[Session], None]]" = OrderedDict()
+_lock = threading.Lock()
+_migrated = False
+_warmup_report: Dict[str, Dict[str, Any]] = {}  # hook name -> {"status": ..., "seconds": ...}
+_warmup_done = threading.Event()
+
+
+def register_warmup_hook(name: str, hook: Callable[[Session], None]):
+    """Makes `hook(db)` available to WARMUP_HOOKS under `name`. Hooks should only fill caches."""
+    _warmup_hooks[name] = hook
+
+
+def _warm_catalog(db: Session):
+    """Loads the movie catalog and its filter statistics, which the first task would otherwise pay for."""
+    from app.core.catalog import catalog_statistics, ensure_catalog_loaded
+    from app.core.data_processor import SOURCE_A_MOVIE_PATH
+
+    ensure_catalog_loaded(db, SOURCE_A_MOVIE_PATH)
+    catalog_statistics(db)
+
+
+def _warm_analytics(db: Session):
+    """Builds the analytics snapshot of the catalog (runs the catalog hook's load first if needed)."""
+    from app.core import analytics
+    from app.core.catalog import ensure_catalog_loaded
+    from app.core.data_processor import SOURCE_A_MOVIE_PATH
+
+    analytics.check_available()
+    ensure_catalog_loaded(db, SOURCE_A_MOVIE_PATH)
+    analytics.analytics_engine.preload(db)
+
+
+register_warmup_hook("catalog", _warm_catalog)
+register_warmup_hook("analytics", _warm_analytics)
+
+
+def run_migrations():
+    """Brings the schema up to date if AUTO_MIGRATE is on. Must finish before the worker starts."""
+    global _migrated
+    if AUTO_MIGRATE:
+        from app.core.migrations import migrate
+
+        migrate()
+    _migrated = True
+
+
+def _run_warmup(names):
+    for name in names:
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            _warmup_hooks[name](db)
+            status = "ok"
+        except Exception as e:
+            # Warm-up only fills caches, so the work is redone lazily on first use
+            logger.error("Warm-up hook %s failed: %s", name, e, exc_info=True)
+            status = "failed"
+        finally:
+            db.close()
+        with _lock:
+            _warmup_report[name] = {"status": status, "seconds": round(time.perf_counter() - start, 3)}
+        logger.info("Warm-up hook %s: %s in %.3fs", name, status, _warmup_report[name]["seconds"])
+    _warmup_done.set()
+
+
+def start_warmup():
+    """Runs the WARMUP_HOOKS in a background thread, so liveness and metrics are served meanwhile."""
+    names = [name.strip() for name in WARMUP_HOOKS.split(",") if name.strip()]
+    unknown = [name for name in names if name not in _warmup_hooks]
+    if unknown:
+        logger.warning("Ignoring unknown warm-up hooks %s; available: %s", unknown, list(_warmup_hooks))
+        names = [name for name in names if name in _warmup_hooks]
+    with _lock:
+        _warmup_report.clear()
+        _warmup_report.update({name: {"status": "pending"} for name in names})
+    _warmup_done.clear()
+    if not names:
+        _warmup_done.set()
+        return
+    threading.Thread(target=_run_warmup, args=(names,), name="warmup", daemon=True).start()
+
+
+def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """(ready, details). Ready once migrations ran and every warm-up hook finished, failed or not."""
+    with _lock:
+        hooks = {name: dict(entry) for name, entry in _warmup_report.items()}
+    ready = _migrated and _warmup_done.is_set()
+    return ready, {"ready": ready, "migrated": _migrated, "warmup": hooks}
@@ -1,15 +1,155 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from datetime import datetime, timezone
 
-LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-logs_path = os.path.join(os.getcwd() , "logs" , LOG_FILE)
-os.makedirs(logs_path , exist_ok=True)
+# Root level, plus optional per-logger overrides, e.g.
+# LOG_LEVELS="app.api.tasks=DEBUG,app.core.queue_manager=WARNING,sqlalchemy.engine=WARNING"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
 
-LOG_FILE_PATH = os.path.join(logs_path , LOG_FILE)
+# Sampled records (see `sampled`) are let through at most LOG_SAMPLE_RATE times per
+# LOG_SAMPLE_INTERVAL seconds for each sample key.
+LOG_SAMPLE_RATE = int(os.getenv("LOG_SAMPLE_RATE", "10"))
+LOG_SAMPLE_INTERVAL = float(os.getenv("LOG_SAMPLE_INTERVAL", "1.0"))
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is emitted as a JSON field
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sample_key"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through at most `rate` records per `interval` seconds for each sample key.
+
+    Only records logged with `extra=sampled(key)` are limited. The number of dropped
+    records is attached to the next record that gets through as `suppressed`.
+    """
+
+    def __init__(self, rate: int = LOG_SAMPLE_RATE, interval: float = LOG_SAMPLE_INTERVAL):
+        super().__init__()
+        self.rate = rate
+        self.interval = interval
+        self._windows = {}  # key -> [window_start, emitted, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.rate:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records without formatting them.
+
+    The stock QueueHandler merges msg % args in the calling thread; the queue here is
+    in-process, so the record can be handed over as-is and all formatting happens in
+    the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def sampled(key: str) -> dict:
+    """`extra=` payload that marks a per-row/per-request record for rate-limited sampling."""
+    return {"sample_key": key}
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Returns a named logger; per-logger levels are configured through LOG_LEVELS."""
+    return logging.getLogger(name)
+
+
+_listener = None
+
+
+def _log_file_path() -> str:
+    """logs/<start time>.log/<start time>.log under the working directory; the directory is created here."""
+    log_file = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
+    logs_path = os.path.join(os.getcwd(), "logs", log_file)
+    os.makedirs(logs_path, exist_ok=True)
+    return os.path.join(logs_path, log_file)
+
+
+def setup_logging():
+    """Routes all logging through a queue to a background listener that writes JSON lines.
+
+    Application threads only pay for a queue put; file I/O and formatting happen on the
+    listener thread. Called by the entry points (app startup, CLIs) rather than on import, so
+    importing a module never creates the log directory. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()  # Unbounded and lock-free on put, so logging never blocks the caller
+
+    file_handler = logging.FileHandler(_log_file_path(), encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())  # Drop excess samples before they are enqueued
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    for override in filter(None, (item.strip() for item in LOG_LEVELS.split(","))):
+        name, _, level = override.partition("=")
+        logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flushes queued records and stops the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
-logging.basicConfig(
-    filename = LOG_FILE_PATH,
-    format = "[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s ",
-    level= logging.INFO,
-)
\ No newline at end of file
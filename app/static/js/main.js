@@ -1,12 +1,70 @@
 // app/static/js/main.js
-let allMovieData = []; // Store all movie data here
+let allMovieData = emptyColumnarData(); // Store all movie data here (columnar layout, see getTaskData)
 
-async function fetchDataAndVisualize(formData) {
-  try {
+const MS_PER_DAY = 86400000;
+
+function emptyColumnarData() {
+  return { length: 0, columns: { release_date: [], genres: { dictionary: [], indices: [] } } };
+}
+
+// Row indices 0..length-1, i.e. "every movie"
+function allRows(data) {
+  return Array.from({ length: data.length }, (_, i) => i);
+}
+
+// release_date arrives as days since 1970-01-01
+function releaseYear(data, row) {
+  const days = data.columns.release_date[row];
+  return days === null ? null : new Date(days * MS_PER_DAY).getUTCFullYear();
+}
+
+// Genre lists per dictionary entry, so each distinct genres string is split only once
+function genreListsByCode(data) {
+  return data.columns.genres.dictionary.map((entry) => (entry ? entry.split(",") : []));
+}
+
+const MAX_SUBMIT_ATTEMPTS = 3;
+const MIN_POLL_MS = 1000;
+const MAX_POLL_MS = 10000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Submits the form, waiting out the server's Retry-After when it answers 429 (queue full or rate limited)
+async function submitTask(formData) {
+  for (let attempt = 1; ; attempt++) {
     const response = await fetch("/submit-source-a", {
       method: "POST",
       body: formData,
     });
+    if (response.status !== 429 || attempt === MAX_SUBMIT_ATTEMPTS) {
+      return response;
+    }
+    const retryAfter = Number(response.headers.get("Retry-After")) || 5;
+    console.warn(`Server busy, retrying in ${retryAfter}s`);
+    await sleep(retryAfter * 1000);
+  }
+}
+
+let activeTaskId = null; // Task the dashboard is currently waiting for
+
+// Cancels a task the user no longer needs, so the worker can move on to live work
+async function cancelTask(taskId) {
+  try {
+    await fetch(`/api/tasks/${taskId}`, { method: "DELETE" });
+  } catch (error) {
+    console.error(`Error cancelling task ${taskId}:`, error);
+  }
+}
+
+async function fetchDataAndVisualize(formData) {
+  try {
+    if (activeTaskId !== null) {
+      // A corrected filter supersedes the task still in flight
+      const previous = activeTaskId;
+      activeTaskId = null;
+      await cancelTask(previous);
+    }
+    const response = await submitTask(formData);
 
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
@@ -15,6 +73,7 @@ async function fetchDataAndVisualize(formData) {
     const data = await response.json();
     console.log("Data received:", data);
     const taskId = data.task_id;
+    activeTaskId = taskId;
 
     // Poll for task completion and fetch data
     await pollForTaskCompletion(taskId);
@@ -27,20 +86,30 @@ async function fetchDataAndVisualize(formData) {
 async function pollForTaskCompletion(taskId) {
   let taskComplete = false;
   while (!taskComplete) {
-    const taskStatus = await getTaskStatus(taskId);
+    if (activeTaskId !== taskId) {
+      return; // Superseded by a newer submission
+    }
+    const task = await getTaskStatus(taskId);
+    const taskStatus = task.status;
     console.log(`Task ${taskId} status: ${taskStatus}`);
 
     if (taskStatus === "completed") {
       taskComplete = true;
+      activeTaskId = null;
       const movieData = await getTaskData(taskId);
       allMovieData = movieData; // Store all data
       populateGenreFilter(movieData); // Populate the genre filter
-      visualizeData(movieData); // Visualize all data initially
-    } else if (taskStatus === "failed") {
-      console.error(`Task ${taskId} failed.`);
+      visualizeData(movieData, allRows(movieData)); // Visualize all data initially
+    } else if (["failed", "cancelled", "timed out"].includes(taskStatus)) {
+      console.error(`Task ${taskId} ${taskStatus}.`);
+      if (activeTaskId === taskId) {
+        activeTaskId = null;
+      }
       return;
     } else {
-      await new Promise((resolve) => setTimeout(resolve, 2000)); // Wait for 2 seconds
+      // Poll about twice before the server's ETA, so long queues don't cause a stream of polls
+      const etaMs = task.eta_seconds != null ? task.eta_seconds * 500 : 2000;
+      await sleep(Math.min(Math.max(etaMs, MIN_POLL_MS), MAX_POLL_MS));
     }
   }
 }
@@ -52,16 +121,18 @@ async function getTaskStatus(taskId) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
     const data = await response.json();
-    return data.status;
+    return data;
   } catch (error) {
     console.error(`Error getting task ${taskId} status:`, error);
-    return "failed"; // Treat errors as failed
+    return { status: "failed" }; // Treat errors as failed
   }
 }
 
+// Fetches the task's results in the compact columnar layout: one array per field,
+// dictionary-encoded genres/language and epoch-day release dates.
 async function getTaskData(taskId) {
   try {
-    const response = await fetch(`/api/tasks/${taskId}/data`);
+    const response = await fetch(`/api/tasks/${taskId}/data?format=columnar`);
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
@@ -69,23 +140,27 @@ async function getTaskData(taskId) {
     return data;
   } catch (error) {
     console.error(`Error getting data for task ${taskId}:`, error);
-    return []; // Return empty array on error
+    return emptyColumnarData(); // Return empty data on error
   }
 }
 
-function visualizeData(data) {
+// `rows` is the list of row indices to plot (all rows, or the ones matching a filter)
+function visualizeData(data, rows) {
   // Clear previous charts
   d3.select("#time-series-chart").selectAll("*").remove();
 
   // Time Series Chart
-  const timeSeriesData = prepareTimeSeriesData(data);
+  const timeSeriesData = prepareTimeSeriesData(data, rows);
   createTimeSeriesChart(timeSeriesData);
 }
 
-function prepareTimeSeriesData(data) {
+function prepareTimeSeriesData(data, rows) {
   const yearCounts = {};
-  data.forEach((d) => {
-    const year = new Date(d.release_date).getFullYear();
+  rows.forEach((row) => {
+    const year = releaseYear(data, row);
+    if (year === null) {
+      return;
+    }
     yearCounts[year] = (yearCounts[year] || 0) + 1;
   });
 
@@ -147,10 +222,9 @@ function createTimeSeriesChart(data) {
 function populateGenreFilter(data) {
     const genreFilter = document.getElementById("genre-filter");
     const allGenres = new Set();
-    data.forEach(movie => {
-        if (movie.genres) {
-            movie.genres.forEach(genre => allGenres.add(genre));
-        }
+    // Only the distinct genre strings need scanning, not every movie
+    genreListsByCode(data).forEach(genres => {
+        genres.forEach(genre => allGenres.add(genre));
     });
 
     allGenres.forEach(genre => {
@@ -163,10 +237,13 @@ function populateGenreFilter(data) {
 
 function filterByGenre(genre) {
     if (genre === "all") {
-        visualizeData(allMovieData);
+        visualizeData(allMovieData, allRows(allMovieData));
     } else {
-        const filteredData = allMovieData.filter(movie => movie.genres && movie.genres.includes(genre));
-        visualizeData(filteredData);
+        // Resolve the genre against the dictionary once, then filter rows by code
+        const matchingCodes = genreListsByCode(allMovieData).map(genres => genres.includes(genre));
+        const indices = allMovieData.columns.genres.indices;
+        const filteredRows = allRows(allMovieData).filter(row => indices[row] !== null && matchingCodes[indices[row]]);
+        visualizeData(allMovieData, filteredRows);
     }
 }
 
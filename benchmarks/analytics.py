@@ -0,0 +1,160 @@
+# benchmarks/analytics.py
+"""Latency benchmark for the embedded analytics engine (`app.core.analytics`).
+
+Loads a synthetic catalog into a scratch database, builds the DuckDB snapshot and runs a
+set of chart-style aggregations three ways: cold (first run on the snapshot), cached (same
+query again) and with pandas over the same rows, which is what each chart used to need.
+Results are checked against pandas, and the cold queries are also run from several threads
+at once to exercise the per-thread cursors.
+
+    python -m benchmarks.analytics --size 100k --size 1m
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import numpy as np
+
+from benchmarks.catalog import ensure_catalog, parse_size
+from benchmarks.suite import _configure_environment, percentile
+
+# (name, group_by, measures, filters)
+QUERIES = [
+    ("count_by_year", ["year"], ["count"], {}),
+    ("revenue_by_genre", ["genre"], ["count", "avg:revenue", "sum:budget"], {}),
+    ("rating_by_language_decade", ["language", "decade"], ["avg:vote_average", "median:runtime"], {}),
+    ("drama_since_2000_by_budget_band", ["budget_band"], ["count", "avg:revenue"], {"start_year": 2000, "genre": "Drama"}),
+]
+
+
+def pandas_equivalent(frame, group_by, measures, filters):
+    """The same aggregation with pandas, as a per-chart endpoint would have written it."""
+    df = frame
+    if filters.get("start_year"):
+        df = df[df["year"] >= filters["start_year"]]
+    if "genre" in group_by or filters.get("genre"):
+        df = df.assign(genre=df["genres"].str.split(",")).explode("genre")
+        df = df[df["genre"].notna() & (df["genre"] != "")]  # Movies without genres have no genre rows
+        if filters.get("genre"):
+            df = df[df["genre"].str.lower() == filters["genre"].lower()]
+    if "decade" in group_by:
+        df = df.assign(decade=df["year"] // 10 * 10)
+    if "language" in group_by:
+        df = df.assign(language=df["original_language"])
+    if "budget_band" in group_by:
+        df = df.assign(budget_band=10 ** np.floor(np.log10(df["budget"].where(df["budget"] > 0))))
+    aggregations = {}
+    for spec in measures:
+        fn, _, column = spec.partition(":")
+        aggregations[spec] = ("id", "size") if fn == "count" else (column, "mean" if fn == "avg" else fn)
+    return df.groupby(group_by, dropna=False).agg(**aggregations)  # NULL groups are kept, as in SQL
+
+
+def run(rows: int, catalog: str, repeats: int) -> Dict[str, Any]:
+    import pandas as pd
+    from app.core import analytics
+    from app.core.catalog import ensure_catalog_loaded
+    from app.core.database import SessionLocal, engine
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        ensure_catalog_loaded(db, catalog)
+        load_s = time.perf_counter() - start
+
+        engine_ = analytics.AnalyticsEngine()
+        start = time.perf_counter()
+        engine_._snapshot(db)
+        snapshot_s = time.perf_counter() - start
+
+        frame = pd.read_sql_query("SELECT id, release_date, genres, original_language, budget, revenue, "
+                                  "vote_average, runtime, vote_count FROM movies", engine, parse_dates=["release_date"])
+        frame["year"] = frame["release_date"].dt.year
+
+        results = {"catalog_load_s": round(load_s, 3), "snapshot_s": round(snapshot_s, 3)}
+        parsed = {name: analytics.parse_query(group_by, measures, **filters) for name, group_by, measures, filters in QUERIES}
+        for name, group_by, measures, filters in QUERIES:
+            cold, cached, baseline = [], [], []
+            for _ in range(repeats):
+                engine_.clear()
+                t0 = time.perf_counter()
+                result, _ = engine_.aggregate(db, parsed[name])
+                cold.append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                engine_.aggregate(db, parsed[name])
+                cached.append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                expected = pandas_equivalent(frame, group_by, measures, filters)
+                baseline.append(time.perf_counter() - t0)
+            # Same group keys, same counts/sums as pandas
+            first_measure = result.columns[len(group_by)]
+            duck_total = sum(row[len(group_by)] or 0 for row in result.rows)
+            pandas_total = expected[measures[0]].sum()
+            results[name] = {
+                "groups": len(result.rows),
+                "cold_p50_ms": round(percentile(cold, 50) * 1000, 2),
+                "cached_p50_ms": round(percentile(cached, 50) * 1000, 3),
+                "pandas_p50_ms": round(percentile(baseline, 50) * 1000, 2),
+                "matches_pandas": bool(len(result.rows) == len(expected) and abs(duck_total - pandas_total) <= 1e-6 * max(abs(pandas_total), 1)),
+                "checked_column": first_measure,
+            }
+
+        def concurrent_query(name):
+            session = SessionLocal()
+            try:
+                return engine_.aggregate(session, parsed[name])[0].rows
+            finally:
+                session.close()
+
+        engine_.clear()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            outputs = list(pool.map(concurrent_query, [name for name, *_ in QUERIES] * 4))
+        results["concurrent_consistent"] = all(
+            outputs[i] == outputs[i % len(QUERIES)] for i in range(len(outputs)))
+        return results
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analytics engine against pandas group-bys.")
+    parser.add_argument("--size", action="append", help="Catalog size (5k, 100k, 1m or a row count). Repeatable.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--output", default="benchmarks/results/analytics.json")
+    args = parser.parse_args()
+
+    report = {"meta": {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "repeats": args.repeats},
+              "results": {}}
+    with tempfile.TemporaryDirectory(prefix="movie-analytics-") as workdir:
+        _configure_environment(workdir)
+        from app.core.database import engine
+        from app.core.migrations import migrate
+
+        migrate()
+        for size in args.size or ["100k"]:
+            rows = parse_size(size)
+            result = run(rows, ensure_catalog(args.data_dir, rows, args.seed), args.repeats)
+            print(f"== {rows} rows: catalog load {result['catalog_load_s']}s, snapshot {result['snapshot_s']}s, "
+                  f"concurrent results consistent: {result['concurrent_consistent']}")
+            for name, *_ in QUERIES:
+                stats = result[name]
+                print(f"  {name:<34} groups={stats['groups']:<5} cold={stats['cold_p50_ms']}ms "
+                      f"cached={stats['cached_p50_ms']}ms pandas={stats['pandas_p50_ms']}ms matches={stats['matches_pandas']}")
+            report["results"][f"analytics@{rows}"] = result
+        engine.dispose()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
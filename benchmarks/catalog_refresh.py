@@ -0,0 +1,161 @@
+# benchmarks/catalog_refresh.py
+"""Cost of refreshing the shared catalog after edits to the CSV (`app.core.catalog`).
+
+Loads a synthetic catalog into a scratch database, then rewrites the file with a number of
+updated, inserted and deleted movies and times `ensure_catalog_loaded` for each step:
+
+* `touch`: mtime changes, content doesn't (hash check only);
+* `edit_<k>`: k updates + k inserts + k deletes, applied as a diff;
+* `full_reload`: the same file with the stored row hashes discarded, so every movie is
+  rewritten, which is what every change cost before incremental refresh.
+
+Each step checks that catalog membership matches the file, and that the incrementally
+updated statistics and analytics snapshot equal ones rebuilt from the database.
+
+    python -m benchmarks.catalog_refresh --size 100k --edits 10 --edits 1000
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.catalog import ensure_catalog, parse_size
+from benchmarks.suite import _configure_environment
+
+
+def edit_catalog(path: str, edits: int, rng: np.random.Generator):
+    """Rewrites the CSV with `edits` updated, inserted and deleted movies."""
+    df = pd.read_csv(path)
+    positions = rng.choice(len(df), size=2 * edits, replace=False)
+    updated, deleted = positions[:edits], positions[edits:]
+    df.loc[df.index[updated], "vote_average"] = (df["vote_average"].iloc[updated] + 0.1).round(1).clip(upper=10)
+    df.loc[df.index[updated], "budget"] = df["budget"].iloc[updated] + 1
+    inserted = df.iloc[rng.choice(len(df), size=edits, replace=False)].copy()
+    inserted["id"] = np.arange(df["id"].max() + 1, df["id"].max() + 1 + edits)
+    df = pd.concat([df.drop(df.index[deleted]), inserted], ignore_index=True)
+    df.to_csv(path, index=False)
+
+
+def _rows_match(left, right) -> bool:
+    """Equal rows, allowing float noise from averages summed in a different row order."""
+    return len(left) == len(right) and all(
+        len(a) == len(b) and all(math.isclose(x, y, rel_tol=1e-9) if isinstance(x, float) else x == y for x, y in zip(a, b))
+        for a, b in zip(left, right)
+    )
+
+
+def check_consistency(db, path: str) -> Dict[str, bool]:
+    """Membership matches the file; delta-updated statistics and snapshot match full rebuilds."""
+    from app.core import analytics, catalog, models
+    from app.core.data_processor import load_and_filter_movie_csv
+
+    expected_ids = set(load_and_filter_movie_csv(path, {})["id"])
+    member_ids = {movie_id for (movie_id,) in db.query(models.CatalogMovie.movie_id)}
+
+    incremental_stats = catalog._statistics[1]
+    catalog._statistics = None
+    rebuilt_stats = catalog.catalog_statistics(db)
+
+    query = analytics.parse_query(["genre", "year"], ["count", "sum:budget", "avg:vote_average"], limit=10000)
+    analytics.analytics_engine.clear()
+    incremental_rows, _ = analytics.analytics_engine.aggregate(db, query)
+    rebuilt = analytics.AnalyticsEngine()
+    rebuilt_rows, _ = rebuilt.aggregate(db, query)
+    return {
+        "membership_matches": member_ids == expected_ids,
+        "statistics_match": incremental_stats == rebuilt_stats,
+        "analytics_match": _rows_match(incremental_rows.rows, rebuilt_rows.rows),
+    }
+
+
+def timed_refresh(db, path: str) -> float:
+    from app.core.catalog import ensure_catalog_loaded
+
+    start = time.perf_counter()
+    ensure_catalog_loaded(db, path)
+    return time.perf_counter() - start
+
+
+def run(catalog_path: str, workdir: str, edit_sizes: List[int], seed: int) -> Dict[str, Any]:
+    from app.core import analytics, catalog, models
+    from app.core.database import SessionLocal
+
+    path = os.path.join(workdir, "catalog.csv")
+    shutil.copyfile(catalog_path, path)
+    rng = np.random.default_rng(seed)
+    db = SessionLocal()
+    try:
+        results = {"initial_load_s": round(timed_refresh(db, path), 3)}
+        catalog.catalog_statistics(db)  # Warm the in-process structures the refresh updates
+        analytics.analytics_engine.aggregate(db, analytics.parse_query([], ["count"]))
+
+        os.utime(path)
+        results["touch_s"] = round(timed_refresh(db, path), 4)
+
+        for edits in edit_sizes:
+            edit_catalog(path, edits, rng)
+            start = time.perf_counter()
+            catalog.catalog_version(path)
+            hash_s = time.perf_counter() - start
+            catalog._file_versions.pop(path)  # Time the hash again as part of the refresh
+            results[f"edit_{edits}"] = {"refresh_s": round(timed_refresh(db, path), 3), "hash_s": round(hash_s, 3),
+                                        **check_consistency(db, path)}
+
+        # Same content, but without a baseline: every movie is diffed as new and rewritten
+        db.query(models.CatalogMovie).delete()
+        db.commit()
+        catalog._row_hashes = None
+        catalog._loaded_version = None
+        db.query(models.CatalogVersion).delete()
+        db.commit()
+        results["full_reload_s"] = round(timed_refresh(db, path), 3)
+        return results
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental catalog refresh against a full reload.")
+    parser.add_argument("--size", action="append", help="Catalog size (5k, 100k, 1m or a row count). Repeatable.")
+    parser.add_argument("--edits", type=int, action="append", help="Movies updated, inserted and deleted per step. Repeatable.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--output", default="benchmarks/results/catalog_refresh.json")
+    args = parser.parse_args()
+
+    report = {"meta": {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds")}, "results": {}}
+    with tempfile.TemporaryDirectory(prefix="movie-refresh-") as workdir:
+        _configure_environment(workdir)
+        from app.core.database import engine
+        from app.core.migrations import migrate
+
+        migrate()
+        for size in args.size or ["100k"]:
+            rows = parse_size(size)
+            result = run(ensure_catalog(args.data_dir, rows, args.seed), workdir, args.edits or [10, 1000], args.seed)
+            report["results"][f"catalog_refresh@{rows}"] = result
+            print(f"== {rows} rows: initial load {result['initial_load_s']}s, touch {result['touch_s']}s, "
+                  f"full reload {result['full_reload_s']}s")
+            for key, stats in result.items():
+                if key.startswith("edit_"):
+                    print(f"  {key:<12} refresh={stats['refresh_s']}s (hash {stats['hash_s']}s) "
+                          f"membership={stats['membership_matches']} statistics={stats['statistics_match']} "
+                          f"analytics={stats['analytics_match']}")
+        engine.dispose()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
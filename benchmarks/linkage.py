@@ -0,0 +1,123 @@
+# benchmarks/linkage.py
+"""Accuracy and scaling benchmark for `app.core.linkage`.
+
+Builds a second "TMDb" source from a synthetic catalog by sampling movies and perturbing
+them (typos, punctuation and case changes, release years off by one, no shared IDs), adds
+movies that only exist in that source, and links both. Reports precision and recall of the
+links against the known ground truth, candidate pairs per record and time per record, which
+should stay roughly flat as the sources grow.
+
+    python -m benchmarks.linkage --size 5k --size 100k
+"""
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.catalog import ensure_catalog, parse_size
+
+
+def _typo(title: str, rng: np.random.Generator) -> str:
+    """Drops, doubles or swaps one character."""
+    if len(title) < 4:
+        return title
+    i = int(rng.integers(1, len(title) - 1))
+    kind = rng.integers(0, 3)
+    if kind == 0:
+        return title[:i] + title[i + 1:]
+    if kind == 1:
+        return title[:i] + title[i] + title[i:]
+    return title[:i - 1] + title[i] + title[i - 1] + title[i + 1:]
+
+
+def make_second_source(csv_df: pd.DataFrame, seed: int, overlap: float = 0.6, extra: float = 0.2) -> pd.DataFrame:
+    """A perturbed sample of the catalog in fetch_tmdb_movies' column layout, with a `truth_id` column."""
+    rng = np.random.default_rng(seed)
+    sample = csv_df.sample(frac=overlap, random_state=seed)
+    titles = sample["original_title"].astype(str).to_numpy()
+    noisy = rng.random(len(titles))
+    titles = np.array([
+        _typo(t, rng) if r < 0.3 else (t.upper() + "!" if r < 0.4 else t.replace(" ", ": ", 1) if r < 0.5 else t)
+        for t, r in zip(titles, noisy)
+    ])
+    dates = pd.to_datetime(sample["release_date"]) + pd.to_timedelta(
+        np.where(rng.random(len(sample)) < 0.1, 366, 0), unit="D")  # 10% dated a year later
+
+    extras = csv_df.sample(n=int(len(csv_df) * extra), random_state=seed + 1)
+    extra_titles = "Only In Tmdb " + pd.Series(np.arange(len(extras))).astype(str) + " " + extras["original_title"].str.split().str[0].to_numpy()
+    return pd.DataFrame({
+        "id": pd.array([None] * (len(sample) + len(extras)), dtype="Int64"),  # Different ID namespace: force title matching
+        "title": np.concatenate([titles, extra_titles.to_numpy()]),
+        "release_date": np.concatenate([dates.to_numpy(), pd.to_datetime(extras["release_date"]).to_numpy()]),
+        "genre": "Drama",
+        "rating": np.concatenate([sample["vote_average"].to_numpy(), extras["vote_average"].to_numpy()]),
+        "truth_id": np.concatenate([sample["id"].to_numpy(), np.full(len(extras), -1)]),
+    })
+
+
+def run(rows: int, catalog: str, seed: int) -> Dict[str, Any]:
+    from app.core import linkage
+    from app.core.data_processor import load_and_filter_movie_csv
+
+    csv_df = load_and_filter_movie_csv(catalog, {})
+    tmdb_df = make_second_source(csv_df, seed)
+    truth = tmdb_df.pop("truth_id")
+
+    start = time.perf_counter()
+    csv_side, tmdb_side = linkage.from_csv(csv_df), linkage.from_tmdb(tmdb_df)
+    unified = linkage.link_records([csv_side, tmdb_side])
+    elapsed = time.perf_counter() - start
+
+    records = pd.concat([csv_side, tmdb_side], ignore_index=True)
+    years = pd.to_datetime(records["release_date"]).dt.year.astype(float)
+    pairs = linkage.candidate_pairs(linkage._blocking_keys(linkage._tokens(linkage.normalize_titles(records["original_title"])), years),
+                                     records["source"].to_numpy())
+
+    # Merged clusters keep the CSV record's id, so a link is correct if the TMDb copy came from that id
+    linked_ids = set(unified.loc[unified["sources"] == "csv,tmdb", "id"].astype(int))
+    expected_ids = set(truth[truth >= 0].astype(int))
+    true_links = len(linked_ids & expected_ids)
+    expected_rows = len(csv_df) + int((truth < 0).sum())
+    return {
+        "csv_rows": len(csv_df),
+        "tmdb_rows": len(tmdb_df),
+        "unified_rows": len(unified),
+        "expected_unified_rows": expected_rows,
+        "precision": round(true_links / len(linked_ids), 4) if linked_ids else None,
+        "recall": round(true_links / len(expected_ids), 4) if expected_ids else None,
+        "candidate_pairs_per_record": round(len(pairs) / len(records), 2),
+        "seconds": round(elapsed, 3),
+        "us_per_record": round(elapsed / len(records) * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark record linkage accuracy and scaling.")
+    parser.add_argument("--size", action="append", help="Catalog size (5k, 100k, 1m or a row count). Repeatable.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--output", default="benchmarks/results/linkage.json")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    report = {"results": {}}
+    for size in args.size or ["5k", "100k"]:
+        rows = parse_size(size)
+        result = run(rows, ensure_catalog(args.data_dir, rows, args.seed), args.seed)
+        report["results"][f"linkage@{rows}"] = result
+        print(f"== {rows} rows: precision={result['precision']} recall={result['recall']} "
+              f"unified={result['unified_rows']}/{result['expected_unified_rows']} "
+              f"pairs/record={result['candidate_pairs_per_record']} {result['us_per_record']}us/record")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
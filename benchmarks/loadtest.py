@@ -0,0 +1,286 @@
+# benchmarks/loadtest.py
+"""Localhost load generator for the dashboard's submit -> poll -> fetch cycle.
+
+Each simulated user session POSTs /submit-source-a, polls /api/tasks/{id} until the
+task finishes and then GETs /api/tasks/{id}/data, exactly like `main.js`. Sessions
+arrive as an open-loop Poisson process at `--rate` per second, with at most
+`--concurrency` in flight.
+
+    # Against a server you started yourself
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --rate 2 --sessions 100
+
+    # Or let the harness start uvicorn on a scratch database and synthetic catalog
+    python -m benchmarks.loadtest --spawn --catalog-size 100k --rate 5 --duration 60
+
+The summary JSON uses the same `results` layout as `benchmarks.suite`, so two runs can be
+diffed with `python -m benchmarks.suite compare`.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from benchmarks.catalog import ensure_catalog, parse_size
+from benchmarks.suite import percentile
+
+# Weighted filter mix covering cheap (narrow) and expensive (wide) tasks
+DEFAULT_MIX = [
+    {"weight": 5, "filters": {"start_year_a": "2015", "end_year_a": "2016", "avg_votes_a": "7", "language_a": ""}},
+    {"weight": 3, "filters": {"start_year_a": "2005", "end_year_a": "2015", "avg_votes_a": "", "language_a": "en"}},
+    {"weight": 1, "filters": {"start_year_a": "1990", "end_year_a": "2016", "avg_votes_a": "", "language_a": ""}},
+    {"weight": 1, "filters": {"start_year_a": "1950", "end_year_a": "2000", "avg_votes_a": "6", "language_a": "fr"}},
+]
+TERMINAL_STATUSES = {"completed", "failed", "cancelled", "timed out"}
+
+
+class SessionResult:
+    __slots__ = ("submit_s", "completion_s", "fetch_s", "status", "rows", "error", "error_phase")
+
+    def __init__(self):
+        self.submit_s = self.completion_s = self.fetch_s = None
+        self.status = None
+        self.rows = 0
+        self.error = None
+        self.error_phase = None
+
+
+def _request(url: str, data: Optional[Dict[str, str]] = None, timeout: float = 30.0):
+    """Performs one HTTP request and returns (status, body bytes)."""
+    body = urllib.parse.urlencode(data).encode() if data is not None else None
+    req = urllib.request.Request(url, data=body, method="POST" if body is not None else "GET")
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def run_session(base_url: str, form: Dict[str, str], poll_interval: float, session_timeout: float) -> SessionResult:
+    """Drives one submit/poll/fetch cycle and records the latency of each phase."""
+    result = SessionResult()
+    try:
+        start = time.perf_counter()
+        status, body = _request(f"{base_url}/submit-source-a", data=form)
+        result.submit_s = time.perf_counter() - start
+        if status == 429:
+            result.error, result.error_phase = "HTTP 429", "rejected"  # Admission control shed the session
+            return result
+        if status != 200:
+            result.error, result.error_phase = f"HTTP {status}", "submit"
+            return result
+        task_id = json.loads(body)["task_id"]
+
+        deadline = start + session_timeout
+        while True:
+            status, body = _request(f"{base_url}/api/tasks/{task_id}")
+            if status != 200:
+                result.error, result.error_phase = f"HTTP {status}", "poll"
+                return result
+            result.status = json.loads(body)["status"]
+            if result.status in TERMINAL_STATUSES:
+                break
+            if time.perf_counter() > deadline:
+                result.error, result.error_phase = "session timeout", "poll"
+                return result
+            time.sleep(poll_interval)
+        result.completion_s = time.perf_counter() - start
+        if result.status != "completed":
+            result.error, result.error_phase = f"task {result.status}", "task"
+            return result
+
+        fetch_start = time.perf_counter()
+        status, body = _request(f"{base_url}/api/tasks/{task_id}/data")
+        result.fetch_s = time.perf_counter() - fetch_start
+        if status != 200:
+            result.error, result.error_phase = f"HTTP {status}", "fetch"
+            return result
+        result.rows = len(json.loads(body))
+    except (OSError, ValueError, KeyError) as e:
+        result.error, result.error_phase = f"{type(e).__name__}: {e}", result.error_phase or "transport"
+    return result
+
+
+def _latency_summary(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50_s": round(percentile(values, 50), 4),
+        "p90_s": round(percentile(values, 90), 4),
+        "p99_s": round(percentile(values, 99), 4),
+        "max_s": round(max(values), 4),
+    }
+
+
+def summarize(results: List[SessionResult], wall_time: float) -> Dict[str, Any]:
+    errors_by_phase: Dict[str, int] = {}
+    for r in results:
+        if r.error:
+            errors_by_phase[r.error_phase] = errors_by_phase.get(r.error_phase, 0) + 1
+    completed = [r for r in results if r.error is None]
+    return {
+        "sessions": len(results),
+        "completed_sessions": len(completed),
+        "error_rate": round((len(results) - len(completed)) / len(results), 4) if results else 0.0,
+        "errors_by_phase": errors_by_phase,
+        "sessions_per_s": round(len(completed) / wall_time, 3) if wall_time else None,
+        "rows_fetched": sum(r.rows for r in completed),
+        "results": {
+            "submit": _latency_summary([r.submit_s for r in results if r.submit_s is not None]),
+            "time_to_completion": _latency_summary([r.completion_s for r in results if r.completion_s is not None]),
+            "data_fetch": _latency_summary([r.fetch_s for r in results if r.fetch_s is not None]),
+        },
+    }
+
+
+def run_load(base_url: str, mix: List[Dict[str, Any]], rate: float, concurrency: int, sessions: Optional[int],
+             duration: Optional[float], poll_interval: float, session_timeout: float, seed: int) -> Dict[str, Any]:
+    """Issues sessions with exponential inter-arrival times until `sessions` or `duration` is reached."""
+    rng = random.Random(seed)
+    weights = [entry["weight"] for entry in mix]
+    slots = threading.BoundedSemaphore(concurrency)
+    results: List[SessionResult] = []
+    results_lock = threading.Lock()
+    dropped = 0
+
+    def session(form):
+        try:
+            outcome = run_session(base_url, form, poll_interval, session_timeout)
+            with results_lock:
+                results.append(outcome)
+        finally:
+            slots.release()
+
+    start = time.perf_counter()
+    issued = 0
+    next_arrival = start
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while (sessions is None or issued < sessions) and (duration is None or time.perf_counter() - start < duration):
+            time.sleep(max(0.0, next_arrival - time.perf_counter()))
+            next_arrival += rng.expovariate(rate)
+            form = rng.choices(mix, weights=weights)[0]["filters"]
+            if not slots.acquire(blocking=False):
+                dropped += 1  # Open-loop: arrivals beyond the concurrency cap are counted, not queued
+                continue
+            pool.submit(session, form)
+            issued += 1
+    wall_time = time.perf_counter() - start
+
+    summary = summarize(results, wall_time)
+    summary["dropped_arrivals"] = dropped
+    return summary
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(catalog: str, workdir: str, port: int) -> subprocess.Popen:
+    """Starts uvicorn for app.app on localhost with a scratch database and no simulated delays.
+
+    Returns once /ready answers 200, i.e. after migrations and the catalog warm-up.
+    """
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'loadtest.db')}",
+        MOVIE_CATALOG_PATH=os.path.abspath(catalog),
+        SIMULATED_DELAY_SECONDS="0",
+        SUBMIT_RATE_PER_MINUTE="0",  # Every session comes from 127.0.0.1; only the queue bound should shed load
+        LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING"),
+        WARMUP_HOOKS=os.getenv("WARMUP_HOOKS", "catalog"),  # Sessions measure a warm server, not the first catalog load
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        try:
+            status, _ = _request(f"http://127.0.0.1:{port}/ready", timeout=1)
+            if status == 200:
+                return proc
+        except OSError:
+            pass
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not become ready within 300s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the submit/poll/fetch cycle on localhost.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running server.")
+    parser.add_argument("--spawn", action="store_true", help="Start a private uvicorn server instead of using --url.")
+    parser.add_argument("--catalog-size", default="5k", help="Synthetic catalog size for --spawn.")
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--rate", type=float, default=1.0, help="Session arrivals per second.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum sessions in flight.")
+    parser.add_argument("--sessions", type=int, help="Stop after this many sessions.")
+    parser.add_argument("--duration", type=float, help="Stop issuing sessions after this many seconds.")
+    parser.add_argument("--mix", help="JSON file with a list of {\"weight\": .., \"filters\": {form fields}}.")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--session-timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results/loadtest.json")
+    args = parser.parse_args()
+    if args.sessions is None and args.duration is None:
+        args.sessions = 50
+
+    mix = DEFAULT_MIX
+    if args.mix:
+        with open(args.mix) as handle:
+            mix = json.load(handle)
+
+    server = None
+    with tempfile.TemporaryDirectory(prefix="movie-loadtest-") as workdir:
+        base_url = args.url.rstrip("/")
+        if args.spawn:
+            catalog = ensure_catalog(args.data_dir, parse_size(args.catalog_size), args.seed)
+            port = _free_port()
+            server = spawn_server(catalog, workdir, port)
+            base_url = f"http://127.0.0.1:{port}"
+        try:
+            summary = run_load(base_url, mix, args.rate, args.concurrency, args.sessions, args.duration,
+                               args.poll_interval, args.session_timeout, args.seed)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+    summary["meta"] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "url": args.url if not args.spawn else "spawned",
+        "catalog_size": args.catalog_size if args.spawn else None,
+        "rate": args.rate,
+        "concurrency": args.concurrency,
+        "mix": mix,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(summary, handle, indent=2)
+
+    print(f"Sessions: {summary['sessions']} (completed {summary['completed_sessions']}, "
+          f"error rate {summary['error_rate']:.1%}, dropped arrivals {summary['dropped_arrivals']})")
+    for phase, stats in summary["results"].items():
+        if stats["count"]:
+            print(f"  {phase:<20} p50={stats['p50_s']}s p90={stats['p90_s']}s p99={stats['p99_s']}s max={stats['max_s']}s")
+    print(f"Summary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
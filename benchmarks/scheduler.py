@@ -0,0 +1,138 @@
+# benchmarks/scheduler.py
+"""Discrete-event simulation of the task queue under mixed load.
+
+One "bulk" client dumps a burst of wide-range tasks at t=0 while several interactive clients
+keep submitting small queries. The same arrival trace is replayed through a FIFO queue and
+through `app.core.scheduler.TaskScheduler` with a single simulated worker, and the latency
+(submission to completion) of small and large tasks is reported for both.
+
+    python -m benchmarks.scheduler --bulk-tasks 200 --interactive-clients 5 --duration 1800
+
+Nothing touches the database or the CSV, so a run takes a second. The output uses the
+`results` layout of `benchmarks.suite`, so runs can be diffed with `suite compare`.
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from benchmarks.suite import percentile
+
+
+def make_trace(args) -> List[Dict[str, Any]]:
+    """Arrival trace: a bulk burst at t=0 plus Poisson arrivals of small tasks from interactive clients."""
+    rng = random.Random(args.seed)
+    trace = []
+    for i in range(args.bulk_tasks):
+        trace.append({"arrival": i * 0.01, "client": "bulk", "rows": int(args.large_rows * rng.uniform(0.5, 1.5))})
+    for c in range(args.interactive_clients):
+        t = rng.expovariate(args.interactive_rate)
+        while t < args.duration:
+            trace.append({"arrival": t, "client": f"user{c}", "rows": int(args.small_rows * rng.uniform(0.2, 2.0))})
+            t += rng.expovariate(args.interactive_rate)
+    trace.sort(key=lambda task: task["arrival"])
+    for task_id, task in enumerate(trace):
+        task["task_id"] = task_id
+        # Catalog statistics give an estimate, not the true size
+        task["estimated_rows"] = int(task["rows"] * rng.lognormvariate(0, args.estimate_error))
+        task["large"] = task["rows"] > args.small_rows * 2
+    return trace
+
+
+def simulate(trace: List[Dict[str, Any]], policy: str, args) -> List[Dict[str, Any]]:
+    """Replays the trace through one worker; returns the tasks with start/finish times filled in."""
+    from app.core import scheduler
+
+    clock = {"now": 0.0}
+    aging = args.aging_seconds if policy == "fair" else 0
+    queue = scheduler.TaskScheduler(clock=lambda: clock["now"], aging_seconds=aging)
+    pending = [(task["arrival"], task["task_id"]) for task in trace]
+    heapq.heapify(pending)
+    by_id = {task["task_id"]: dict(task) for task in trace}
+    worker_free_at = 0.0
+    done = []
+
+    while pending or queue.qsize():
+        # Admit everything that has arrived by the time the worker is free (or the next arrival if idle)
+        if not queue.qsize():
+            clock["now"] = max(worker_free_at, pending[0][0])
+        else:
+            clock["now"] = worker_free_at
+        while pending and pending[0][0] <= clock["now"]:
+            arrival, task_id = heapq.heappop(pending)
+            task = by_id[task_id]
+            item = {"task_id": task_id, "enqueued_at": arrival}
+            if policy == "fair":
+                item.update(client=task["client"], priority=scheduler.classify(task["estimated_rows"]))
+            else:
+                item.update(client="all", priority=scheduler.BATCH)
+            queue.put_nowait(item)
+        if not queue.qsize():
+            continue
+
+        item = queue.get_nowait()
+        task = by_id[item["task_id"]]
+        task["start"] = clock["now"]
+        task["finish"] = clock["now"] + args.base_seconds + task["rows"] * args.seconds_per_row
+        task["promoted"] = item.get("promoted", False)
+        worker_free_at = task["finish"]
+        done.append(task)
+    return done
+
+
+def latency_summary(tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies = [task["finish"] - task["arrival"] for task in tasks]
+    if not latencies:
+        return {"count": 0}
+    return {
+        "count": len(latencies),
+        "p50_s": round(percentile(latencies, 50), 3),
+        "p90_s": round(percentile(latencies, 90), 3),
+        "p99_s": round(percentile(latencies, 99), 3),
+        "max_s": round(max(latencies), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate FIFO vs fair-share scheduling under mixed load.")
+    parser.add_argument("--bulk-tasks", type=int, default=200, help="Wide tasks submitted at once by one client.")
+    parser.add_argument("--interactive-clients", type=int, default=5)
+    parser.add_argument("--interactive-rate", type=float, default=0.02, help="Small tasks per second per interactive client.")
+    parser.add_argument("--duration", type=float, default=1800, help="Seconds during which interactive tasks arrive.")
+    parser.add_argument("--small-rows", type=int, default=300)
+    parser.add_argument("--large-rows", type=int, default=50000)
+    parser.add_argument("--base-seconds", type=float, default=0.5, help="Fixed cost per task (CSV scan).")
+    parser.add_argument("--seconds-per-row", type=float, default=2e-5, help="Cost per matched row.")
+    parser.add_argument("--estimate-error", type=float, default=0.5, help="Sigma of the log-normal estimate error.")
+    parser.add_argument("--aging-seconds", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results/scheduler.json")
+    args = parser.parse_args()
+
+    trace = make_trace(args)
+    report = {"meta": {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "args": vars(args)},
+              "results": {}}
+    for policy in ("fifo", "fair"):
+        done = simulate(trace, policy, args)
+        small = [task for task in done if not task["large"]]
+        large = [task for task in done if task["large"]]
+        report["results"][f"small_task_latency@{policy}"] = latency_summary(small)
+        report["results"][f"large_task_latency@{policy}"] = latency_summary(large)
+        report["meta"][f"makespan_s@{policy}"] = round(max(task["finish"] for task in done), 3)
+        report["meta"][f"promoted_tasks@{policy}"] = sum(task["promoted"] for task in done)
+
+    print(f"{len(trace)} tasks ({args.bulk_tasks} bulk) on one worker")
+    for key, stats in report["results"].items():
+        print(f"  {key:<28} n={stats['count']:<5} p50={stats['p50_s']}s p90={stats['p90_s']}s "
+              f"p99={stats['p99_s']}s max={stats['max_s']}s")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/serialization.py
+"""Rows-serialized-per-second benchmark for the task data endpoint's read path.
+
+Compares the original path (ORM objects -> List[MovieRecordRead] validation -> JSON) with
+the fast path in `app.core.results` (column tuples -> orjson), and fails if the two
+bodies differ by a single byte.
+
+    python -m benchmarks.serialization --size 100k
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+from benchmarks.catalog import ensure_catalog, parse_size
+from benchmarks.suite import DEFAULT_FILTERS, measure
+
+
+def run(rows: int, catalog: str, repeats: int) -> Dict[str, Dict[str, Any]]:
+    from pydantic import TypeAdapter
+    from app.core import models, queue_manager, results, schemas
+    from app.core.catalog import ensure_catalog_loaded
+    from app.core.database import SessionLocal
+    from app.core.data_processor import load_and_filter_movie_csv
+
+    adapter = TypeAdapter(List[schemas.MovieRecordRead])
+    db = SessionLocal()
+    try:
+        filters = dict(DEFAULT_FILTERS, start_year="", end_year="")  # Keep every row of the catalog
+        task = models.Task(status=models.TaskStatus.COMPLETED, filters=filters)
+        db.add(task)
+        db.commit()
+        ensure_catalog_loaded(db, catalog)
+        queue_manager.save_movie_records(db, task.id, load_and_filter_movie_csv(catalog, filters))
+
+        def orm_records():
+            rows = results.query_task_records(db, task, models.Movie, models.TaskMovie.task_id).all()
+            return [dict(vars(movie), task_id=task_id) for movie, task_id in rows]
+
+        def orm_path() -> bytes:
+            return adapter.dump_json(adapter.validate_python(orm_records()))
+
+        def fast_path() -> bytes:
+            return results.encode_rows_json(results.fetch_task_rows(db, task))
+
+        legacy_body, fast_body = orm_path(), fast_path()
+        if legacy_body != fast_body:
+            raise AssertionError("Fast path output differs from the response_model serialization")
+        count = len(json.loads(fast_body))
+
+        orm_rows = orm_records()
+        tuple_rows = results.fetch_task_rows(db, task)
+        report = {
+            "orm_pydantic_end_to_end": measure(lambda: orm_path() and count, repeats),
+            "fast_path_end_to_end": measure(lambda: fast_path() and count, repeats),
+            "orm_pydantic_encode_only": measure(lambda: adapter.dump_json(adapter.validate_python(orm_rows)) and count, repeats),
+            "fast_path_encode_only": measure(lambda: results.encode_rows_json(tuple_rows) and count, repeats),
+        }
+        db.expunge_all()
+        return report
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark task-data serialization paths.")
+    parser.add_argument("--size", action="append", help="Catalog size (5k, 100k, 1m or a row count). Repeatable.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--output", default="benchmarks/results/serialization.json")
+    args = parser.parse_args()
+
+    report = {"results": {}}
+    with tempfile.TemporaryDirectory(prefix="movie-serialization-") as workdir:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        from app.core.database import engine
+        from app.core.migrations import migrate
+
+        migrate()
+        for size in args.size or ["100k"]:
+            rows = parse_size(size)
+            catalog = ensure_catalog(args.data_dir, rows, args.seed)
+            try:
+                size_report = run(rows, catalog, args.repeats)
+            except AssertionError as e:
+                print(f"FAILED: {e}")
+                sys.exit(1)
+            print(f"== {rows} rows: outputs are byte-identical")
+            for name, result in size_report.items():
+                report["results"][f"{name}@{rows}"] = result
+                print(f"  {name:<28} p50={result['p50_s']:.4f}s {result['throughput_rows_per_s']:>14} rows/s")
+        engine.dispose()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
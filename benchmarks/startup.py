@@ -0,0 +1,158 @@
+# benchmarks/startup.py
+"""Cold-start benchmark: import time of the web app and the task worker, and time to readiness.
+
+Each run imports the module in a fresh interpreter under `python -X importtime` and reads
+the cumulative import time of the module from the report, so interpreter startup and
+site-packages hooks are left out. Modules that should only load on first use (pandas,
+requests, ...) are flagged if the import pulls them in.
+
+With `--serve`, uvicorn is also started on a scratch database and timed until `/ready`
+answers 200, once without warm-up hooks and once per `--warmup` setting.
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --serve --warmup catalog --catalog-size 100k --fail-on-heavy
+
+The output uses the same `results` layout as `benchmarks.suite`, so two runs can be diffed
+with `python -m benchmarks.suite compare`.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.catalog import ensure_catalog, parse_size
+from benchmarks.suite import percentile
+
+# (name, module): what the web server and the in-process task worker import before serving
+ENTRY_POINTS = [("web", "app.app"), ("worker", "app.core.queue_manager")]
+# Loaded on first use; an entry point that imports one of these regressed
+DEFERRED_MODULES = ("pandas", "numpy", "requests", "dotenv", "pyarrow", "duckdb")
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """module -> (self us, cumulative us) from a `-X importtime` report (first import of each module)."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return modules
+
+
+def import_once(module: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """Imports `module` in a fresh interpreter. Returns (wall seconds incl. interpreter startup, report)."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"))
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    report = parse_importtime(proc.stderr)
+    if module not in report:
+        raise RuntimeError(f"No importtime entry for {module}")
+    return wall, report
+
+
+def measure_imports(module: str, runs: int, top: int) -> Dict[str, Any]:
+    """Import-time percentiles, the slowest top-level packages and any deferred modules that got loaded."""
+    import_times, walls = [], []
+    by_package = defaultdict(list)
+    loaded = set()
+    for _ in range(runs):
+        wall, report = import_once(module)
+        walls.append(wall)
+        import_times.append(report[module][1] / 1e6)
+        totals = defaultdict(int)
+        for name, (self_us, _) in report.items():
+            totals[name.split(".")[0]] += self_us
+        for package, self_us in totals.items():
+            by_package[package].append(self_us)
+        loaded.update(name for name in DEFERRED_MODULES if name in report)
+
+    slowest = sorted(((percentile(times, 50), package) for package, times in by_package.items()), reverse=True)[:top]
+    p50 = percentile(import_times, 50)
+    return {
+        "runs": runs,
+        "p50_s": round(p50, 4),
+        "p99_s": round(percentile(import_times, 99), 4),
+        "mean_s": round(sum(import_times) / runs, 4),
+        "process_p50_s": round(percentile(walls, 50), 4),  # Includes interpreter startup
+        "slowest_packages_ms": {package: round(us / 1000, 1) for us, package in slowest},
+        "deferred_modules_loaded": sorted(loaded),
+    }
+
+
+def measure_ready(catalog: str, warmup: str, runs: int) -> Dict[str, Any]:
+    """Seconds from spawning uvicorn until /ready answers 200, with the given WARMUP_HOOKS."""
+    from benchmarks.loadtest import _free_port, spawn_server
+
+    timings = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory(prefix="movie-startup-") as workdir:
+            os.environ["WARMUP_HOOKS"] = warmup
+            start = time.perf_counter()
+            server = spawn_server(catalog, workdir, _free_port())
+            timings.append(time.perf_counter() - start)
+            server.terminate()
+            server.wait(timeout=10)
+    return {
+        "runs": runs,
+        "p50_s": round(percentile(timings, 50), 3),
+        "p99_s": round(percentile(timings, 99), 3),
+        "mean_s": round(sum(timings) / runs, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold-start import time and time to readiness.")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per entry point.")
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level packages to report.")
+    parser.add_argument("--serve", action="store_true", help="Also time uvicorn from spawn to a 200 on /ready.")
+    parser.add_argument("--serve-runs", type=int, default=3)
+    parser.add_argument("--warmup", action="append", help="WARMUP_HOOKS value to time with --serve. Repeatable.")
+    parser.add_argument("--catalog-size", default="5k", help="Synthetic catalog size for --serve.")
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fail-on-heavy", action="store_true", help="Exit 1 if an entry point loads a deferred module.")
+    parser.add_argument("--output", default="benchmarks/results/startup.json")
+    args = parser.parse_args()
+
+    report = {"meta": {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                       "python": sys.version.split()[0], "runs": args.runs},
+              "results": {}}
+    offenders: List[str] = []
+    for name, module in ENTRY_POINTS:
+        result = measure_imports(module, args.runs, args.top)
+        report["results"][f"import_{name}"] = result
+        slowest = ", ".join(f"{package} {ms}ms" for package, ms in result["slowest_packages_ms"].items())
+        print(f"== import {module}: p50={result['p50_s']}s p99={result['p99_s']}s "
+              f"(process {result['process_p50_s']}s) deferred modules loaded: {result['deferred_modules_loaded'] or 'none'}")
+        print(f"  slowest: {slowest}")
+        offenders.extend(f"{module} -> {loaded}" for loaded in result["deferred_modules_loaded"])
+
+    if args.serve:
+        catalog = ensure_catalog(args.data_dir, parse_size(args.catalog_size), args.seed)
+        for warmup in [""] + [value for value in args.warmup or [] if value]:
+            result = measure_ready(catalog, warmup, args.serve_runs)
+            report["results"][f"ready@{warmup or 'no_warmup'}"] = result
+            print(f"== time to /ready with WARMUP_HOOKS={warmup!r}: p50={result['p50_s']}s p99={result['p99_s']}s")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.fail_on_heavy and offenders:
+        print(f"Deferred modules imported at startup: {', '.join(offenders)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
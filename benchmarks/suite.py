@@ -0,0 +1,255 @@
+# benchmarks/suite.py
+"""Benchmark suite for the CSV loader, the record writer, the data endpoint and whole tasks.
+
+    python -m benchmarks.suite run --size 5k --size 100k --output benchmarks/results/latest.json
+    python -m benchmarks.suite compare benchmarks/results/base.json benchmarks/results/latest.json
+
+Every benchmark runs against a throw-away SQLite database and a synthetic catalog from
+`benchmarks.catalog`, so results only depend on the code and the machine.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from benchmarks.catalog import ensure_catalog, parse_size
+
+# Mirrors what the dashboard form submits (empty strings for unset fields)
+DEFAULT_FILTERS = {"start_year": "1990", "end_year": "2016", "min_rating": "", "language": ""}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    pos = (len(ordered) - 1) * q / 100.0
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def measure(fn: Callable[[], int], repeats: int) -> Dict[str, Any]:
+    """Times `fn` `repeats` times, then runs it once more under tracemalloc for peak memory.
+
+    `fn` returns the number of rows it processed, which is used for throughput.
+    """
+    fn()  # Warm-up: imports, page cache, SQLite statement cache
+    timings, rows = [], 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rows = fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50 = percentile(timings, 50)
+    return {
+        "runs": repeats,
+        "rows": rows,
+        "p50_s": round(p50, 6),
+        "p99_s": round(percentile(timings, 99), 6),
+        "mean_s": round(sum(timings) / len(timings), 6),
+        "throughput_rows_per_s": round(rows / p50, 1) if p50 > 0 else None,
+        "peak_mem_mb": round(peak / 2**20, 2),
+    }
+
+
+def _configure_environment(workdir: str):
+    """Points the app at a scratch database before any app module is imported."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["SIMULATED_DELAY_SECONDS"] = "0"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from app.logging.logger import setup_logging
+
+    setup_logging()  # As the server does on startup
+
+
+def _bench_request(headers: Dict[str, str] = None):
+    """Minimal Starlette request for calling endpoint functions directly."""
+    from starlette.requests import Request
+
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": raw_headers})
+
+
+def run_size(rows: int, catalog: str, repeats: int, filters: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Runs every benchmark for one catalog size.
+
+    Throughput is in catalog rows for the loader and end-to-end runs, and in result rows
+    for the writer and the data endpoint.
+    """
+    from app.core import models, queue_manager
+    from app.core.catalog import ensure_catalog_loaded
+    from app.core.database import SessionLocal
+    from app.core.data_processor import load_and_filter_movie_csv
+    from app.api import tasks as tasks_api
+    from app.core.result_cache import result_cache
+
+    queue_manager.SOURCE_A_MOVIE_PATH = catalog
+    db = SessionLocal()
+
+    def new_task(status=models.TaskStatus.PENDING) -> int:
+        task = models.Task(status=status, filters=filters)
+        db.add(task)
+        db.commit()
+        return task.id
+
+    def fetch(task_id: int) -> int:
+        response = tasks_api.get_task_data(task_id, _bench_request(), year=None, genre=None, min_rating=None, language=None, format="json", db=db)
+        return len(response.body)
+
+    results = {}
+    try:
+        results["load_and_filter_movie_csv"] = measure(lambda: rows if load_and_filter_movie_csv(catalog, filters) is not None else 0, repeats)
+
+        filtered_df = load_and_filter_movie_csv(catalog, filters)
+        ensure_catalog_loaded(db, catalog)  # Once per catalog version; tasks only write movie IDs
+
+        def save():
+            queue_manager.save_movie_records(db, new_task(), filtered_df)
+            return len(filtered_df)
+
+        results["save_movie_records"] = measure(save, repeats)
+
+        data_task_id = new_task(models.TaskStatus.COMPLETED)
+        queue_manager.save_movie_records(db, data_task_id, filtered_df)
+        data_rows = len(filtered_df)
+
+        def fetch_cold():
+            result_cache.clear()
+            fetch(data_task_id)
+            return data_rows
+
+        results["get_task_data"] = measure(fetch_cold, repeats)
+        results["get_task_data_cached"] = measure(lambda: fetch(data_task_id) and data_rows, repeats)
+
+        def end_to_end():
+            task_id = new_task()
+            queue_manager.process_task(task_id, filters)
+            fetch(task_id)
+            return rows
+
+        results["end_to_end_task"] = measure(end_to_end, repeats)
+    finally:
+        db.close()
+    return results
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args) -> Dict[str, Any]:
+    filters = dict(DEFAULT_FILTERS, **json.loads(args.filters)) if args.filters else DEFAULT_FILTERS
+    with tempfile.TemporaryDirectory(prefix="movie-bench-") as workdir:
+        _configure_environment(workdir)
+        from app.core.database import engine
+        from app.core.migrations import migrate
+
+        migrate()
+
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeats": args.repeats,
+                "filters": filters,
+            },
+            "results": {},
+        }
+        for size in args.size or ["5k", "100k"]:
+            rows = parse_size(size)
+            catalog = ensure_catalog(args.data_dir, rows, args.seed)
+            print(f"== {rows} rows ({catalog})")
+            for name, result in run_size(rows, catalog, args.repeats, filters).items():
+                key = f"{name}@{rows}"
+                report["results"][key] = result
+                print(f"  {key:<40} p50={result['p50_s']:.4f}s p99={result['p99_s']:.4f}s "
+                      f"{result['throughput_rows_per_s']} rows/s peak={result['peak_mem_mb']}MB")
+            with engine.connect() as connection:
+                # WAL mode: move committed pages out of bench.db-wal so the file size counts them
+                connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            report["meta"][f"database_bytes@{rows}"] = os.path.getsize(os.path.join(workdir, "bench.db"))
+            print(f"  database size after this size: {report['meta'][f'database_bytes@{rows}'] / 2**20:.1f}MB")
+        engine.dispose()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {args.output}")
+    return report
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float, mem_threshold: float) -> List[str]:
+    """Returns a list of human-readable regressions between two result files."""
+    regressions = []
+    base_results, new_results = baseline["results"], current["results"]
+    for key in sorted(set(base_results) & set(new_results)):
+        old, new = base_results[key], new_results[key]
+        for metric, limit in (("p50_s", threshold), ("p99_s", threshold), ("peak_mem_mb", mem_threshold)):
+            if not old.get(metric) or new.get(metric) is None:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            flag = "REGRESSION" if change > limit else ""
+            print(f"  {key:<40} {metric:<12} {old[metric]:>12} -> {new[metric]:>12} ({change:+.1%}) {flag}")
+            if flag:
+                regressions.append(f"{key} {metric} {change:+.1%}")
+    for key in sorted(set(base_results) ^ set(new_results)):
+        print(f"  {key:<40} only present in one of the files")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Movie pipeline benchmark suite.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run the benchmarks and write a JSON results file.")
+    run_parser.add_argument("--size", action="append", help="Catalog size (5k, 100k, 1m, 10m or a row count). Repeatable.")
+    run_parser.add_argument("--repeats", type=int, default=5, help="Timed runs per benchmark (after one warm-up).")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--filters", help="JSON object merged over the default task filters.")
+    run_parser.add_argument("--data-dir", default="benchmarks/data", help="Where generated catalogs are cached.")
+    run_parser.add_argument("--output", default="benchmarks/results/latest.json")
+
+    cmp_parser = sub.add_parser("compare", help="Compare two results files and flag regressions.")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown of p50/p99.")
+    cmp_parser.add_argument("--mem-threshold", type=float, default=0.20, help="Allowed relative growth of peak memory.")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+        return
+
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    with open(args.current) as handle:
+        current = json.load(handle)
+    regressions = compare(baseline, current, args.threshold, args.mem_threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) found.")
+        sys.exit(1)
+    print("No regressions found.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# tests/conftest.py
+import csv
+import itertools
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import catalog
+from app.core.migrations import migrate
+
+CATALOG_COLUMNS = ["budget", "genres", "id", "original_language", "original_title", "release_date", "revenue",
+                   "runtime", "vote_average", "vote_count"]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A migrated scratch SQLite database."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    migrate(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog_state(monkeypatch):
+    """Forgets the catalog version, row hashes and statistics a previous test loaded into this process."""
+    monkeypatch.setattr(catalog, "_loaded_version", None)
+    monkeypatch.setattr(catalog, "_file_versions", {})
+    monkeypatch.setattr(catalog, "_row_hashes", None)
+    monkeypatch.setattr(catalog, "_statistics", None)
+
+
+def _catalog_row(movie: dict) -> dict:
+    """A catalog CSV row in the TMDb export layout; `movie` needs an id and overrides the defaults."""
+    row = {
+        "budget": 1000, "genres": json.dumps([{"id": 1, "name": "Drama"}]), "original_language": "en",
+        "original_title": f"Movie {movie['id']}", "release_date": "2000-01-01", "revenue": 2000,
+        "runtime": 100, "vote_average": 7.0, "vote_count": 10,
+    }
+    row.update(movie)
+    return row
+
+
+@pytest.fixture
+def write_catalog(tmp_path):
+    """Writes movies (dicts with an id plus any fields to override) to a new catalog CSV and returns its path.
+
+    Every call writes a new file, so a catalog_version() cached by size and mtime never goes stale.
+    """
+    counter = itertools.count()
+
+    def write(movies) -> str:
+        path = tmp_path / f"catalog_{next(counter)}.csv"
+        with open(path, "w", newline="") as handle:
+            writer = csv.DictWriter(handle, fieldnames=CATALOG_COLUMNS)
+            writer.writeheader()
+            writer.writerows(_catalog_row(movie) for movie in movies)
+        return str(path)
+
+    return write
@@ -0,0 +1,79 @@
+# tests/test_catalog.py
+import pytest
+
+from app.core import catalog, models, retention
+
+V1 = [{"id": movie_id} for movie_id in range(1, 6)]
+# Movie 2 deleted, movie 3 re-rated, movie 6 added
+V2 = [{"id": 1}, {"id": 3, "vote_average": 9.5}, {"id": 4}, {"id": 5}, {"id": 6}]
+
+
+@pytest.fixture
+def changes(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(catalog, "_change_listeners", [recorded.append])
+    return recorded
+
+
+@pytest.fixture(autouse=True)
+def quick_retention(monkeypatch):
+    monkeypatch.setattr(retention, "RETENTION_BATCH_ROWS", 1)
+    monkeypatch.setattr(retention, "RETENTION_BATCH_PAUSE_SECONDS", 0)
+
+
+def _ids(db, column) -> list:
+    return sorted(movie_id for (movie_id,) in db.query(column))
+
+
+@pytest.mark.parametrize("other_process", [False, True], ids=["hashes_in_memory", "hashes_from_catalog_movies"])
+def test_edited_catalog_writes_only_the_differences(db, write_catalog, changes, other_process):
+    first = catalog.ensure_catalog_loaded(db, write_catalog(V1))
+    if other_process:
+        catalog._row_hashes = None  # Diff against catalog_movies, as a process that didn't load v1 would
+
+    second = catalog.ensure_catalog_loaded(db, write_catalog(V2))
+
+    change = changes[-1]
+    assert (change.previous, change.version) == (first, second)
+    assert sorted(row["id"] for row in change.added) == [3, 6]
+    assert sorted(row["id"] for row in change.removed) == [2, 3]
+    assert change.deleted_ids == [2]
+    assert _ids(db, models.CatalogMovie.movie_id) == [1, 3, 4, 5, 6]
+    assert _ids(db, models.Movie.id) == [1, 3, 4, 5, 6]
+    assert db.get(models.Movie, 3).vote_average == 9.5
+    assert catalog.latest_catalog_version(db) == second
+
+
+def test_unchanged_content_is_not_reloaded(db, write_catalog, changes):
+    first = catalog.ensure_catalog_loaded(db, write_catalog(V1))
+
+    assert catalog.ensure_catalog_loaded(db, write_catalog(V1)) == first
+    assert len(changes) == 1
+
+
+def test_removed_movies_stay_while_a_task_needs_them(db, write_catalog):
+    catalog.ensure_catalog_loaded(db, write_catalog(V1))
+    task = models.Task(status=models.TaskStatus.COMPLETED.value, filters={})
+    db.add(task)
+    db.flush()
+    db.add_all([models.TaskMovie(task_id=task.id, movie_id=movie_id) for movie_id in (1, 2)])
+    db.commit()
+
+    catalog.ensure_catalog_loaded(db, write_catalog(V2))
+
+    assert _ids(db, models.Movie.id) == [1, 2, 3, 4, 5, 6]
+    assert retention.delete_orphan_movies(db) == 0
+
+    retention.delete_task(db, task.id)
+
+    assert retention.delete_orphan_movies(db) == 1
+    assert _ids(db, models.Movie.id) == [1, 3, 4, 5, 6]
+
+
+def test_orphan_movies_are_deleted_in_batches(db, write_catalog):
+    catalog.ensure_catalog_loaded(db, write_catalog(V1))
+    db.add_all([models.Movie(id=-movie_id, original_title="Migrated") for movie_id in range(1, 4)])
+    db.commit()
+
+    assert retention.delete_orphan_movies(db) == 3
+    assert _ids(db, models.Movie.id) == [1, 2, 3, 4, 5]
@@ -0,0 +1,59 @@
+# tests/test_linkage.py
+import numpy as np
+import pandas as pd
+
+from app.core import linkage
+
+
+def _csv(*movies) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": [movie_id for movie_id, _, _ in movies],
+        "original_title": [title for _, title, _ in movies],
+        "release_date": [date for _, _, date in movies],
+        "genres": "Science Fiction",
+        "vote_average": 7.0,
+    }).reindex(columns=linkage.UNIFIED_COLUMNS).assign(source="csv")
+
+
+def _tmdb(*movies) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": pd.array([movie_id for movie_id, _, _ in movies], dtype="Int64"),
+        "original_title": [title for _, title, _ in movies],
+        "release_date": [date for _, _, date in movies],
+        "genres": "Drama",
+        "vote_average": 6.0,
+    }).reindex(columns=linkage.UNIFIED_COLUMNS).assign(source="tmdb")
+
+
+def test_one_record_of_the_other_source_never_merges_two_catalog_movies():
+    csv = _csv((10, "Star Wars", "1977-05-25"), (11, "Star Wars II", "1977-05-25"))
+    tmdb = _tmdb((None, "Star Wars", "1977-05-25"))
+
+    unified = linkage.link_records([csv, tmdb])
+
+    assert sorted(unified["id"].astype(int)) == [10, 11]
+    assert unified.set_index("id").loc[10, "sources"] == "csv,tmdb"
+    assert unified.set_index("id").loc[11, "sources"] == "csv"
+
+
+def test_a_shared_id_wins_over_a_title_match():
+    csv = _csv((10, "Star Wars", "1977-05-25"), (11, "Star Wars II", "1977-05-25"))
+    tmdb = _tmdb((11, "Star Wars", "1977-05-25"))
+
+    unified = linkage.link_records([csv, tmdb]).set_index("id")
+
+    assert sorted(unified.index.astype(int)) == [10, 11]
+    assert unified.loc[11, "sources"] == "csv,tmdb"
+    assert unified.loc[10, "sources"] == "csv"
+
+
+def test_each_record_keeps_only_its_mutual_best_link():
+    # Records 0 and 1 are csv, 2 and 3 are tmdb; 0-2 is the strongest link of both its ends
+    sources = np.array(["csv", "csv", "tmdb", "tmdb"], dtype=object)
+    rec_x = np.array([0, 1, 0, 1])
+    rec_y = np.array([2, 2, 3, 3])
+    strength = np.array([0.9, 0.8, 0.7, 0.65])
+
+    keep = linkage.one_to_one(rec_x, rec_y, strength, sources)
+
+    assert keep.tolist() == [True, False, False, True]
@@ -0,0 +1,73 @@
+# tests/test_migrations.py
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.migrations import migrate
+
+# Schema and rows as written by the app before results moved to the shared catalog
+LEGACY_SCHEMA = [
+    "CREATE TABLE tasks (id INTEGER NOT NULL PRIMARY KEY, status VARCHAR, created_at DATETIME, updated_at DATETIME, "
+    "filters JSON)",
+    "CREATE INDEX ix_tasks_id ON tasks (id)",
+    "CREATE INDEX ix_tasks_status ON tasks (status)",
+    "CREATE TABLE movie_records (id INTEGER NOT NULL PRIMARY KEY, task_id INTEGER REFERENCES tasks (id), "
+    "original_title VARCHAR, release_date DATETIME, genres VARCHAR, vote_average FLOAT, runtime INTEGER, "
+    "revenue INTEGER, budget INTEGER, vote_count INTEGER, original_language VARCHAR)",
+    "INSERT INTO tasks (id, status, filters) VALUES (1, 'completed', '{}'), (2, 'completed', '{}')",
+    "INSERT INTO movie_records (id, task_id, original_title, vote_average) VALUES "
+    "(1, 1, 'First', 7.5), (2, 1, 'Second', 6.0), (3, 2, 'First', 7.5)",
+]
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+    yield engine
+    engine.dispose()
+
+
+def test_legacy_movie_records_are_moved_into_task_movies(legacy_engine):
+    migrate(legacy_engine)
+
+    with legacy_engine.connect() as connection:
+        results = connection.execute(text(
+            "SELECT t.task_id, m.original_title, m.vote_average FROM task_movies t JOIN movies m ON m.id = t.movie_id "
+            "ORDER BY t.task_id, m.original_title")).all()
+        in_catalog = connection.execute(text("SELECT COUNT(*) FROM catalog_movies")).scalar()
+    assert results == [(1, "First", 7.5), (1, "Second", 6.0), (2, "First", 7.5)]
+    assert in_catalog == 0
+    assert not inspect(legacy_engine).has_table("movie_records")
+
+
+def test_migrate_is_safe_to_rerun(legacy_engine):
+    migrate(legacy_engine)
+    migrate(legacy_engine)
+
+    with legacy_engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM task_movies")).scalar() == 3
+
+
+def test_tasks_table_is_rebuilt_with_autoincrement(legacy_engine):
+    with legacy_engine.begin() as connection:  # As created by the shared-catalog schema before the rebuild existed
+        connection.execute(text("CREATE TABLE task_movies (task_id INTEGER NOT NULL REFERENCES tasks (id), "
+                                "movie_id INTEGER NOT NULL, PRIMARY KEY (task_id, movie_id)) WITHOUT ROWID"))
+        connection.execute(text("INSERT INTO task_movies VALUES (2, 100)"))
+
+    migrate(legacy_engine)
+
+    with legacy_engine.begin() as connection:
+        schema = dict(connection.execute(text("SELECT name, sql FROM sqlite_master WHERE sql IS NOT NULL")).all())
+        assert "AUTOINCREMENT" in schema["tasks"].upper()
+        assert {"ix_tasks_id", "ix_tasks_status"} <= set(schema)
+        assert not any("_tasks_without_autoincrement" in name + sql for name, sql in schema.items())
+        assert "REFERENCES tasks (id)" in schema["task_movies"]  # Not pointed at the renamed table
+        assert connection.execute(text("SELECT id, status FROM tasks ORDER BY id")).all() == [(1, "completed"), (2, "completed")]
+        assert connection.execute(text("PRAGMA foreign_key_check")).all() == []
+
+        connection.execute(text("DELETE FROM task_movies WHERE task_id = 2"))
+        connection.execute(text("DELETE FROM tasks WHERE id = 2"))
+        new_id = connection.execute(text("INSERT INTO tasks (status, filters) VALUES ('pending', '{}')")).lastrowid
+    assert new_id == 3  # The deleted task's ID is not handed out again
@@ -0,0 +1,101 @@
+# tests/test_queue_manager.py
+import pytest
+
+from app.core import models, queue_manager
+
+MOVIES = [{"id": movie_id} for movie_id in range(1, 8)]
+
+
+@pytest.fixture
+def worker(monkeypatch, session_factory, write_catalog):
+    """Points process_task at the scratch database and a small catalog, without simulated delays."""
+    monkeypatch.setattr(queue_manager, "SessionLocal", session_factory)
+    monkeypatch.setattr(queue_manager, "SOURCE_A_MOVIE_PATH", write_catalog(MOVIES))
+    monkeypatch.setattr(queue_manager, "SIMULATED_DELAY_SECONDS", 0)
+    monkeypatch.setattr(queue_manager, "SAVE_CHUNK_ROWS", 2)
+    monkeypatch.setattr(queue_manager, "cancel_requests", set())
+    monkeypatch.setattr(queue_manager, "task_queue", queue_manager.TaskScheduler())
+
+
+def _task(db, status=models.TaskStatus.PENDING) -> int:
+    task = models.Task(status=status.value, filters={})
+    db.add(task)
+    db.commit()
+    return task.id
+
+
+def _state(session_factory, task_id: int):
+    """(status, number of task_movies rows) as another connection sees them."""
+    with session_factory() as other:
+        status = other.query(models.Task.status).filter(models.Task.id == task_id).scalar()
+        rows = other.query(models.TaskMovie).filter(models.TaskMovie.task_id == task_id).count()
+    return status, rows
+
+
+def test_completed_task_saves_its_movies(worker, db, session_factory):
+    task_id = _task(db)
+
+    queue_manager.process_task(task_id, {})
+
+    assert _state(session_factory, task_id) == (models.TaskStatus.COMPLETED.value, len(MOVIES))
+
+
+def test_cancel_during_save_rolls_back_every_chunk(worker, db, session_factory, monkeypatch):
+    task_id = _task(db)
+    save = queue_manager.save_movie_records
+
+    def save_then_cancel(db, task_id, records_df, on_chunk=None, commit=True):
+        chunks = []
+
+        def cancel_after_first_chunk():
+            if chunks:
+                queue_manager.cancel_requests.add(task_id)  # What cancel_task does before its status update
+            chunks.append(1)
+            on_chunk()
+
+        save(db, task_id, records_df, on_chunk=cancel_after_first_chunk, commit=commit)
+
+    monkeypatch.setattr(queue_manager, "save_movie_records", save_then_cancel)
+
+    queue_manager.process_task(task_id, {})
+
+    assert _state(session_factory, task_id) == (models.TaskStatus.CANCELLED.value, 0)
+
+
+def test_cancel_from_another_process_while_saving_discards_the_results(worker, db, session_factory, monkeypatch):
+    task_id = _task(db)
+    save = queue_manager.save_movie_records
+
+    def cancelled_elsewhere_then_save(db, task_id, records_df, on_chunk=None, commit=True):
+        with session_factory() as other:  # Not seen by the in-process checks; only the final compare-and-set catches it
+            other.query(models.Task).filter(models.Task.id == task_id).update({models.Task.status: models.TaskStatus.CANCELLED.value})
+            other.commit()
+        save(db, task_id, records_df, on_chunk=on_chunk, commit=commit)
+
+    monkeypatch.setattr(queue_manager, "save_movie_records", cancelled_elsewhere_then_save)
+
+    queue_manager.process_task(task_id, {})
+
+    assert _state(session_factory, task_id) == (models.TaskStatus.CANCELLED.value, 0)
+
+
+def test_task_cancelled_while_queued_is_skipped(worker, db, session_factory):
+    task_id = _task(db)
+    queue_manager.add_task_to_queue(task_id, {})
+
+    assert queue_manager.cancel_task(db, task_id)
+    assert queue_manager.task_queue.qsize() == 0
+    queue_manager.process_task(task_id, {})
+
+    assert _state(session_factory, task_id) == (models.TaskStatus.CANCELLED.value, 0)
+    assert task_id not in queue_manager.cancel_requests
+
+
+@pytest.mark.parametrize("status", [models.TaskStatus.COMPLETED, models.TaskStatus.FAILED, models.TaskStatus.TIMED_OUT])
+def test_cancel_leaves_finished_tasks_alone(worker, db, session_factory, status):
+    task_id = _task(db, status)
+
+    assert not queue_manager.cancel_task(db, task_id)
+
+    assert _state(session_factory, task_id) == (status.value, 0)
+    assert task_id not in queue_manager.cancel_requests
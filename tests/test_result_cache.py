@@ -0,0 +1,52 @@
+# tests/test_result_cache.py
+from app.core.result_cache import CachedResult, ResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _entry(size: int = 10) -> CachedResult:
+    return CachedResult(b"x" * size, '"etag"', "identity", "application/json")
+
+
+def test_entries_expire_after_the_ttl():
+    clock = FakeClock()
+    cache = ResultCache(max_bytes=1000, ttl_seconds=60, clock=clock)
+    cache.put((1, "format=json", "identity"), _entry())
+
+    clock.now = 59
+    assert cache.get((1, "format=json", "identity")) is not None
+    clock.now = 60
+    assert cache.get((1, "format=json", "identity")) is None
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+
+
+def test_a_zero_ttl_keeps_entries_until_evicted():
+    clock = FakeClock()
+    cache = ResultCache(max_bytes=25, clock=clock)
+    cache.put((1, "a", "identity"), _entry())
+    cache.put((2, "a", "identity"), _entry())
+    clock.now = 10 ** 9
+    assert cache.get((1, "a", "identity")) is not None
+
+    cache.put((3, "a", "identity"), _entry())  # Over 25 bytes: evicts the least recently used, task 2
+
+    assert cache.get((2, "a", "identity")) is None
+    assert cache.get((1, "a", "identity")) is not None
+
+
+def test_invalidate_task_drops_every_representation():
+    cache = ResultCache(max_bytes=1000, ttl_seconds=60)
+    cache.put((1, "format=json", "br"), _entry())
+    cache.put((1, "format=columnar", "gzip"), _entry())
+    cache.put((2, "format=json", "br"), _entry())
+
+    cache.invalidate_task(1)
+
+    assert cache.stats()["entries"] == 1
+    assert cache.get((2, "format=json", "br")) is not None
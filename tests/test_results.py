@@ -0,0 +1,54 @@
+# tests/test_results.py
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.core import results, schemas
+
+RESPONSE_MODEL = TypeAdapter(List[schemas.MovieRecordRead])
+
+
+def _row(**values) -> tuple:
+    record = dict.fromkeys(results.RESULT_FIELDS)
+    record.update(original_title="Movie", task_id=1)
+    record.update(values)
+    return tuple(record[field] for field in results.RESULT_FIELDS)
+
+
+PLAIN_ROWS = [
+    _row(original_title="Amélie 😀 \"quoted\" \\  ", release_date=datetime(2001, 4, 25), genres="Comedy,Romance",
+         vote_average=7.8, runtime=122, revenue=173921954, budget=10000000, vote_count=4000, original_language="fr"),
+    _row(original_title="Control \x00\x1f\x7f", release_date=datetime(2010, 1, 1, 12, 30, 5, 123), vote_average=0.0),
+    _row(release_date=datetime(2020, 1, 1, tzinfo=timezone.utc), vote_average=0.30000000000000004, revenue=2**62),
+    _row(release_date=datetime(2020, 1, 1, tzinfo=timezone(timedelta(hours=2))), vote_average=1e-4),
+    _row(original_title=None, vote_average=9999999999999998.0, task_id=7),
+]
+# Floats each encoder writes differently; these payloads take the response-model path
+EXPONENT_ROWS = [_row(vote_average=value) for value in (1e16, 1e-5, 1e-7, float("nan"), float("inf"))]
+
+
+def _expected(rows) -> bytes:
+    """What the endpoint's response_model would send: validate the records, then serialize them."""
+    return RESPONSE_MODEL.dump_json(RESPONSE_MODEL.validate_python([dict(zip(results.RESULT_FIELDS, row)) for row in rows]))
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "orjson":
+        if results.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(results, "orjson", None)
+    return results.encode_rows_json
+
+
+@pytest.mark.parametrize("rows", [[], PLAIN_ROWS] + [[row] for row in PLAIN_ROWS + EXPONENT_ROWS])
+def test_encode_rows_json_matches_response_model(encoder, rows):
+    assert encoder(rows) == _expected(rows)
+
+
+def test_plain_floats_keep_the_fast_path():
+    assert results._plain_floats(PLAIN_ROWS)
+    assert not any(results._plain_floats([row]) for row in EXPONENT_ROWS)
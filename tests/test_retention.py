@@ -0,0 +1,92 @@
+# tests/test_retention.py
+from datetime import datetime, timedelta, timezone
+from threading import Event
+
+import pytest
+from sqlalchemy import event
+
+from app.core import models, retention
+
+NOW = datetime(2026, 1, 1, 12, 0)  # Naive UTC, as SQLite's CURRENT_TIMESTAMP stores it
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(retention, "RETENTION_BATCH_ROWS", 3)
+    monkeypatch.setattr(retention, "RETENTION_BATCH_PAUSE_SECONDS", 0)
+    monkeypatch.setattr(retention, "stop_event", Event())
+
+
+@pytest.fixture
+def result_deletes(engine):
+    """Records each batched DELETE on task_movies; a test may set `on_delete` to act after one."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("DELETE FROM task_movies"):
+            statements.append(statement)
+            if record.on_delete is not None:
+                record.on_delete()
+
+    record.on_delete = None
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements, record
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def _task(db, status=models.TaskStatus.COMPLETED, movies=0, updated_at=None) -> int:
+    task = models.Task(status=status.value, filters={}, updated_at=updated_at)
+    db.add(task)
+    db.flush()
+    db.add_all([models.Movie(id=task.id * 100 + n) for n in range(movies)])
+    db.add_all([models.TaskMovie(task_id=task.id, movie_id=task.id * 100 + n) for n in range(movies)])
+    db.commit()
+    return task.id
+
+
+def _result_rows(db, task_id: int) -> int:
+    return db.query(models.TaskMovie).filter(models.TaskMovie.task_id == task_id).count()
+
+
+def test_delete_task_removes_results_in_batches(db, result_deletes):
+    statements, _ = result_deletes
+    doomed, kept = _task(db, movies=10), _task(db, movies=2)
+
+    assert retention.delete_task(db, doomed) == 10
+
+    assert len(statements) == 4  # 3 + 3 + 3 + 1
+    assert db.get(models.Task, doomed) is None
+    assert _result_rows(db, kept) == 2
+
+
+def test_interrupted_delete_keeps_the_task_for_the_next_pass(db, result_deletes):
+    _, record = result_deletes
+    task_id = _task(db, movies=10)
+    record.on_delete = retention.stop_event.set  # Stop requested while the first batch runs
+
+    assert retention.delete_task(db, task_id) == 3
+    assert db.get(models.Task, task_id) is not None
+    assert _result_rows(db, task_id) == 7
+
+    retention.stop_event.clear()
+    record.on_delete = None
+    assert retention.delete_task(db, task_id) == 7
+    assert db.get(models.Task, task_id) is None
+
+
+def test_expired_tasks_by_ttl_and_by_count(db, monkeypatch):
+    old, recent = NOW - timedelta(hours=2), NOW - timedelta(minutes=1)
+    old_done = _task(db, models.TaskStatus.COMPLETED, updated_at=old)
+    _task(db, models.TaskStatus.IN_PROGRESS, updated_at=old)
+    recent_failed = _task(db, models.TaskStatus.FAILED, updated_at=recent)
+    _task(db, models.TaskStatus.COMPLETED, updated_at=recent)
+    _task(db, models.TaskStatus.PENDING)
+
+    monkeypatch.setattr(retention, "RETENTION_TTL_SECONDS", 3600)
+    monkeypatch.setattr(retention, "RETENTION_MAX_TASKS", 0)
+    assert retention.expired_task_ids(db, now=NOW.replace(tzinfo=timezone.utc)) == [old_done]
+
+    monkeypatch.setattr(retention, "RETENTION_TTL_SECONDS", 0)
+    monkeypatch.setattr(retention, "RETENTION_MAX_TASKS", 2)
+    # Only the newest two are kept, but tasks the worker may still write to are never expired
+    assert retention.expired_task_ids(db) == [old_done, recent_failed]
@@ -0,0 +1,64 @@
+# tests/test_scheduler.py
+from app.core.scheduler import BATCH, INTERACTIVE, TaskScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _item(task_id: int, client: str, priority: str) -> dict:
+    return {"task_id": task_id, "client": client, "priority": priority}
+
+
+def _drain(scheduler: TaskScheduler) -> list:
+    order = []
+    while scheduler.qsize():
+        order.append(scheduler.get(block=False)["task_id"])
+    return order
+
+
+def test_aged_batch_tasks_keep_their_enqueue_order():
+    clock = FakeClock()
+    scheduler = TaskScheduler(aging_seconds=120, clock=clock)
+    for task_id in range(6):
+        scheduler.put(_item(task_id, "bulk", BATCH))
+        clock.now += 1
+    clock.now = 200  # Every batch task is past the aging threshold
+    for task_id in range(100, 106):
+        scheduler.put(_item(task_id, "interactive", INTERACTIVE))
+
+    order = _drain(scheduler)
+
+    assert [task_id for task_id in order if task_id < 100] == [0, 1, 2, 3, 4, 5]
+    assert [task_id for task_id in order if task_id >= 100] == [100, 101, 102, 103, 104, 105]
+
+
+def test_promoted_tasks_are_merged_with_the_clients_interactive_tasks_by_age():
+    clock = FakeClock()
+    scheduler = TaskScheduler(aging_seconds=120, clock=clock)
+    scheduler.put(_item(1, "a", BATCH))
+    clock.now = 10
+    scheduler.put(_item(2, "a", INTERACTIVE))
+    clock.now = 20
+    scheduler.put(_item(3, "a", BATCH))
+    clock.now = 200
+
+    assert _drain(scheduler) == [1, 2, 3]
+
+
+def test_batch_tasks_wait_for_interactive_ones_until_they_age():
+    clock = FakeClock()
+    scheduler = TaskScheduler(aging_seconds=120, clock=clock)
+    scheduler.put(_item(1, "bulk", BATCH))
+    scheduler.put(_item(2, "other", INTERACTIVE))
+    scheduler.put(_item(3, "other", INTERACTIVE))
+
+    assert scheduler.get(block=False)["task_id"] == 2
+    scheduler.put(_item(4, "other", INTERACTIVE))
+    clock.now = 121
+    # Promoted into the interactive rotation, behind the client already queued there
+    assert _drain(scheduler) == [3, 1, 4]